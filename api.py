@@ -0,0 +1,461 @@
+"""
+Engine 1 / Engine 2 / 실험 데이터 조회용 로컬 HTTP JSON API (ASGI).
+
+    python api.py --port 8600 --workers 4          # uvicorn 작업자 프로세스 풀로 실행
+    uvicorn api:app --workers 4                    # 같은 앱을 직접 실행
+
+uvicorn(과 Arrow 응답용 pyarrow)은 선택 의존성이다: pip install -r requirements-api.txt
+
+POST /v1/engine1   {"scenarios": [{"pattern" 또는 "decay_rate", "capacity", "cycles"}, ...],
+                    "seed": 0, "eol_ratio": 0.8, "trajectory": false}
+POST /v1/engine2   {"recipes": [{"binder", "solvent", "drying_temp", "drying_time", "loading"}, ...]}
+GET  /v1/labdata                       샘플 목록
+GET  /v1/labdata?sample=...&data_type=History
+GET  /health
+
+표 형태 응답은 {"columns": [...], "data": [[...], ...]} JSON이 기본이고, ?format=arrow 또는
+Accept: application/vnd.apache.arrow.stream 이면 Arrow IPC 스트림으로 보낸다.
+Accept-Encoding: gzip 이면 큰 응답을 gzip으로 압축한다.
+같은 요청(경로 + 내용 + 형식)의 응답은 TTL/LRU 캐시에서 바로 돌려준다.
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from urllib.parse import parse_qs
+
+import numpy as np
+
+from compute import ComputeService, ServiceBusy
+
+
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+JSON_TYPE = "application/json"
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_SCENARIOS = 100_000
+MAX_TRAJECTORY_POINTS = 20_000_000     # trajectory 응답의 (시나리오 × 사이클) 상한
+MAX_CYCLES = 200_000
+GZIP_MIN_BYTES = 1024                  # 이보다 작은 응답은 압축하지 않음
+GZIP_LEVEL = 5
+
+ApiResponse = namedtuple("ApiResponse", ["status", "headers", "body"])
+
+
+class ApiError(ValueError):
+    """클라이언트 요청 오류 (status 코드와 함께 JSON 오류 응답으로 변환)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# ==============================================================================
+# [응답 캐시] 요청 내용 해시 -> 인코딩된 응답 (TTL + LRU + 전체 크기 상한)
+# ==============================================================================
+class ResponseCache:
+    """
+    key -> (만료 시각, content-type, 본문, gzip 본문 또는 None).
+    gzip 본문은 처음 요청될 때 만들어 같은 항목에 저장한다. 여러 스레드에서 공유해도 된다.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=256 * 1024 * 1024, ttl=300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    @staticmethod
+    def _size(entry):
+        return len(entry[2]) + (len(entry[3]) if entry[3] is not None else 0)
+
+    def get(self, key):
+        """(content-type, 본문, gzip 본문) 또는 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1:]
+
+    def put(self, key, content_type, body, gzip_body=None):
+        entry = (time.monotonic() + self.ttl, content_type, body, gzip_body)
+        if self._size(entry) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += self._size(entry)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def set_gzip(self, key, gzip_body):
+        """이미 있는 항목에 gzip 본문을 추가 (만료 시각은 그대로)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[3] is None:
+                self._bytes += len(gzip_body)
+                self._entries[key] = entry[:3] + (gzip_body,)
+
+    def _drop(self, key):
+        self._bytes -= self._size(self._entries.pop(key))
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), bytes=self._bytes)
+
+
+# ==============================================================================
+# [요청 처리] 엔진 호출은 cli.py의 chunk 계산 함수를 그대로 사용
+# ==============================================================================
+def _records(params, name):
+    rows = params.get(name)
+    if not isinstance(rows, list) or not rows:
+        raise ApiError(f"'{name}'에 하나 이상의 항목 목록이 필요합니다.")
+    if len(rows) > MAX_SCENARIOS:
+        raise ApiError(f"한 요청에는 최대 {MAX_SCENARIOS:,}개까지 보낼 수 있습니다.", 413)
+    if not all(isinstance(r, dict) for r in rows):
+        raise ApiError(f"'{name}'의 각 항목은 JSON 객체여야 합니다.")
+    import pandas as pd
+
+    return pd.DataFrame(rows)
+
+
+def handle_engine1(params):
+    """시나리오별 최종 용량/CE/EOL 요약 (trajectory면 사이클별 long 형식 곡선)"""
+    from cli import run_engine1_chunk
+    from engine1 import DECAY_RATES
+
+    df = _records(params, "scenarios")
+    decay = df["decay_rate"].astype(float) if "decay_rate" in df.columns else None
+    if "pattern" in df.columns:
+        by_pattern = df["pattern"].map(lambda p: DECAY_RATES.get(str(p).strip()) if isinstance(p, str) else None)
+        unknown = df["pattern"].notna() & by_pattern.isna()
+        if unknown.any():
+            raise ApiError(f"알 수 없는 pattern: {df['pattern'][unknown].iloc[0]!r} (가능: {', '.join(DECAY_RATES)})")
+        decay = by_pattern.astype(float) if decay is None else decay.fillna(by_pattern.astype(float))
+    if decay is None or decay.isna().any():
+        raise ApiError("각 시나리오에 pattern 또는 decay_rate가 필요합니다.")
+    df = df.assign(decay_rate=decay.to_numpy())
+    if "capacity" in df.columns:
+        df = df.assign(capacity=df["capacity"].astype(float).fillna(185.0))
+
+    cycles = df["cycles"] if "cycles" in df.columns else None
+    if cycles is not None:
+        cycles = cycles.fillna(1000)
+        if (cycles < 1).any() or (cycles > MAX_CYCLES).any():
+            raise ApiError(f"cycles는 1 ~ {MAX_CYCLES:,} 범위여야 합니다.")
+        if (cycles % 1 != 0).any():
+            raise ApiError(f"cycles는 정수여야 합니다: {float(cycles[cycles % 1 != 0].iloc[0]):g}")
+        df = df.assign(cycles=cycles.astype(int))
+    trajectory = bool(params.get("trajectory", False))
+    if trajectory and len(df) * int(df["cycles"].max() if cycles is not None else 1000) > MAX_TRAJECTORY_POINTS:
+        raise ApiError(f"trajectory 응답은 (시나리오 × 사이클) {MAX_TRAJECTORY_POINTS:,}점까지 가능합니다.", 413)
+    return run_engine1_chunk(0, df, int(params.get("seed", 0)), float(params.get("eol_ratio", 0.8)), trajectory)
+
+
+def handle_engine2(params):
+    """공정 조건별 CO₂/에너지/VOC (바인더-용매 조합이 맞지 않으면 valid=false, 값은 null)"""
+    from cli import run_engine2_chunk
+
+    df = _records(params, "recipes")
+    missing = {"binder", "solvent", "drying_temp", "drying_time", "loading"} - set(df.columns)
+    if missing:
+        raise ApiError(f"필수 항목이 없습니다: {', '.join(sorted(missing))}")
+    return run_engine2_chunk(0, df)
+
+
+def _lab_store():
+    from labdata import load_cycle_store
+
+    store = load_cycle_store()
+    if store is None:
+        raise ApiError("실험 데이터가 없습니다.", 404)
+    return store
+
+
+def handle_labdata(params):
+    """sample이 없으면 샘플 목록, 있으면 그 샘플의 (cycle, capacity) 표"""
+    import pandas as pd
+    from labdata import DATA_TYPES
+
+    store = _lab_store()
+    sample = params.get("sample")
+    if not sample:
+        return {"samples": store.samples}
+    if sample not in store:
+        raise ApiError(f"샘플을 찾을 수 없습니다: {sample!r}", 404)
+    data_type = params.get("data_type", "History")
+    if data_type not in DATA_TYPES:
+        raise ApiError(f"알 수 없는 data_type: {data_type!r} (가능: {', '.join(DATA_TYPES)})")
+    series = store.get(sample, data_type)
+    return pd.DataFrame({"cycle": series.cycle, "capacity": series.capacity})
+
+
+def labdata_version():
+    """실험 데이터 응답 캐시 키에 넣는 저장소 버전 (새 데이터가 적재되면 캐시를 쓰지 않음)"""
+    from labdata import load_cycle_store
+
+    store = load_cycle_store()
+    return None if store is None else repr(sorted((k, len(v.cycle)) for k, v in store.groups.items()))
+
+
+# (메서드, 경로) -> (처리 함수, 캐시 키에 더할 데이터 버전 함수 또는 None)
+ROUTES = {
+    ("POST", "/v1/engine1"): (handle_engine1, None),
+    ("POST", "/v1/engine2"): (handle_engine2, None),
+    ("GET", "/v1/labdata"): (handle_labdata, labdata_version),
+}
+
+
+# ==============================================================================
+# [인코딩] DataFrame -> JSON(split) 또는 Arrow IPC, dict -> JSON
+# ==============================================================================
+def encode(result, fmt):
+    """처리 결과 -> (content-type, 본문 bytes). NaN은 JSON null."""
+    import pandas as pd
+
+    if isinstance(result, pd.DataFrame):
+        if fmt == "arrow":
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(result, preserve_index=False)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return ARROW_TYPE, sink.getvalue().to_pybytes()
+        return JSON_TYPE, result.to_json(orient="split", index=False).encode()
+    return JSON_TYPE, json.dumps(result, ensure_ascii=False, default=_json_default).encode()
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"JSON으로 바꿀 수 없는 값: {type(value).__name__}")
+
+
+def _error_body(message):
+    return json.dumps({"error": message}, ensure_ascii=False).encode()
+
+
+# ==============================================================================
+# [ASGI 앱]
+# ==============================================================================
+class ApiApp:
+    """
+    ASGI 애플리케이션. 계산은 ComputeService 작업 풀에서 실행하고(같은 요청은 합침),
+    인코딩된 응답을 ResponseCache에 보관한다. uvicorn 작업자 프로세스마다 앱/캐시가 하나씩 생긴다.
+    """
+
+    def __init__(self, cache=None, service=None):
+        self.cache = cache or ResponseCache()
+        # 대기열이 가득 차면 이벤트 루프를 막지 않고 바로 503으로 응답
+        self.service = service or ComputeService(max_pending=64, queue_timeout=0.0)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    self.service.shutdown(wait=False)
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        try:
+            status, headers, body = await self.handle(scope, receive)
+        except ApiError as e:
+            status, headers, body = e.status, [(b"content-type", JSON_TYPE.encode())], _error_body(str(e))
+        except ServiceBusy:
+            status, headers, body = 503, [(b"content-type", JSON_TYPE.encode()), (b"retry-after", b"1")], \
+                _error_body("계산 대기열이 가득 찼습니다. 잠시 후 다시 요청해 주세요.")
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body if scope["method"] != "HEAD" else b""})
+
+    async def handle(self, scope, receive):
+        method = "GET" if scope["method"] == "HEAD" else scope["method"]
+        path = scope["path"].rstrip("/") or "/"
+        request_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        if path == "/health":
+            return 200, [(b"content-type", JSON_TYPE.encode())], json.dumps(
+                {"status": "ok", "cache": self.cache.snapshot(), "compute": self.service.snapshot()}).encode()
+        route = ROUTES.get((method, path))
+        if route is None:
+            allowed = [m for m, p in ROUTES if p == path]
+            raise ApiError(f"지원하지 않는 요청입니다: {method} {path}", 405 if allowed else 404)
+        handler, version_fn = route
+
+        query = {k: v[-1] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+        fmt = query.pop("format", None) or ("arrow" if ARROW_TYPE in request_headers.get("accept", "") else "json")
+        if fmt not in ("json", "arrow"):
+            raise ApiError("format은 json 또는 arrow여야 합니다.")
+        params = dict(query)
+        if method == "POST":
+            body = await _read_body(receive, int(request_headers.get("content-length") or 0))
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError as e:
+                raise ApiError(f"JSON 본문을 읽을 수 없습니다: {e}")
+            if not isinstance(payload, dict):
+                raise ApiError("JSON 본문은 객체여야 합니다.")
+            params.update(payload)
+
+        version = await asyncio.to_thread(version_fn) if version_fn is not None else None
+        key = _cache_key(method, path, params, fmt, version)
+        cached = self.cache.get(key)
+        cache_status = b"HIT"
+        if cached is None:
+            cache_status = b"MISS"
+            content_type, body = await asyncio.wrap_future(
+                self.service.submit(("api", key), _compute_response, handler, params, fmt))
+            self.cache.put(key, content_type, body)
+            gzip_body = None
+        else:
+            content_type, body, gzip_body = cached
+
+        headers = [(b"content-type", content_type.encode()), (b"x-cache", cache_status), (b"vary", b"Accept, Accept-Encoding")]
+        if "gzip" in request_headers.get("accept-encoding", "") and len(body) >= GZIP_MIN_BYTES:
+            if gzip_body is None:
+                gzip_body = await asyncio.to_thread(gzip.compress, body, GZIP_LEVEL)
+                self.cache.set_gzip(key, gzip_body)
+            headers.append((b"content-encoding", b"gzip"))
+            body = gzip_body
+        return 200, headers, body
+
+
+def _compute_response(handler, params, fmt):
+    """작업 스레드에서 실행: 계산 + 인코딩"""
+    try:
+        return encode(handler(params), fmt)
+    except ApiError:
+        raise
+    except (KeyError, TypeError, ValueError) as e:
+        raise ApiError(f"요청 값을 처리할 수 없습니다: {e}")
+
+
+def _cache_key(method, path, params, fmt, version):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps([method, path, fmt, version, params], sort_keys=True, separators=(",", ":")).encode())
+    return h.hexdigest()
+
+
+async def _read_body(receive, declared):
+    if declared > MAX_BODY_BYTES:
+        raise ApiError(f"요청 본문은 최대 {MAX_BODY_BYTES // (1024 * 1024)} MiB입니다.", 413)
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise ApiError(f"요청 본문은 최대 {MAX_BODY_BYTES // (1024 * 1024)} MiB입니다.", 413)
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+app = ApiApp()
+
+
+# ==============================================================================
+# [로컬 클라이언트] 네트워크 없이 같은 프로세스에서 ASGI 앱 호출 (스크립트/검증용)
+# ==============================================================================
+class LocalClient:
+    """
+    client = LocalClient()
+    resp = client.post("/v1/engine1", {"scenarios": [{"pattern": "Charge/Discharge"}]})
+    decode(resp) -> dict 또는 DataFrame
+    """
+
+    def __init__(self, asgi_app=None):
+        self.app = asgi_app or app
+
+    def request(self, method, path, json_body=None, headers=None):
+        path, _, query = path.partition("?")
+        body = b"" if json_body is None else json.dumps(json_body).encode()
+        raw_headers = [(k.lower().encode("latin-1"), str(v).encode("latin-1")) for k, v in (headers or {}).items()]
+        if json_body is not None:
+            raw_headers += [(b"content-type", JSON_TYPE.encode()), (b"content-length", str(len(body)).encode())]
+        scope = {"type": "http", "method": method, "path": path, "query_string": query.encode(),
+                 "headers": raw_headers, "http_version": "1.1", "scheme": "http"}
+        sent = []
+        # 응답은 작업(Task) 결과로 돌려받지 않음: asyncio.run이 큰 결과를 담은 작업의 repr을 만들며 느려짐
+        asyncio.run(self._call(scope, body, sent))
+        start = sent[0]
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in start["headers"]}
+        return ApiResponse(start["status"], headers, b"".join(m.get("body", b"") for m in sent[1:]))
+
+    async def _call(self, scope, body, sent):
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        await self.app(scope, receive, send)
+
+    def get(self, path, headers=None):
+        return self.request("GET", path, headers=headers)
+
+    def post(self, path, json_body, headers=None):
+        return self.request("POST", path, json_body, headers)
+
+
+def decode(response):
+    """ApiResponse -> dict(JSON) 또는 DataFrame(표 응답). gzip 압축도 풀어 준다."""
+    import pandas as pd
+
+    body = response.body
+    if response.headers.get("content-encoding") == "gzip":
+        body = gzip.decompress(body)
+    if response.headers.get("content-type") == ARROW_TYPE:
+        import pyarrow as pa
+
+        return pa.ipc.open_stream(body).read_all().to_pandas()
+    data = json.loads(body)
+    if isinstance(data, dict) and set(data) == {"columns", "data"}:
+        return pd.DataFrame(data["data"], columns=data["columns"])
+    return data
+
+
+# ==============================================================================
+# [실행] uvicorn 작업자 풀 (uvicorn은 선택 설치)
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Battery simulator HTTP JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 작업자 프로세스 수")
+    args = parser.parse_args(argv)
+    try:
+        import uvicorn
+    except ImportError:
+        parser.error("uvicorn이 필요합니다: pip install -r requirements-api.txt")
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers, log_level="info")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
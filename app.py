@@ -1,14 +1,30 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import base64
+import functools
 import os
-from sklearn.ensemble import RandomForestRegressor
+
+import charts
+import profiling
+from assets import get_data_uri
+from calibration import calibrate_store
+from compute import ComputeService, ServiceBusy
+from cooptimize import co_optimize_cached
+from degradation import pattern_eol_physics, simulate_patterns_physics
+from engine1 import DECAY_RATES, fade_retention, simulate_patterns, solve_eol_cycles
+from engine2 import estimate_lca_impact, sweep_lca_grid
+from labdata import base_store, ingest_bytes, load_cycle_store
+from montecarlo import eol_percentiles, simulate_monte_carlo, simulate_monte_carlo_physics
+from rul import RulTracker
+from sensitivity import lca_sensitivity, result_table
+from surrogate import load_or_train
 
 
 st.set_page_config(page_title="Battery AI Simulator", layout="wide", page_icon="🔋")
 
+# 디버그 모드(?debug=1): 이번 rerun의 단계별 시간/할당을 측정하고 사이드바에 표시
+debug_mode = st.query_params.get("debug") == "1"
+profiling.begin_run(debug_mode, trace_memory=debug_mode and st.session_state.get("dbg_tracemalloc", False))
+
 team_members = [
     {
         "name": "이하영",
@@ -50,31 +66,26 @@ team_members = [
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
-def get_base64_image(filename):
-    """이미지 파일을 읽어 Base64 문자열로 반환"""
-    if not filename: return None
-    file_path = os.path.join(current_dir, filename)
-    if not os.path.exists(file_path):
-        return None
-    try:
-        with open(file_path, "rb") as f:
-            data = f.read()
-        return base64.b64encode(data).decode()
-    except Exception:
-        return None
-
-def get_img_tag(filename, title, css_class="logo-img"):
-    """HTML <img> 태그 생성"""
-    b64 = get_base64_image(filename)
-    if b64:
-        return f'<img src="data:image/png;base64,{b64}" class="{css_class}" title="{title}">'
+# Engine 1 패턴별 그래프 색상
+PATTERN_COLORS = {
+    "Slow Charge/Discharge": '#28a745',
+    "Charge/Discharge": '#fd7e14',
+    "Fast Charge/Discharge": '#dc3545',
+}
+
+def get_img_tag(filename, title, css_class="logo-img", kind="logo_nav"):
+    """HTML <img> 태그 생성 (표시 크기로 줄인 썸네일을 data URI로 삽입)"""
+    src = get_data_uri(filename, kind)
+    if src:
+        return f'<img src="{src}" class="{css_class}" title="{title}">'
     return ""
 
 # 1. 이미지 자원 로드
-tag_25 = get_img_tag("25logo.png", "Team 25", css_class="top-left-logo")
-tag_ajou_sw = get_img_tag("ajou_sw_logo.png", "Ajou SW", css_class="top-right-logo")
-tag_ajou    = get_img_tag("ajou_logo.png", "Ajou University", css_class="top-right-logo")
-tag_google  = get_img_tag("google_logo.png", "Google", css_class="top-right-logo")
+with profiling.span("assets.load"):
+    tag_25 = get_img_tag("25logo.png", "Team 25", css_class="top-left-logo", kind="logo_header")
+    tag_ajou_sw = get_img_tag("ajou_sw_logo.png", "Ajou SW", css_class="top-right-logo")
+    tag_ajou    = get_img_tag("ajou_logo.png", "Ajou University", css_class="top-right-logo")
+    tag_google  = get_img_tag("google_logo.png", "Google", css_class="top-right-logo")
 
 # 2. 상단 배경 설정
 header_bg_style = "background-color: #B1B6B0;"
@@ -298,61 +309,89 @@ st.markdown(f"""
 # ==============================================================================
 # [함수 정의] 계산 로직
 # ==============================================================================
-@st.cache_data
-def load_real_case_data():
+# 계산 서비스 구분: 오래 걸리는 엔진 계산(heavy)과 짧은 조회/그리기(light)를 서로 다른 작업 풀에서 실행
+# -> 긴 Monte Carlo · 스윕 · Sobol 작업이 heavy 작업자를 모두 차지해도 데이터 로드와 그래프 표시는 막히지 않는다.
+COMPUTE_LANES = {
+    "heavy": {"workers": None, "max_pending": 32, "queue_timeout": 10.0},
+    "light": {"workers": 4, "max_pending": 128, "queue_timeout": 30.0},
+}
+
+@st.cache_resource
+def get_compute_service(lane="heavy"):
+    """모든 세션이 공유하는 계산 서비스 (구분별 하나, 동시 실행 수 제한 + 같은 요청 합치기)"""
+    return ComputeService(**COMPUTE_LANES[lane])
+
+def compute(fn, *args, key=None, stage=None, lane="heavy"):
+    """
+    계산을 공유 서비스에서 실행하고 결과를 기다림.
+    같은 요청(key, 기본값은 함수 이름 + 인자)이 다른 세션에서 이미 진행 중이면 그 결과를 함께 받는다.
+    대기열이 가득 차면 안내 후 이번 실행을 멈춘다.
+    stage: 디버그 측정 구간 이름 (기본값은 함수 이름, 대기 시간 포함)
+    lane: "heavy"(엔진 계산) 또는 "light"(캐시 조회, 데이터 로드, 그래프 등 짧은 작업) -> COMPUTE_LANES
+    """
+    key = (fn.__module__, fn.__qualname__) + (args if key is None else (key,))
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(current_dir, "engine1_output.csv")
-        df = pd.read_csv(file_path)
-        
-        # 데이터의 앞뒤 공백을 제거하여 매칭 오류 방지
-        if 'Sample_Type' in df.columns:
-            df['Sample_Type'] = df['Sample_Type'].astype(str).str.strip()
-            
-        return df
-    except FileNotFoundError:
-        return None
-
-def predict_life_and_ce(decay_rate, specific_cap_base=185.0, cycles=1000):
-    x = np.arange(1, cycles + 1)
-    linear_fade = 0.00015 * x * decay_rate
-    acc_fade = 1e-9 * np.exp(0.015 * x) * decay_rate
-    cap_noise = np.random.normal(0, 0.0015, size=len(x))
-    retention = 1.0 - linear_fade - acc_fade + cap_noise
-    capacity = retention * specific_cap_base
-    
-    if decay_rate < 1.5:
-        base_ce = 99.98; ce_noise_scale = 0.01
-    elif decay_rate < 3.0:
-        base_ce = 99.90; ce_noise_scale = 0.03
+        with profiling.span(stage or f"{fn.__module__}.{fn.__qualname__}"):
+            return get_compute_service(lane).run(key, fn, *args)
+    except ServiceBusy:
+        st.warning("⏳ 동시 접속이 많아 계산 대기열이 가득 찼습니다. 잠시 후 다시 실행해 주세요.")
+        st.stop()
+
+def sweep_grid(binders, solvents, temp_range, time_range, loading_range, steps):
+    """스윕 조건(해시 가능한 값)으로 격자를 만들어 평가 (계산 서비스에서 같은 스윕 요청을 합치기 위한 래퍼)"""
+    return sweep_lca_grid(
+        list(binders), list(solvents),
+        np.linspace(*temp_range, steps), np.linspace(*time_range, steps), np.linspace(*loading_range, steps),
+    )
+
+def show_chart(key, build, figsize=(10, 5), interactive=False, height=260):
+    """
+    interactive면 Altair(Vega-Lite)로 브라우저에서 그리고, 아니면 입력 키로 캐시된 PNG를 표시.
+    build(): 패널 목록을 만드는 함수 (PNG 캐시에 없을 때만 호출)
+    """
+    if interactive:
+        with profiling.span("chart.altair"):
+            st.altair_chart(charts.altair_chart(build(), height=height), width="stretch")
     else:
-        base_ce = 99.5 - (x * 0.0005); ce_noise_scale = 0.15
-        
-    ce_noise = np.random.normal(0, ce_noise_scale, size=len(x))
-    ce = np.clip(base_ce + ce_noise, 0, 100.0)
-    return x, np.clip(capacity, 0, None), ce
-
-def calculate_lca_impact(binder_type, solvent_type, drying_temp, loading_mass, drying_time):
-    if solvent_type == "NMP":
-        voc_base = 3.0; voc_val = voc_base * (loading_mass / 10.0); voc_desc = "Critical (NMP Toxicity)"
-    else:
-        voc_val = 0.0; voc_desc = "Clean (Water Vapor)"
-
-    if binder_type == "PVDF":
-        co2_factor = 0.45; chem_formula = "-(C₂H₂F₂)ₙ-"; co2_desc = f"High ({chem_formula})"
-    elif binder_type in ["CMGG", "GG", "CMC"]: 
-        co2_factor = 0.12; chem_formula = "Bio-based (C,H,O)"; co2_desc = f"Low ({chem_formula})"
-    else:
-        co2_factor = 0.3; co2_desc = "Medium"
-    co2_val = co2_factor * (loading_mass / 20.0)
-
-    bp = 204.1 if solvent_type == "NMP" else 100.0
-    process_penalty = 1.5 if solvent_type == "NMP" else 1.0
-    delta_T = max(drying_temp - 25, 0)
-    efficiency = 1.0 if drying_temp >= bp else 0.6
-    energy_val = (delta_T * drying_time * process_penalty) / (efficiency * 50000.0)
-    
-    return co2_val, energy_val, voc_val, co2_desc, voc_desc
+        png = compute(charts.cached_png, key, build, figsize, key=(key, figsize), stage="chart.png", lane="light")
+        with profiling.span("chart.send"):
+            st.image(png, width="stretch")
+
+def tab_fragment(stage):
+    """
+    탭 본문을 st.fragment로 만드는 데코레이터: 탭 안의 위젯을 조작하면 그 탭 함수만 다시 실행된다
+    (CSS/상단 바/다른 탭은 다시 그리지 않음). 전체 실행(첫 로드, 탭 전환)에서는 평소처럼 함께 실행된다.
+    디버그 모드에서 fragment만 다시 실행될 때는 따로 측정하여 탭 아래에 표시.
+    """
+    def decorate(body):
+        @st.fragment
+        @functools.wraps(body)
+        def run():
+            if profiling.active():
+                with profiling.span(stage):
+                    body()
+                return
+            profiling.begin_run(debug_mode, trace_memory=debug_mode and st.session_state.get("dbg_tracemalloc", False))
+            try:
+                with profiling.span(stage):
+                    body()
+            finally:
+                records = profiling.end_run()
+            if debug_mode and records:
+                st.caption("⏱️ fragment rerun · " + " · ".join(
+                    f"{r.stage} {r.seconds * 1000:.1f} ms" for r in records if r.parent in (None, stage)))
+        return run
+    return decorate
+
+@st.cache_resource
+def get_surrogate_model():
+    """History 데이터로 학습한 용량 예측 모델 (프로세스당 한 번 로드, 없으면 학습 후 저장)"""
+    return load_or_train()
+
+@st.cache_resource
+def get_rul_tracker():
+    """모든 세션이 공유하는 온라인 RUL 추정기 (새로 적재된 사이클만 반영)"""
+    return RulTracker()
 
 
 # ==============================================================================
@@ -375,12 +414,27 @@ st.markdown(f"""
 # ==============================================================================
 # [UI 구성] 2. 메인 네비게이션 탭
 # ==============================================================================
+# on_change="rerun": 선택된 탭만 .open == True 가 되어, 숨겨진 탭의 본문(및 무거운 import)을 건너뜀
 tab_home, tab_e1, tab_e2, tab_data = st.tabs([
     "  Home  ", 
     "  Engine 1  ", 
     "  Engine 2  ", 
     "  Our Data  "
-])
+], key="main_tabs", on_change="rerun")
+
+# 숨겨진 탭의 위젯은 그려지지 않으면 값이 지워지므로, 닫힌 탭의 입력값을 다시 기록해 유지
+# (그려지는 탭의 위젯에 기록하면 기본값 경고가 나므로 닫힌 탭만, 버튼은 값을 설정할 수 없어 제외)
+TAB_WIDGET_KEYS = [
+    (tab_e1, ["t1_radio", "t1_model", "t1_temp", "t1_cap", "t1_cycles", "t1_seed", "t1_overlay", "t1_mc", "t1_mc_draws", "t1_interactive"]),
+    (tab_e2, ["e2_binder", "e2_solvent", "e2_temp", "e2_time", "e2_loading", "e2_interactive",
+              "sw_binders", "sw_solvents", "sw_steps", "sw_temp", "sw_time", "sw_loading", "sa_samples", "co_pattern", "co_generations"]),
+    (tab_data, ["t2_radio", "t2_regen", "t2_calib", "t2_rul", "t2_interactive", "t2_upload_sample"]),
+]
+for _tab, _keys in TAB_WIDGET_KEYS:
+    if _tab.open is False:
+        for _key in _keys:
+            if _key in st.session_state:
+                st.session_state[_key] = st.session_state[_key]
 
 # 대제목 헤더 박스
 header_html = f"""
@@ -393,9 +447,10 @@ header_html = f"""
 # ------------------------------------------------------------------------------
 # TAB 1: Home
 # ------------------------------------------------------------------------------
-with tab_home:
+@tab_fragment("tab.home")
+def render_home():
     st.markdown(header_html, unsafe_allow_html=True)
-    
+
     # Hero Section
     st.markdown("""
     <div class="hero-container">
@@ -415,22 +470,23 @@ with tab_home:
         st.success("### 💡 Key Features\n\n* **Engine 1**: 배터리 성능 예측 시뮬레이터\n* **Engine 2**: 공정 환경 영향 시뮬레이터\n* **Our Data**: 실제 실험 데이터 검증 ")
 
     st.markdown("---")
-    
+
     # [Team Member Section]
     st.markdown("<h3 style='color: #1B5E20; margin-bottom: 20px;'> Group Member 👥 </h3>", unsafe_allow_html=True)
-    
+
     cols = st.columns(2) 
-    
+
     for i, member in enumerate(team_members):
         col_idx = i % 2
         tags_html = "".join([f'<span class="tag-badge">{tag}</span>' for tag in member['tags']])
-        
-        # 파일명으로 이미지 찾기
-        profile_b64 = get_base64_image(member["photo_file"])
-        
+    
+        # 파일명으로 이미지 찾기 (100px 원형 표시용 썸네일)
+        with profiling.span("assets.load"):
+            profile_src = get_data_uri(member["photo_file"], "avatar")
+    
         # 이미지가 있으면 로컬 사진, 없으면 기본 아바타 (Fallback)
-        if profile_b64:
-            img_src = f"data:image/jpeg;base64,{profile_b64}"
+        if profile_src:
+            img_src = profile_src
         else:
             img_src = f"https://api.dicebear.com/7.x/avataaars/svg?seed={member['name']}"
 
@@ -452,14 +508,15 @@ with tab_home:
     # ==========================================================================
     st.write("")  # 여백 추가
     st.write("")
-    
+
     # 파일명 정의
     file_eng = "01_(국영문)공과대학.png"
-    
-    # Base64 변환
-    b64_eng = get_base64_image(file_eng)
 
-    if b64_eng:
+    # 썸네일 data URI 변환
+    with profiling.span("assets.load"):
+        src_eng = get_data_uri(file_eng, "footer")
+
+    if src_eng:
         html_content = f"""
         <div style="
             display: flex; 
@@ -468,22 +525,24 @@ with tab_home:
             margin-top: 80px;             /* 위쪽 요소와의 간격 */
             margin-bottom: 40px; 
             padding-right: 10px;">
-            <img src="data:image/png;base64,{b64_eng}" 
+            <img src="{src_eng}" 
                  style="width: 320px; max-width: 100%; opacity: 0.9; filter: drop-shadow(0px 2px 4px rgba(0,0,0,0.1));">
         </div>
         """
         st.markdown(html_content, unsafe_allow_html=True)
 
+
 # ------------------------------------------------------------------------------
 # TAB 2: Engine 1
 # ------------------------------------------------------------------------------
-with tab_e1:
+@tab_fragment("tab.engine1")
+def render_engine1():
     st.markdown(header_html, unsafe_allow_html=True)
-    
+
     st.subheader("Engine 1. 배터리 성능 예측 시뮬레이터 ")
     st.markdown("사용자가 직접 변수(초기 용량, 목표 사이클)를 조절하며 AI 모델의 예측 경향성을 빠르게 파악하는 시뮬레이터입니다.")
     st.divider()
-    
+
     col_input, col_view = st.columns([1, 2])
     with col_input:
         # [확인용] CSS에서 div[data-testid="stVerticalBlockBorderWrapper"]를 강제로 스타일링 중입니다.
@@ -493,69 +552,142 @@ with tab_e1:
             sample_type = st.radio("패턴 선택", ["Slow Charge/Discharge", "Charge/Discharge", "Fast Charge/Discharge"], label_visibility="collapsed", key="t1_radio")
             st.divider()
             st.markdown("#### ⚙️ 예측 조건 설정")
-            init_cap_input = st.number_input("Initial specific capacity (mAh/g)", 100.0, 400.0, 350.0)
-            cycle_input = st.number_input("Number of cycles for prediction", 200, 2000, 500, step=50)
-            run_e1 = st.button("가상 예측 실행", type="primary", use_container_width=True)
+            model_e1 = st.radio("열화 모델", ["경험식", "물리 기반 (SEI · Plating · Arrhenius)"], key="t1_model")
+            physics_e1 = model_e1 != "경험식"
+            temp_e1 = st.slider("셀 온도 (°C, 물리 기반 모델)", -10, 60, 25, key="t1_temp", disabled=not physics_e1)
+            init_cap_input = st.number_input("Initial specific capacity (mAh/g)", 100.0, 400.0, 350.0, key="t1_cap")
+            cycle_input = st.number_input("Number of cycles for prediction", 200, 2000, 500, step=50, key="t1_cycles")
+            seed_input = st.number_input("Random seed (같은 값이면 같은 결과)", 0, 2**31 - 1, 42, step=1, key="t1_seed")
+            overlay_e1 = st.checkbox("Slow / Normal / Fast 패턴 겹쳐 보기", key="t1_overlay")
+            mc_e1 = st.checkbox("Monte Carlo 불확실성 밴드 (P5/P50/P95)", key="t1_mc")
+            mc_draws = st.selectbox("Monte Carlo 반복 횟수", [500, 2000, 10000], index=1, key="t1_mc_draws", disabled=not mc_e1)
+            interactive_e1 = st.toggle("인터랙티브 차트 (브라우저에서 렌더링)", key="t1_interactive")
+            run_e1 = st.button("가상 예측 실행", type="primary", width="stretch")
 
     with col_view:
         if run_e1:
             with st.spinner("AI Analyzing..."):
                 # [유지] 그래프 라벨도 선택한 속도명과 일치시킴
-                if sample_type == "Slow Charge/Discharge": decay = 0.5; label = "Slow Charge/Discharge"; color = '#28a745'
-                elif sample_type == "Charge/Discharge": decay = 2.5; label = "Charge/Discharge"; color = '#fd7e14'
-                else: decay = 8.0; label = "Fast Charge/Discharge"; color = '#dc3545'
-                
-                cycles, capacity, ce = predict_life_and_ce(decay, init_cap_input, cycle_input)
-                
-                fig2, (ax_cap, ax_ce) = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
-                
-                # [수정됨] plot() -> scatter()로 변경 (Engine 1 그래프)
-                ax_cap.scatter(cycles[:100], capacity[:100], color='black', s=15, alpha=0.6, label='Input Data')
-                ax_cap.scatter(cycles[100:], capacity[100:], color=color, s=15, alpha=0.6, label=f'Prediction ({label})')
-                
-                # [유지] Y축 이름: Specific Capacity (mAh/g)
-                ax_cap.set_ylabel("Specific Capacity (mAh/g)", fontweight='bold')
-                ax_cap.set_title("Performance Prediction", fontweight='bold')
-                ax_cap.legend(); ax_cap.grid(True, alpha=0.3)
-                
-                # [수정됨] CE 그래프도 일관성을 위해 scatter로 변경
-                ax_ce.scatter(cycles, ce, color='#007bff', s=15, alpha=0.6)
-                ax_ce.set_ylabel("Coulombic Efficiency (%)", fontweight='bold')
-                ax_ce.set_xlabel("Cycle Number", fontweight='bold')
-                ax_ce.set_ylim(98.0 if decay > 5.0 else 99.5, 100.1)
-                ax_ce.grid(True, alpha=0.3)
-                
-                st.pyplot(fig2)
-                
+                decay = DECAY_RATES[sample_type]; label = sample_type; color = PATTERN_COLORS[sample_type]
+                cap_ylabel, ce_ylabel = "Specific Capacity (mAh/g)", "Coulombic Efficiency (%)"
+                # 물리 기반 모델은 온도까지 같아야 같은 결과
+                model_key = ("physics", temp_e1) if physics_e1 else ("empirical",)
+
+                def simulate_e1(patterns):
+                    if physics_e1:
+                        return compute(simulate_patterns_physics, patterns, init_cap_input, cycle_input, seed_input, float(temp_e1),
+                                       stage="engine1.simulate")
+                    return compute(simulate_patterns, patterns, init_cap_input, cycle_input, seed_input, stage="engine1.simulate")
+
+                if mc_e1:
+                    # 다수의 노이즈 실현값에 대한 분위수 밴드 (스트리밍 누적, 프로세스 풀 병렬)
+                    if physics_e1:
+                        # 셀 간 제조 편차(열화 계수 분포)에 대한 밴드
+                        mc = compute(simulate_monte_carlo_physics, sample_type, init_cap_input, cycle_input, mc_draws, seed_input,
+                                     float(temp_e1), stage="engine1.monte_carlo")
+                    else:
+                        mc = compute(simulate_monte_carlo, sample_type, init_cap_input, cycle_input, mc_draws, seed_input, stage="engine1.monte_carlo")
+                    cycles = mc.x
+                    capacity = mc.cap_quantiles[1]
+                    ce_floor = 98.0 if decay > 5.0 or physics_e1 else 99.5
+                    chart_key = ("e1_mc", sample_type, init_cap_input, cycle_input, mc_draws, seed_input) + model_key
+
+                    def build_e1():
+                        cap_p5, cap_p50, cap_p95 = mc.cap_quantiles
+                        ce_p5, ce_p50, ce_p95 = mc.ce_quantiles
+                        return [
+                            charts.panel([charts.band(cycles, cap_p5, cap_p95, 'P5–P95', color),
+                                          charts.line(cycles, cap_p50, f'P50 ({label})', color)],
+                                         "Performance Prediction", None, cap_ylabel),
+                            charts.panel([charts.band(cycles, ce_p5, ce_p95, color='#007bff'),
+                                          charts.line(cycles, ce_p50, color='#007bff', size=1.5)],
+                                         None, "Cycle Number", ce_ylabel, (ce_floor, 100.1)),
+                        ]
+                elif overlay_e1:
+                    # 세 가지 패턴을 한 번에 배치 계산하여 겹쳐 표시
+                    patterns = tuple(DECAY_RATES)
+                    cycles, cap_all, ce_all = simulate_e1(patterns)
+                    capacity = cap_all[patterns.index(sample_type)]
+                    ce_floor = 98.0 if max(DECAY_RATES.values()) > 5.0 or physics_e1 else 99.5
+                    chart_key = ("e1_overlay", sample_type, init_cap_input, cycle_input, seed_input) + model_key
+
+                    def build_e1():
+                        cap_layers = [charts.scatter(cycles[:100], capacity[:100], 'Input Data')]
+                        cap_layers += [charts.scatter(cycles[100:], cap_p[100:], f'Prediction ({p})', PATTERN_COLORS[p])
+                                       for p, cap_p in zip(patterns, cap_all)]
+                        ce_layers = [charts.scatter(cycles, ce_p, p, PATTERN_COLORS[p]) for p, ce_p in zip(patterns, ce_all)]
+                        return [
+                            charts.panel(cap_layers, "Performance Prediction", None, cap_ylabel),
+                            charts.panel(ce_layers, None, "Cycle Number", ce_ylabel, (ce_floor, 100.1)),
+                        ]
+                else:
+                    cycles, cap_all, ce_all = simulate_e1((sample_type,))
+                    capacity, ce = cap_all[0], ce_all[0]
+                    ce_floor = 98.0 if decay > 5.0 or physics_e1 else 99.5
+                    chart_key = ("e1", sample_type, init_cap_input, cycle_input, seed_input) + model_key
+
+                    # [수정됨] plot() -> scatter()로 변경 (Engine 1 그래프, CE 그래프도 일관성을 위해 scatter)
+                    def build_e1():
+                        return [
+                            charts.panel([charts.scatter(cycles[:100], capacity[:100], 'Input Data'),
+                                          charts.scatter(cycles[100:], capacity[100:], f'Prediction ({label})', color)],
+                                         "Performance Prediction", None, cap_ylabel),
+                            charts.panel([charts.scatter(cycles, ce, color='#007bff')],
+                                         None, "Cycle Number", ce_ylabel, (ce_floor, 100.1)),
+                        ]
+
+                show_chart(chart_key, build_e1, figsize=(10, 8), interactive=interactive_e1)
+
+                # 두 안내 모두 노이즈 없는 열화식 기준 EOL (CLI/API와 같은 정의)
                 eol_limit = init_cap_input * 0.8
-                eol_cycle = np.where(capacity < eol_limit)[0]
-                if len(eol_cycle) > 0:
-                    st.error(f"⚠️ **Warning:** 약 **{eol_cycle[0]} Cycle**에서 수명이 80%({eol_limit:.1f} mAh/g) 이하로 떨어집니다.")
+                if physics_e1:
+                    projected = compute(pattern_eol_physics, sample_type, float(temp_e1), stage="engine1.eol")
                 else:
-                    st.success(f"✅ **Stable:** {cycle_input} Cycle까지 안정적입니다.")
+                    projected = solve_eol_cycles(decay)[0]
+                if not np.isnan(projected) and projected <= cycle_input:
+                    st.error(f"⚠️ **Warning:** 약 **{projected:.0f} Cycle**에서 수명이 80%({eol_limit:.1f} mAh/g) 이하로 떨어집니다.")
+                else:
+                    eol_note = f" (예상 80% 도달: 약 {projected:.0f} Cycle)" if not np.isnan(projected) else ""
+                    st.success(f"✅ **Stable:** {cycle_input} Cycle까지 안정적입니다.{eol_note}")
+
+                if mc_e1 and mc.eol_counts[:-1].sum() > 0:
+                    eol_p5, eol_p50, eol_p95 = eol_percentiles(mc)
+                    reached = np.flatnonzero(mc.eol_counts[:-1])
+                    show_chart(
+                        chart_key + ("eol",),
+                        lambda: [charts.panel([charts.bar(reached, mc.eol_counts[reached], color=color)],
+                                              "EOL Cycle Distribution", "Cycle at 80% Capacity", "Count")],
+                        figsize=(10, 3), interactive=interactive_e1, height=180,
+                    )
+                    fmt = lambda v: "-" if np.isnan(v) else f"{v:.0f}"
+                    st.info(f"📊 **Monte Carlo ({mc.n_draws} draws)**: 80% 도달 Cycle P5 / P50 / P95 = **{fmt(eol_p5)} / {fmt(eol_p50)} / {fmt(eol_p95)}**")
+
+
 # ------------------------------------------------------------------------------
 # TAB 3: Engine 2 
 # ------------------------------------------------------------------------------
-with tab_e2:
+@tab_fragment("tab.engine2")
+def render_engine2():
     st.markdown(header_html, unsafe_allow_html=True)
-    
+
     st.subheader("Engine 2. 공정 환경 영향 시뮬레이터 ")
-    st.info(" 본 시뮬레이터는 화학적 조성(불소 유무), 용매의 독성(VOC), 끓는점(Boiling Point)에 기반한 물리학적 계산 모델을 적용했습니다.")
-    
+    st.info(" 본 시뮬레이터는 실측 데이터베이스(engine2_database.xlsx)와 화학적 조성(불소 유무), 용매의 독성(VOC), 끓는점(Boiling Point)에 기반한 물리학적 계산 모델을 함께 적용했습니다.")
+
     col_input_e2, col_view_e2 = st.columns([1, 2])
-    
+
     with col_input_e2:
         with st.container(border=True): 
             st.markdown("#### 🛠️ 공정 조건 설정 ")
-            s_binder = st.selectbox("Binder Type", ["CMC", "CMGG", "GG", "PVDF"]) 
-            s_solvent = st.radio("Solvent Type", ["Water", "NMP"])
+            s_binder = st.selectbox("Binder Type", ["CMC", "CMGG", "GG", "PVDF"], key="e2_binder")
+            s_solvent = st.radio("Solvent Type", ["Water", "NMP"], key="e2_solvent")
             st.divider()
-            s_temp = st.slider("Drying Temp (°C)", 60, 200, 110)
-            s_time = st.slider("Drying Time (min)", 10, 720, 60) 
-            s_loading = st.number_input("Loading mass (mg/cm²)", 5.0, 30.0, 10.0)
-            
+            s_temp = st.slider("Drying Temp (°C)", 60, 200, 110, key="e2_temp")
+            s_time = st.slider("Drying Time (min)", 10, 720, 60, key="e2_time")
+            s_loading = st.number_input("Loading mass (mg/cm²)", 5.0, 30.0, 10.0, key="e2_loading")
+        
             st.write("")
-            run_e2 = st.button("Engine 2 계산 실행", type="primary", use_container_width=True)
+            interactive_e2 = st.toggle("인터랙티브 차트 (브라우저에서 렌더링)", key="e2_interactive")
+            run_e2 = st.button("Engine 2 계산 실행", type="primary", width="stretch")
 
     with col_view_e2:
         if run_e2:
@@ -574,21 +706,27 @@ with tab_e2:
                 * {s_binder}를 사용하려면 **Water** 용매를 선택해야 합니다.
                 """)
             else:
-                co2, energy, voc, co2_desc, voc_desc = calculate_lca_impact(
-                    s_binder, s_solvent, s_temp, s_loading, s_time
+                co2, energy, voc, co2_desc, voc_desc, source = compute(
+                    estimate_lca_impact, s_binder, s_solvent, s_temp, s_loading, s_time, stage="engine2.lca_impact", lane="light"
                 )
-                
+            
                 col1, col2, col3 = st.columns(3)
                 col1.metric("CO₂ Emission", f"{co2:.4f} kg/m²", delta=co2_desc, delta_color="inverse")
                 col2.metric("Energy Consumption", f"{energy:.4f} kWh/m²", help="Based on Solvent BP")
                 col3.metric("VOC Emission", f"{voc:.4f} g/m²", delta=voc_desc, delta_color="inverse")
-                
+                source_note = {
+                    "measured": "📚 engine2_database.xlsx 실측값과 정확히 일치하는 조건입니다.",
+                    "regression": "📈 engine2_database.xlsx 실측값으로 맞춘 회귀식 추정값입니다 (건조 에너지는 물리 모델로 환산).",
+                    "model": "🧮 실측 데이터가 없는 조합이라 물리 기반 계산 모델 값을 표시합니다.",
+                }[source]
+                st.caption(source_note)
+            
                 st.divider()
-                
+            
                 # [수정] 아래 섹션도 왼쪽 설정 박스와 동일한 스타일 적용 (배경색 및 테두리)
                 with st.container(border=True):
                     st.markdown("#### 📋 Scientific Basis & Comparative Analysis")
-                    
+                
                     with st.expander("ℹ️ 산출 근거 및 상세 분석 (Click to expand)", expanded=True):
                         st.markdown("##### 1. VOC & Solvent Toxicity")
                         if s_solvent == "NMP": st.write("🔴 **NMP (유기용매):** 높은 독성 및 VOC 발생. 배기 정화 설비 필수.")
@@ -601,42 +739,124 @@ with tab_e2:
                         st.markdown("##### 3. Process Energy (Drying)")
                         bp = 204.1 if s_solvent == "NMP" else 100
                         st.write(f"Solvent BP: **{bp}°C** vs Drying Temp: **{s_temp}°C**")
-                        
+                    
                         st.divider()
                         st.markdown("##### 📊 Impact Comparison (vs NMP/PVDF Reference)")
-                        
-                        ref_vals = calculate_lca_impact("PVDF", "NMP", 130, s_loading, 60)[:3]
+                    
+                        ref_vals = compute(estimate_lca_impact, "PVDF", "NMP", 130, s_loading, 60, stage="engine2.lca_impact", lane="light")[:3]
                         cur_vals = [co2, energy, voc]
-                        
-                        fig, ax = plt.subplots(figsize=(8, 4))
-                        x = np.arange(3); width = 0.35
-                        rects1 = ax.bar(x - width/2, ref_vals, width, label='Ref (NMP/PVDF)', color='#FF8A80', alpha=0.7)
-                        rects2 = ax.bar(x + width/2, cur_vals, width, label='Current Settings', color='#69F0AE', edgecolor='k')
-                        ax.set_xticks(x); ax.set_xticklabels(['CO₂', 'Energy', 'VOC'])
-                        ax.set_ylabel('Impact Value'); ax.legend(); ax.grid(axis='y', linestyle=':')
-                        
-                        def autolabel(rects):
-                            for rect in rects:
-                                h = rect.get_height()
-                                ax.annotate(f'{h:.2f}', xy=(rect.get_x()+rect.get_width()/2, h), xytext=(0,3), textcoords="offset points", ha='center', fontsize=9)
-                        autolabel(rects1); autolabel(rects2)
-                        st.pyplot(fig)
+                    
+                        groups = [('Ref (NMP/PVDF)', ref_vals, '#FF8A80', None),
+                                  ('Current Settings', cur_vals, '#69F0AE', 'k')]
+                        if interactive_e2:
+                            with profiling.span("chart.altair"):
+                                st.altair_chart(charts.grouped_bar_altair(['CO₂', 'Energy', 'VOC'], groups, 'Impact Value'), width="stretch")
+                        else:
+                            with profiling.span("chart.png"):
+                                st.image(charts.grouped_bar_png(['CO₂', 'Energy', 'VOC'], groups, 'Impact Value'), width="stretch")
 
         else:
             st.info("좌측 패널에서 공정 조건을 설정하고 [Engine 2 계산 실행]을 눌러주세요.")
 
+    # 공정 조건 격자 스윕: 유효한 조합 전체를 한 번에 평가하여 Pareto 최적 조합 탐색
+    with st.expander("🔎 공정 조건 스윕 & Pareto 최적 조합 (Process Sweep)"):
+        sw_col1, sw_col2 = st.columns(2)
+        with sw_col1:
+            sw_binders = st.multiselect("Binder Type", ["CMC", "CMGG", "GG", "PVDF"], default=["CMC", "CMGG", "GG", "PVDF"], key="sw_binders")
+            sw_solvents = st.multiselect("Solvent Type", ["Water", "NMP"], default=["Water", "NMP"], key="sw_solvents")
+            sw_steps = st.select_slider("격자 해상도 (축당 점 수)", [10, 25, 50, 100, 150], value=50, key="sw_steps")
+        with sw_col2:
+            sw_temp = st.slider("Drying Temp 범위 (°C)", 60, 200, (60, 200), key="sw_temp")
+            sw_time = st.slider("Drying Time 범위 (min)", 10, 720, (10, 720), key="sw_time")
+            sw_loading = st.slider("Loading mass 범위 (mg/cm²)", 5.0, 30.0, (5.0, 30.0), key="sw_loading")
+        run_sweep = st.button("스윕 실행", key="sw_run")
+        if run_sweep:
+            import pandas as pd
+            pareto, n_total, n_valid = compute(
+                sweep_grid, tuple(sw_binders), tuple(sw_solvents), tuple(sw_temp), tuple(sw_time), tuple(sw_loading), sw_steps,
+                stage="engine2.sweep",
+            )
+            st.caption(f"격자점 {n_total:,}개 평가 (유효 조합 {n_valid:,}개) → Pareto 최적 {len(pareto['CO2_kg_per_m2']):,}개")
+            if n_valid == 0:
+                st.warning("⚠️ 선택한 바인더/용매 중 유효한 조합이 없습니다.")
+            else:
+                st.dataframe(pd.DataFrame(pareto), width="stretch", hide_index=True)
+
+    # 전역 민감도 분석: 스윕 범위 안에서 어떤 공정 변수가 CO₂/에너지/VOC를 가장 크게 좌우하는지
+    with st.expander("🎯 공정 변수 민감도 분석 (Sobol Indices)"):
+        st.caption("위 스윕의 용매 · 온도 · 시간 · 로딩량 범위에서 Sobol 준난수 표본을 평가해 변수별 1차(S1) · 전체(ST) 지수와 "
+                   "95% 부트스트랩 신뢰구간을 계산합니다. S1은 단독 영향, ST − S1은 다른 변수와의 상호작용 몫입니다.")
+        sa_samples = st.select_slider("기본 표본 수 N (평가 횟수 = N × 6)", [1 << 12, 1 << 14, 1 << 16, 1 << 18], value=1 << 14,
+                                      format_func=lambda n: f"{n:,}", key="sa_samples")
+        if st.button("민감도 분석 실행", key="sa_run", disabled=not sw_solvents):
+            import pandas as pd
+            result = compute(
+                lca_sensitivity, tuple(sw_solvents), tuple(sw_temp), tuple(sw_time), tuple(sw_loading), sa_samples,
+                stage="engine2.sensitivity",
+            )
+            st.caption(f"모델 평가 {result.n_evals:,}회 · {result.n_evals / max(result.eval_seconds, 1e-9) / 1e6:.1f}M회/초")
+            labels = ["Temp", "Time", "Loading", "Solvent"]
+            groups = [(output.split("_")[0], np.nan_to_num(result.total[o]), color, None)
+                      for o, (output, color) in enumerate(zip(result.outputs, ["#8D6E63", "#FFB74D", "#9575CD"]))]
+            if interactive_e2:
+                with profiling.span("chart.altair"):
+                    st.altair_chart(charts.grouped_bar_altair(labels, groups, "Total-order index (ST)"), width="stretch")
+            else:
+                with profiling.span("chart.png"):
+                    st.image(charts.grouped_bar_png(labels, groups, "Total-order index (ST)"), width="stretch")
+            st.dataframe(pd.DataFrame(result_table(result)).round(3), width="stretch", hide_index=True)
+
+    # 수명(Engine 1) · 환경(Engine 2) 공동 최적화: 공정 조건 -> 열화 속도 -> EOL 사이클과 CO₂/에너지의 trade-off
+    with st.expander("⚖️ 수명 · 환경 공동 최적화 (NSGA-II)"):
+        st.caption("위 스윕의 바인더 · 온도 · 시간 · 로딩량 범위에서 공정 조건이 Engine 1 열화 속도에 주는 영향(잔류 용매, 과열, 전극 두께)을 "
+                   "반영해 EOL 사이클(최대화)과 활물질 kg당 CO₂ · 건조 에너지(최소화)의 Pareto 최적 조합을 찾습니다.")
+        co_col1, co_col2 = st.columns(2)
+        with co_col1:
+            co_pattern = st.selectbox("충/방전 패턴", list(DECAY_RATES), index=1, key="co_pattern")
+        with co_col2:
+            co_generations = st.select_slider("세대 수 (세대당 후보 100개)", [10, 20, 40, 80], value=40, key="co_generations")
+        if st.button("공동 최적화 실행", key="co_run", disabled=not sw_binders):
+            import pandas as pd
+            result = compute(
+                co_optimize_cached, co_pattern, tuple(sw_binders), tuple(sw_temp), tuple(sw_time), tuple(sw_loading), co_generations,
+                100, 0, os.cpu_count() or 1,   # 세대당 후보 수, seed, 병렬 작업 수 (공유 프로세스 풀)
+                stage="cooptimize.nsga2",
+            )
+            front = result.front
+            st.caption(f"후보 {result.n_evaluated:,}개 평가 (새로 계산 {result.n_computed:,}개, 나머지는 메모 캐시) · "
+                       f"{result.seconds:.2f}초 → Pareto 최적 {len(front['EOL_Cycle']):,}개")
+
+            def build_front():
+                # CO₂/kg는 바인더로 정해지므로 바인더별 색으로 구분
+                colors = {"PVDF": "#dc3545", "CMC": "#1f77b4", "CMGG": "#2E7D32", "GG": "#EF6C00"}
+                layers = []
+                for binder in dict.fromkeys(front["Binder_Type"]):
+                    sel = front["Binder_Type"] == binder
+                    layers.append(charts.scatter(front["Energy_kWh_per_kg"][sel], front["EOL_Cycle"][sel],
+                                                 f"{binder} (CO₂ {front['CO2_kg_per_kg'][sel][0]:.2f} kg/kg)",
+                                                 colors.get(binder, "black"), size=20))
+                return [charts.panel(layers, f"Pareto Front - {co_pattern}", "Drying Energy (kWh / kg active)", "EOL Cycle")]
+
+            show_chart(("coopt", co_pattern, tuple(sw_binders), tuple(sw_temp), tuple(sw_time), tuple(sw_loading), co_generations),
+                       build_front, figsize=(10, 4), interactive=interactive_e2)
+            st.dataframe(pd.DataFrame(front).round(3), width="stretch", hide_index=True)
+
+
 # ------------------------------------------------------------------------------
 # TAB 4: Our Data
 # ------------------------------------------------------------------------------
-with tab_data:
+@tab_fragment("tab.our_data")
+def render_our_data():
     st.markdown(header_html, unsafe_allow_html=True)
-    
+
     st.subheader("Our Data. 실제 실험 데이터 검증 ")
     st.markdown("  직접 수행한 실험 데이터를 기반으로 Engine 1 Mechanism의 예측 정확도를 검증합니다.")
     st.divider()
 
-    df_results = load_real_case_data()
-    if df_results is None:
+    # (Sample_Type, Data_Type)별 배열 테이블. 기본 CSV와 incoming/ 폴더의 새 파일을 증분 적재하며,
+    # 바뀐 샘플 파티션만 다시 읽음
+    lab_data = compute(load_cycle_store, stage="labdata.load", lane="light")
+    if lab_data is None:
         st.warning("⚠️ 'engine1_output.csv' 파일을 찾을 수 없습니다.")
     else:
         col_case_input, col_case_view = st.columns([1, 2])
@@ -644,8 +864,10 @@ with tab_data:
             with st.container(border=True): 
                 st.markdown("#### 🔋 충/방전 속도")
                 # [수정됨] 괄호 내용 삭제 (Sample A/B/C)
-                option = st.radio("데이터 선택:", ["Slow Charge/Discharge", "Charge/Discharge", "Fast Charge/Discharge"], key="t2_radio")
-                
+                base_options = ["Slow Charge/Discharge", "Charge/Discharge", "Fast Charge/Discharge"]
+                # 새로 적재된 샘플은 기본 세 가지 뒤에 추가
+                option = st.radio("데이터 선택:", base_options + [s for s in lab_data.samples if s not in base_options], key="t2_radio")
+            
                 # [수정됨] 안내문구에서 괄호 삭제 (CMGG, PVDF 등)
                 if option == "Slow Charge/Discharge":
                     csv_key = "Slow Charge/Discharge"
@@ -653,37 +875,145 @@ with tab_data:
                 elif option == "Charge/Discharge":
                     csv_key = "Charge/Discharge"
                     st.warning("⚠️ **Stable**")
-                else: 
+                elif option == "Fast Charge/Discharge":
                     csv_key = "Fast Charge/Discharge"
                     st.error("🚫 **Unstable**")
+                else:
+                    csv_key = option
+                    st.info("🆕 **추가된 실험 데이터**")
+
+                st.divider()
+                regen_pred = st.toggle("AI 모델로 Prediction 재생성", key="t2_regen",
+                                       help="History 데이터로 학습한 RandomForest 모델로 Prediction 구간을 다시 계산합니다.")
+                calib_data = st.toggle("Engine 1 경험식 보정 곡선", key="t2_calib",
+                                       help="History에 Engine 1 열화식(초기 용량, 열화 속도, 가속 지수)을 최소제곱으로 맞춰 함께 표시합니다.")
+                rul_on = st.toggle("온라인 RUL 추정", key="t2_rul",
+                                   help="History 사이클을 셀별 Kalman 필터로 순차 반영해 수명 종료(초기 용량의 80%) 시점과 잔여 수명을 추정합니다.")
+                interactive_data = st.toggle("인터랙티브 차트 (브라우저에서 렌더링)", key="t2_interactive")
 
         with col_case_view:
-            # 매핑된 csv_key로 필터링 (공백 제거된 상태에서 매칭)
-            data = df_results[df_results['Sample_Type'] == csv_key]
-            
-            if not data.empty:
-                hist = data[data['Data_Type'] == 'History']
-                pred = data[data['Data_Type'] == 'Prediction']
-                
-                fig, ax = plt.subplots(figsize=(10, 5))
-                
-                # [수정됨] History: 점 그래프 (원형)
-                ax.scatter(hist['Cycle'], hist['Capacity'], color='black', alpha=0.6, s=25, label='History')
-                
-                # [수정됨] Prediction: 점 그래프 (사각형) - 요청 반영
-                ax.scatter(pred['Cycle'], pred['Capacity'], color='#dc3545', alpha=0.7, s=25, marker='s', label='Prediction')
-                
-                ax.set_title(f"Model Validation - {csv_key}", fontweight='bold')
-                
+            # 매핑된 csv_key로 조회 (공백은 적재 시 정리됨)
+            if csv_key in lab_data:
+                hist = lab_data.get(csv_key, 'History')
+                pred = lab_data.get(csv_key, 'Prediction')
+                if regen_pred and len(pred.cycle):
+                    model = get_surrogate_model()
+                    if csv_key in model.sample_types:
+                        pred = pred._replace(capacity=compute(model.predict, csv_key, pred.cycle, key=(csv_key, lab_data.version), stage="surrogate.predict"))
+                    else:
+                        st.caption("ℹ️ AI 모델은 기본 CSV의 History로 학습되어, 추가된 샘플은 재생성하지 않습니다.")
+
+                # 샘플별 보정 계수 (데이터 해시 기준 캐시, 바뀐 샘플만 다시 맞춤)
+                fits = compute(calibrate_store, lab_data, key=lab_data.version, stage="calibration.fit") if calib_data else {}
+                fit = fits.get(csv_key)
+
+                def build_data():
+                    layers = [
+                        charts.scatter(hist.cycle, hist.capacity, 'History', size=25),
+                        charts.scatter(pred.cycle, pred.capacity, 'Prediction', '#dc3545', marker='s', alpha=0.7, size=25),
+                    ]
+                    if fit is not None:
+                        fit_x = np.arange(1, max(hist.cycle.max(initial=1), pred.cycle.max(initial=1)) + 1)
+                        fit_y = fit.base_capacity * fade_retention(fit.decay_rate, fit_x, fit.acc_fade_rate)
+                        layers.append(charts.line(fit_x, fit_y, 'Engine 1 fit', '#6f42c1', size=2))
+                    return [charts.panel(layers, f"Model Validation - {csv_key}", "Cycle Number", "Specific Capacity (mAh/g)")]
+
+                # [수정됨] History: 점 그래프 (원형) / Prediction: 점 그래프 (사각형)
                 # [수정됨] Y축 레이블 변경 - 요청 반영 (Specific Capacity로 복구됨)
-                ax.set_ylabel("Specific Capacity (mAh/g)")
-                ax.set_xlabel("Cycle Number")
-                ax.grid(True, alpha=0.3)
-                ax.legend()
-                
-                st.pyplot(fig)
-                
-                if not pred.empty:
-                    st.info(f"📊 **AI Report**: 최종 용량 **{pred['Capacity'].iloc[-1]:.2f} mAh/g** 예측됨.")
+                show_chart(
+                    ("data", csv_key, regen_pred, fit, lab_data.version), build_data,
+                    figsize=(10, 5), interactive=interactive_data, height=360,
+                )
+
+                if fit is not None:
+                    hand = f" (수동 설정값 {DECAY_RATES[csv_key]})" if csv_key in DECAY_RATES else ""
+                    st.caption(
+                        f"📐 **보정 결과**: 초기 용량 {fit.base_capacity:.1f} mAh/g · 열화 속도 {fit.decay_rate:.3g}{hand} · "
+                        f"가속 지수 {fit.acc_fade_rate:.4f} · R² {fit.r2:.3f} · RMSE {fit.rmse:.2f} mAh/g "
+                        f"({fit.n_points}점, {fit.iterations}회 반복{'' if fit.converged else ', 미수렴'})"
+                    )
+
+                if rul_on:
+                    tracker = get_rul_tracker()
+                    with profiling.span("rul.update"):
+                        tracker.update_from_store(lab_data)   # 지난 rerun 이후 새로 적재된 사이클만 반영
+                    if csv_key in tracker:
+                        est = tracker.estimate([csv_key])
+                        last, eol = int(est.last_cycle[0]), est.eol[0]
+                        if np.isnan(eol):
+                            outlook = "용량 감소 추세가 없어 수명 종료 시점을 추정할 수 없습니다"
+                        else:
+                            outlook = (f"예상 EOL **{eol:.0f}** 사이클 (90% 구간 {est.eol_low[0]:.0f}–"
+                                       f"{'∞' if np.isnan(est.eol_high[0]) else f'{est.eol_high[0]:.0f}'}) · 잔여 수명 **{est.rul[0]:.0f}** 사이클")
+                        st.caption(f"⏱️ **온라인 RUL**: {last} 사이클까지 반영 · 현재 용량 추정 {est.capacity[0]:.1f} mAh/g · {outlook}")
+
+                if len(pred.capacity):
+                    st.info(f"📊 **AI Report**: 최종 용량 **{pred.capacity[-1]:.2f} mAh/g** 예측됨.")
             else:
                 st.warning(f"⚠️ 선택하신 '{csv_key}'에 대한 데이터를 찾을 수 없습니다.")
+
+    # 새 사이클러 데이터 업로드: 검증 후 (Sample_Type, Cycle) 중복을 제외하고 저장소에 추가
+    with st.expander("📥 새 실험 데이터 추가 (CSV 업로드)"):
+        st.caption("열: Sample_Type(없으면 아래 이름 사용), Cycle, Capacity, Data_Type(없으면 History). "
+                   "incoming/ 폴더에 CSV를 넣어도 자동으로 적재됩니다. 이미 있는 사이클(engine1_output.csv 또는 "
+                   "먼저 적재한 값)은 덮어쓰지 않고 중복으로 셉니다 — 기본 CSV 값을 고치려면 engine1_output.csv를 직접 수정하세요.")
+        up_file = st.file_uploader("사이클러 내보내기 CSV", type=["csv"], key="t2_upload")
+        up_sample = st.text_input("샘플 이름 (파일에 Sample_Type 열이 없을 때)", key="t2_upload_sample")
+        if st.button("데이터 적재", key="t2_ingest", disabled=up_file is None):
+            try:
+                report = ingest_bytes(up_file.getvalue(), up_file.name, sample_type=up_sample.strip() or None,
+                                      base=base_store())
+            except (ValueError, OSError) as e:
+                st.error(f"🚫 적재 실패: {e}")
+            else:
+                if report is None:
+                    st.session_state["t2_ingest_msg"] = "ℹ️ 이미 적재한 파일입니다."
+                else:
+                    st.session_state["t2_ingest_msg"] = (
+                        f"✅ {report.added}개 추가, 중복 {report.duplicates}개 · 잘못된 행 {report.invalid}개 제외 "
+                        f"(갱신된 샘플: {', '.join(s for s, _ in report.partitions) or '없음'})"
+                    )
+                st.rerun(scope="fragment")   # 추가된 파티션을 반영하여 이 탭만 다시 그림
+        if "t2_ingest_msg" in st.session_state:
+            st.success(st.session_state.pop("t2_ingest_msg"))
+
+
+# ==============================================================================
+# [탭 실행] 숨겨진 탭은 건너뜀. st.stop()/st.rerun()/예외로 중단돼도 rerun 측정은 닫고 기록한다
+# ==============================================================================
+try:
+    with profiling.span("app.rerun"):
+        for _tab, _render in ((tab_home, render_home), (tab_e1, render_engine1), (tab_e2, render_engine2),
+                              (tab_data, render_our_data)):
+            with _tab:
+                if _tab.open is not False:
+                    _render()
+finally:
+    run_records = profiling.end_run()
+
+
+# ==============================================================================
+# [디버그] ?debug=1 일 때만 보이는 단계별 측정 패널
+# ==============================================================================
+if debug_mode:
+    with st.sidebar:
+        st.markdown("### 🛠️ Debug · Profiling")
+        st.toggle("tracemalloc 메모리 추적 (다음 rerun부터, 느려짐)", key="dbg_tracemalloc")
+        st.caption(f"이번 rerun #{run_records[-1].run if run_records else '-'} 단계별 측정")
+        st.dataframe(
+            [{"stage": r.stage, "parent": r.parent, "ms": round(r.seconds * 1000, 2),
+              "alloc_blocks": r.alloc_blocks, "peak_KiB": None if r.peak_bytes is None else round(r.peak_bytes / 1024, 1)}
+             for r in run_records],
+            hide_index=True,
+        )
+        st.caption("프로세스 누적 (전체 세션)")
+        st.dataframe(
+            [{"stage": stage, "count": n, "mean_ms": round(mean * 1000, 2), "max_ms": round(mx * 1000, 2),
+              "alloc_blocks": blocks, "peak_KiB": round(peak / 1024, 1)}
+             for stage, n, _, mean, mx, blocks, peak in profiling.summary()],
+            hide_index=True,
+        )
+        st.caption("계산 서비스")
+        st.json({lane: get_compute_service(lane).snapshot() for lane in COMPUTE_LANES}, expanded=False)
+        st.download_button("Prometheus 텍스트 내보내기", profiling.prometheus_text(), "battery_metrics.prom", "text/plain")
+        st.download_button("JSON Lines 내보내기", profiling.jsonl(), "battery_spans.jsonl", "application/x-ndjson")
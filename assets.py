@@ -0,0 +1,161 @@
+import base64
+import hashlib
+import io
+import os
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(current_dir, ".asset_cache")
+
+# ==============================================================================
+# [표시 규격] CSS 표시 크기의 2배(레티나)로 리사이즈한 뒤 재압축
+# ==============================================================================
+AssetSpec = namedtuple("AssetSpec", ["max_width", "max_height", "crop", "fmt", "quality"])
+
+ASSET_SPECS = {
+    "logo_header": AssetSpec(1200, 240, False, "WEBP", 90),   # .top-left-logo (height 120px)
+    "logo_nav": AssetSpec(600, 70, False, "WEBP", 90),        # .top-right-logo (height 35px)
+    "avatar": AssetSpec(200, 200, True, "WEBP", 80),          # .persona-img (100x100, cover)
+    "footer": AssetSpec(640, 320, False, "WEBP", 90),         # 하단 공과대학 로고 (width 320px)
+}
+
+# 화면에서 사용하는 이미지 목록 (배포 전 `python assets.py`로 미리 변환)
+SITE_ASSETS = [
+    ("25logo.png", "logo_header"),
+    ("ajou_sw_logo.png", "logo_nav"),
+    ("ajou_logo.png", "logo_nav"),
+    ("google_logo.png", "logo_nav"),
+    ("01_(국영문)공과대학.png", "footer"),
+] + [(f"Profile{i}.jpeg", "avatar") for i in range(1, 7)]
+
+MIME_TYPES = {"WEBP": "image/webp", "JPEG": "image/jpeg", "PNG": "image/png"}
+EXT_MIME_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp"}
+
+
+def resolve_path(filename):
+    """파일 경로 반환. macOS에서 복사된 한글 파일명(NFD)도 찾을 수 있도록 정규화 형태를 모두 시도"""
+    for form in (None, "NFC", "NFD"):
+        name = unicodedata.normalize(form, filename) if form else filename
+        file_path = os.path.join(current_dir, name)
+        if os.path.exists(file_path):
+            return file_path
+    return None
+
+
+def get_base64_image(filename):
+    """이미지 파일을 읽어 Base64 문자열로 반환 (원본 그대로, 변환 없음)"""
+    if not filename: return None
+    file_path = resolve_path(filename)
+    if file_path is None:
+        return None
+    try:
+        with open(file_path, "rb") as f:
+            data = f.read()
+        return base64.b64encode(data).decode()
+    except Exception:
+        return None
+
+
+def _render_thumbnail(data, spec):
+    """원본 바이트를 규격 크기로 줄이고 지정 포맷으로 재인코딩"""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as im:
+        im = ImageOps.exif_transpose(im)
+        if spec.crop:
+            im = ImageOps.fit(im, (spec.max_width, spec.max_height), Image.LANCZOS)
+        else:
+            im.thumbnail((spec.max_width, spec.max_height), Image.LANCZOS)
+
+        if spec.fmt == "JPEG" and im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        elif im.mode not in ("RGB", "RGBA", "L"):
+            im = im.convert("RGBA")
+
+        out = io.BytesIO()
+        im.save(out, format=spec.fmt, quality=spec.quality, method=6 if spec.fmt == "WEBP" else 0)
+        return out.getvalue()
+
+
+def build_asset(filename, spec):
+    """
+    규격에 맞춘 썸네일 바이트와 MIME 타입을 반환.
+    결과는 (원본 내용 + 규격) 해시로 디스크에 캐시되므로 원본이 바뀌지 않는 한 한 번만 변환한다.
+    """
+    with open(resolve_path(filename), "rb") as f:
+        data = f.read()
+
+    digest = hashlib.sha256(data + repr(tuple(spec)).encode()).hexdigest()[:24]
+    ext = spec.fmt.lower()
+    cache_path = os.path.join(CACHE_DIR, f"{digest}.{ext}")
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as f:
+            return f.read(), MIME_TYPES[spec.fmt]
+
+    try:
+        thumb = _render_thumbnail(data, spec)
+    except Exception:
+        # Pillow가 없거나 디코딩할 수 없는 형식이면 원본을 그대로 사용
+        mime = EXT_MIME_TYPES.get(os.path.splitext(filename)[1].lower(), "application/octet-stream")
+        return data, mime
+
+    # 원본보다 커지는 경우(이미 작은 로고 등)에는 원본 유지
+    if len(thumb) >= len(data):
+        mime = EXT_MIME_TYPES.get(os.path.splitext(filename)[1].lower())
+        if mime:
+            return data, mime
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(thumb)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # 읽기 전용 배포 환경에서는 메모리 캐시만 사용
+    return thumb, MIME_TYPES[spec.fmt]
+
+
+@lru_cache(maxsize=64)
+def _data_uri(filename, mtime_ns, size, spec):
+    thumb, mime = build_asset(filename, spec)
+    return f"data:{mime};base64,{base64.b64encode(thumb).decode()}"
+
+
+def get_data_uri(filename, kind):
+    """
+    표시 규격(kind)에 맞춘 data URI를 반환. 파일이 없으면 None.
+    (파일명, 수정 시각, 크기, 규격) 단위로 메모리에 캐시되므로 rerun마다 stat 한 번만 수행한다.
+    """
+    if not filename: return None
+    file_path = resolve_path(filename)
+    if file_path is None:
+        return None
+    try:
+        st_ = os.stat(file_path)
+    except OSError:
+        return None
+    try:
+        return _data_uri(filename, st_.st_mtime_ns, st_.st_size, ASSET_SPECS[kind])
+    except Exception:
+        return None
+
+
+def prebuild(files=SITE_ASSETS):
+    """배포 전 디스크 캐시를 미리 채움. files: [(파일명, kind), ...]"""
+    results = []
+    for filename, kind in files:
+        file_path = resolve_path(filename)
+        if file_path is None:
+            continue
+        thumb, mime = build_asset(filename, ASSET_SPECS[kind])
+        results.append((filename, kind, os.path.getsize(file_path), len(thumb), mime))
+    return results
+
+
+if __name__ == "__main__":
+    for filename, kind, src_size, out_size, mime in prebuild():
+        print(f"{filename:<32} {kind:<12} {src_size / 1024:9.1f} KB -> {out_size / 1024:7.1f} KB ({mime})")
@@ -0,0 +1,91 @@
+"""
+동시 접속 벤치마크: 여러 세션이 한꺼번에 Engine 1 Monte Carlo를 요청할 때
+세션 스레드에서 바로 계산하는 경우와 공유 계산 서비스(compute.ComputeService)를 거치는 경우를 비교.
+
+    python benchmarks/concurrency.py [--sessions 60] [--distinct 6] [--draws 2000] [--json out.json]
+
+세션마다 distinct개 조건 중 하나를 요청하므로, 서비스를 거치면 같은 조건의 진행 중인 계산이 합쳐진다.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compute import ComputeService   # noqa: E402
+from engine1 import DECAY_RATES      # noqa: E402
+from montecarlo import run_monte_carlo   # noqa: E402
+
+
+def make_requests(n_sessions, n_distinct):
+    patterns = list(DECAY_RATES)
+    return [(patterns[i % n_distinct % len(patterns)], 185.0 + 10 * (i % n_distinct), 1000) for i in range(n_sessions)]
+
+
+def run_sessions(requests, handler):
+    """세션마다 스레드 하나로 동시에 요청하고 (세션별 지연 시간, 전체 시간) 반환"""
+    latencies = [0.0] * len(requests)
+    barrier = threading.Barrier(len(requests))
+
+    def session(i, req):
+        barrier.wait()
+        t0 = time.perf_counter()
+        handler(req)
+        latencies[i] = time.perf_counter() - t0
+
+    threads = [threading.Thread(target=session, args=(i, r)) for i, r in enumerate(requests)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return np.array(latencies), time.perf_counter() - t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=60)
+    parser.add_argument("--distinct", type=int, default=6)
+    parser.add_argument("--draws", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=None, help="계산 서비스 작업 스레드 수")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    requests = make_requests(args.sessions, args.distinct)
+    counter = {"direct": 0, "service": 0}
+    lock = threading.Lock()
+
+    def work(mode, req):
+        with lock:
+            counter[mode] += 1
+        pattern, cap, cycles = req
+        # 프로세스 풀 대신 현재 스레드에서 계산 (세션 스레드가 CPU를 직접 쓰는 상황)
+        return run_monte_carlo(DECAY_RATES[pattern], cap, cycles, n_draws=args.draws, seed=0, workers=1)
+
+    results = {}
+    lat, wall = run_sessions(requests, lambda req: work("direct", req))
+    results["direct"] = {"computations": counter["direct"], "wall_seconds": wall,
+                         "p50_seconds": float(np.median(lat)), "p95_seconds": float(np.percentile(lat, 95))}
+
+    service = ComputeService(workers=args.workers, max_pending=64, queue_timeout=120.0)
+    lat, wall = run_sessions(requests, lambda req: service.run(req, work, "service", req))
+    results["service"] = {"computations": counter["service"], "wall_seconds": wall,
+                          "p50_seconds": float(np.median(lat)), "p95_seconds": float(np.percentile(lat, 95)),
+                          **service.snapshot()}
+    service.shutdown()
+
+    for mode, r in results.items():
+        print(f"{mode:<8} computations={r['computations']:>3}  wall={r['wall_seconds']:6.2f}s  "
+              f"p50={r['p50_seconds']:6.2f}s  p95={r['p95_seconds']:6.2f}s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"sessions": args.sessions, "distinct": args.distinct, "draws": args.draws, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+핫패스 벤치마크: 계산 코어의 주요 함수를 반복 측정하고 저장된 기준값(baseline)과 비교.
+
+    python benchmarks/hotpaths.py [--filter engine1] [--json out.json]
+    python benchmarks/hotpaths.py --save-baseline            # benchmarks/baseline.json 갱신
+    python benchmarks/hotpaths.py --filter rul --update-baseline   # 선택한 항목만 기준값에 추가/갱신
+    python benchmarks/hotpaths.py --baseline benchmarks/baseline.json [--threshold 1.5]
+
+각 항목은 한 번 호출 시간이 min_time 이상이 되도록 반복 횟수를 자동으로 맞춘 뒤 repeat번 측정하며,
+호출당 최솟값이 기준값보다 threshold배 이상 느려지면 회귀로 보고 종료 코드 1을 반환한다.
+기계 전체의 속도 차이는 고정 작업(calibration) 시간 비율로 보정한다. 공유 서버에서는 측정 흔들림이
+크므로, 배포 전 비교는 다른 작업이 없는 같은 기계에서 기준값을 만들고 실행하는 것을 권장한다.
+"""
+import argparse
+import atexit
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import api    # noqa: E402
+import assets    # noqa: E402
+import calibration   # noqa: E402
+import charts    # noqa: E402
+import cooptimize   # noqa: E402
+import degradation   # noqa: E402
+import engine1   # noqa: E402
+import engine2   # noqa: E402
+import labdata   # noqa: E402
+import montecarlo   # noqa: E402
+import rul   # noqa: E402
+import sensitivity   # noqa: E402
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+
+# ==============================================================================
+# [측정 항목] 이름 -> (준비 함수, 측정 함수). 준비 함수의 반환값이 측정 함수의 인자가 된다.
+# ==============================================================================
+def _engine1_cases():
+    cases = {}
+    for cycles in (200, 2000, 20000):
+        cases[f"engine1.predict_life_and_ce[{cycles}]"] = (
+            lambda: np.random.default_rng(0),
+            lambda rng, cycles=cycles: engine1.predict_life_and_ce(2.5, 185.0, cycles, rng=rng),
+        )
+    cases["engine1.predict_life_and_ce_batch[1000x2000]"] = (
+        lambda: (np.random.default_rng(0), np.linspace(0.5, 8.0, 1000)),
+        lambda a: engine1.predict_life_and_ce_batch(a[1], 185.0, 2000, rng=a[0]),
+    )
+    cases["engine1.simulate_patterns[3x2000, uncached]"] = (
+        lambda: tuple(engine1.DECAY_RATES),
+        lambda patterns: engine1.simulate_patterns.__wrapped__(patterns, 350.0, 2000, 42),
+    )
+    cases["engine1.summarize_stream[1000x20000]"] = (
+        lambda: np.linspace(0.01, 0.2, 1000),
+        lambda d: engine1.summarize_stream(d, 185.0, 20000, rng=0),
+    )
+    cases["engine1.solve_eol_cycles[100k]"] = (
+        lambda: np.linspace(0.1, 10.0, 100_000),
+        lambda d: engine1.solve_eol_cycles(d),
+    )
+    cases["degradation.integrate_degradation[1000x2000]"] = (
+        lambda: np.linspace(0.2, 3.0, 1000),
+        lambda c: degradation.integrate_degradation(c, 25.0, 2000),
+    )
+    cases["calibration.fit_fade_batch[100x1000]"] = (
+        lambda: [engine1.predict_life_and_ce(d, 185.0, 1000, rng=i)[:2] for i, d in enumerate(np.linspace(0.5, 8.0, 100))],
+        lambda series: calibration.fit_fade_batch(series),
+    )
+    cases["rul.RulTracker.update[10000 cells]"] = (
+        _rul_setup,
+        lambda a: a[0].update(a[1], np.full(len(a[1]), next(a[2])), a[3]),
+    )
+    cases["rul.RulTracker.estimate[10000 cells]"] = (
+        lambda: _rul_setup()[0],
+        lambda tracker: tracker.estimate(),
+    )
+    cases["montecarlo.run_monte_carlo[2000 draws]"] = (
+        lambda: None,
+        lambda _: montecarlo.run_monte_carlo(2.5, 185.0, 1000, n_draws=2000, seed=0, workers=1),
+    )
+    return cases
+
+
+def _rul_setup():
+    # 셀 10000개에 10사이클씩 반영해 둔 추정기 + 다음 사이클 번호 생성기 (호출마다 새 사이클 하나)
+    cells = [f"cell-{i}" for i in range(10_000)]
+    capacity = np.random.default_rng(0).normal(185.0, 1.0, len(cells))
+    tracker = rul.RulTracker()
+    for n in range(1, 11):
+        tracker.update(cells, np.full(len(cells), n), capacity)
+    return tracker, cells, itertools.count(11), capacity
+
+
+def _engine2_cases():
+    n = 100_000
+
+    def bulk_inputs():
+        rng = np.random.default_rng(0)
+        binders = rng.choice(["CMC", "CMGG", "GG", "PVDF"], n)
+        solvents = np.where(binders == "PVDF", "NMP", "Water")
+        return binders, solvents, rng.uniform(60, 200, n), rng.uniform(5, 30, n), rng.uniform(10, 720, n)
+
+    return {
+        "engine2.calculate_lca_impact[single]": (
+            lambda: None,
+            lambda _: engine2.calculate_lca_impact("CMC", "Water", 110, 10.0, 60),
+        ),
+        f"engine2.calculate_lca_impact[loop {n // 100}]": (
+            lambda: list(zip(*(col[:n // 100].tolist() for col in bulk_inputs()))),
+            lambda rows: [engine2.calculate_lca_impact(*r) for r in rows],
+        ),
+        f"engine2.calculate_lca_impact_batch[{n}]": (
+            bulk_inputs,
+            lambda cols: engine2.calculate_lca_impact_batch(*cols),
+        ),
+        "engine2.estimate_lca_impact[warm]": (
+            lambda: engine2.estimate_lca_impact("CMC", "Water", 110, 10.0, 60),
+            lambda _: engine2.estimate_lca_impact("CMC", "Water", 110, 10.0, 60),
+        ),
+        "engine2.sweep_lca_grid[50^3 x 4 binders]": (
+            lambda: np.linspace(0, 1, 50),
+            lambda t: engine2.sweep_lca_grid(["CMC", "CMGG", "GG", "PVDF"], ["Water", "NMP"],
+                                            60 + 140 * t, 10 + 710 * t, 5 + 25 * t),
+        ),
+        "sensitivity.lca_sensitivity[2^16 x 6, 200 bootstrap]": (
+            lambda: None,
+            lambda _: sensitivity.lca_sensitivity.__wrapped__(n_base=1 << 16),
+        ),
+        "cooptimize.co_optimize[100 x 40, cold memo]": (
+            lambda: None,
+            lambda _: (cooptimize._memo.clear(), cooptimize.co_optimize(pop_size=100, generations=40)),
+        ),
+    }
+
+
+def _labdata_cases():
+    # 실험 데이터 적재: 원본 CSV 파싱(cold), 빈 저장소로 처음 적재(cold), 변경 없는 rerun(warm)
+    def fresh_store():
+        store_dir = tempfile.mkdtemp(prefix="bench_labdata_")
+        atexit.register(shutil.rmtree, store_dir, True)
+        return store_dir
+
+    def cold_store(store_dir):
+        try:
+            labdata._seen_sources.clear()
+            labdata._read_partition.cache_clear()
+            labdata._load_store.cache_clear()
+            return labdata.load_cycle_store(store_dir=store_dir, watch_dir=os.path.join(store_dir, "none"))
+        finally:
+            shutil.rmtree(store_dir, ignore_errors=True)
+            os.makedirs(store_dir, exist_ok=True)
+
+    def warm_store():
+        store_dir = fresh_store()
+        labdata.load_cycle_store(store_dir=store_dir, watch_dir=os.path.join(store_dir, "none"))
+        return store_dir
+
+    return {
+        "labdata.read_cycle_csv[cold]": (lambda: None, lambda _: labdata.read_cycle_csv()),
+        "labdata.load_cycle_store[cold]": (fresh_store, cold_store),
+        "labdata.load_cycle_store[warm]": (
+            warm_store,
+            lambda d: labdata.load_cycle_store(store_dir=d, watch_dir=os.path.join(d, "none")),
+        ),
+    }
+
+
+def _asset_cases():
+    cases = {}
+    for filename, kind in assets.SITE_ASSETS:
+        if assets.resolve_path(filename) is None:
+            continue
+        cases[f"assets.get_base64_image[{filename}]"] = (lambda: None, lambda _, f=filename: assets.get_base64_image(f))
+    cases["assets.get_data_uri[all, warm]"] = (
+        lambda: [assets.get_data_uri(f, k) for f, k in assets.SITE_ASSETS],
+        lambda _: [assets.get_data_uri(f, k) for f, k in assets.SITE_ASSETS],
+    )
+    return cases
+
+
+def _chart_cases():
+    # 각 탭의 그래프를 app.py와 같은 사양으로 만들고 PNG(서버 렌더링)와 Vega-Lite JSON(브라우저 렌더링)으로 변환
+    def engine1_panels():
+        x, cap, ce = engine1.predict_life_and_ce_batch(list(engine1.DECAY_RATES.values()), 350.0, 2000, rng=0)
+        return [
+            charts.panel([charts.scatter(x[:100], cap[0, :100], 'Input Data')]
+                         + [charts.scatter(x[100:], c[100:], p, col) for p, c, col in zip(engine1.DECAY_RATES, cap, ['g', 'orange', 'r'])],
+                         "Performance Prediction", None, "Specific Capacity (mAh/g)"),
+            charts.panel([charts.scatter(x, c, p) for p, c in zip(engine1.DECAY_RATES, ce)],
+                         None, "Cycle Number", "Coulombic Efficiency (%)", (98.0, 100.1)),
+        ]
+
+    def monte_carlo_panels():
+        mc = montecarlo.run_monte_carlo(2.5, 350.0, 2000, n_draws=500, seed=0, workers=1)
+        return [
+            charts.panel([charts.band(mc.x, mc.cap_quantiles[0], mc.cap_quantiles[2], 'P5–P95', 'orange'),
+                          charts.line(mc.x, mc.cap_quantiles[1], 'P50', 'orange')], "Performance Prediction", None, "Capacity"),
+            charts.panel([charts.band(mc.x, mc.ce_quantiles[0], mc.ce_quantiles[2], color='b'),
+                          charts.line(mc.x, mc.ce_quantiles[1], color='b')], None, "Cycle Number", "CE", (99.5, 100.1)),
+        ]
+
+    def data_panels():
+        store = labdata.read_cycle_csv()
+        hist, pred = store.get("Fast Charge/Discharge", "History"), store.get("Fast Charge/Discharge", "Prediction")
+        return [charts.panel([charts.scatter(hist.cycle, hist.capacity, 'History', size=25),
+                              charts.scatter(pred.cycle, pred.capacity, 'Prediction', '#dc3545', marker='s', size=25)],
+                             "Model Validation", "Cycle Number", "Specific Capacity (mAh/g)")]
+
+    groups = [('Ref (NMP/PVDF)', [0.45, 0.9, 3.0], '#FF8A80', None), ('Current Settings', [0.13, 0.02, 0.0], '#69F0AE', 'k')]
+    return {
+        "charts.engine1_overlay[png]": (engine1_panels, lambda p: charts.render_png(p, figsize=(10, 8))),
+        "charts.engine1_overlay[vega-lite]": (engine1_panels, lambda p: charts.altair_chart(p).to_json()),
+        "charts.engine1_monte_carlo[png]": (monte_carlo_panels, lambda p: charts.render_png(p, figsize=(10, 8))),
+        "charts.engine2_bars[png]": (lambda: groups, lambda g: charts.grouped_bar_png(['CO₂', 'Energy', 'VOC'], g, 'Impact Value')),
+        "charts.engine2_bars[vega-lite]": (lambda: groups, lambda g: charts.grouped_bar_altair(['CO₂', 'Energy', 'VOC'], g, 'Impact Value').to_json()),
+        "charts.our_data[png]": (data_panels, lambda p: charts.render_png(p, figsize=(10, 5))),
+        "charts.our_data[vega-lite]": (data_panels, lambda p: charts.altair_chart(p).to_json()),
+    }
+
+
+def _api_cases():
+    request = {"scenarios": [{"decay_rate": d} for d in np.linspace(0.5, 8.0, 200)], "trajectory": True}
+
+    def trajectory_frame():
+        return api.handle_engine1(request)
+
+    def warm_client():
+        client = api.LocalClient(api.ApiApp())
+        client.post("/v1/engine1", request, {"Accept-Encoding": "gzip"})
+        return client
+
+    return {
+        "api.encode[200x1000 trajectory, json]": (trajectory_frame, lambda df: api.encode(df, "json")),
+        "api.encode[200x1000 trajectory, arrow]": (trajectory_frame, lambda df: api.encode(df, "arrow")),
+        "api.LocalClient.post[200x1000 trajectory, gzip cache hit]": (
+            warm_client,
+            lambda client: client.post("/v1/engine1", request, {"Accept-Encoding": "gzip"}),
+        ),
+    }
+
+
+def all_cases():
+    cases = {}
+    for group in (_engine1_cases, _engine2_cases, _labdata_cases, _asset_cases, _chart_cases, _api_cases):
+        cases.update(group())
+    return cases
+
+
+# ==============================================================================
+# [측정 및 비교]
+# ==============================================================================
+def measure(setup, fn, min_time=0.2, repeat=5):
+    """호출당 시간(초) 목록. 준비 함수는 한 번만 실행하고, 첫 호출(import 등)은 측정에서 제외."""
+    arg = setup()
+    timer = timeit.Timer(lambda: fn(arg))
+    loops = 1
+    while timer.timeit(loops) < min_time:
+        loops *= 2
+    return [t / loops for t in timer.repeat(repeat, loops)], loops
+
+
+def _calibration_workload():
+    # 코드와 무관한 고정 작업 (파이썬 루프 + numpy 연산): 측정 시점의 기계 속도 기준
+    total = 0
+    for i in range(20000):
+        total += i * i
+    a = np.arange(200_000, dtype=float)
+    return total + float(np.sqrt(a).sum())
+
+
+def calibrate(repeat=7):
+    """고정 작업의 호출당 최소 시간(초)"""
+    times, _ = measure(lambda: None, lambda _: _calibration_workload(), 0.1, repeat)
+    return min(times)
+
+
+def compare(results, baseline, threshold, speed=1.0):
+    """
+    기준값 대비 최솟값 비율. 반환: [(이름, 비율, 회귀 여부)] (기준값이 없는 항목은 비율 None)
+    (최솟값은 다른 프로세스 간섭을 가장 적게 받은 측정이라 중앙값보다 흔들림이 작다)
+    speed: 기준값 측정 때 대비 현재 기계가 느린 배수 (비율을 이 값으로 나눠 기계 속도 변화를 보정)
+    """
+    rows = []
+    for name, r in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            rows.append((name, None, False))
+            continue
+        ratio = r["min_seconds"] / base["min_seconds"] / speed
+        rows.append((name, ratio, ratio >= threshold))
+    return rows
+
+
+def _fmt_time(seconds):
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.0f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="이름에 이 문자열이 들어간 항목만 실행")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="측정 1회의 최소 시간(초)")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--baseline", help="비교할 기준값 JSON (기본: 있으면 benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="결과를 benchmarks/baseline.json으로 저장")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="실행한 항목만 기존 기준값에 추가/갱신 (기준값의 기계 속도로 환산해 저장)")
+    parser.add_argument("--threshold", type=float, default=1.5, help="기준값 대비 이 배수 이상 느리면 회귀")
+    parser.add_argument("--no-normalize", action="store_true", help="기계 속도(고정 작업 시간) 보정을 하지 않음")
+    args = parser.parse_args(argv)
+
+    calibration_start = calibrate()
+
+    cases = {k: v for k, v in all_cases().items() if not args.filter or args.filter in k}
+    results = {}
+    for name, (setup, fn) in cases.items():
+        times, loops = measure(setup, fn, args.min_time, args.repeat)
+        results[name] = {
+            "median_seconds": statistics.median(times),
+            "min_seconds": min(times),
+            "stdev_seconds": statistics.stdev(times) if len(times) > 1 else 0.0,
+            "loops": loops,
+        }
+        print(f"{name:<52} {_fmt_time(results[name]['median_seconds'])}  (x{loops})", flush=True)
+
+    calibration = (calibration_start + calibrate()) / 2   # 실행 중 기계 속도 변화를 줄이기 위해 앞뒤 평균
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "calibration_seconds": calibration,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    status = 0
+    baseline_path = args.baseline or (BASELINE_PATH if os.path.exists(BASELINE_PATH) and not args.save_baseline else None)
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        base_calibration = baseline.get("meta", {}).get("calibration_seconds")
+        speed = calibration / base_calibration if base_calibration and not args.no_normalize else 1.0
+        rows = compare(results, baseline, args.threshold, speed)
+        print(f"\n기준값 비교 ({os.path.relpath(baseline_path, ROOT)}, 회귀 기준 x{args.threshold}, 기계 속도 보정 x{speed:.2f})")
+        for name, ratio, regressed in rows:
+            if ratio is None:
+                print(f"{'no base':<10} {name:<52}   (--update-baseline으로 기준값 추가)")
+            else:
+                print(f"{'REGRESSION' if regressed else 'ok':<10} {name:<52} x{ratio:5.2f}")
+        if any(regressed for _, _, regressed in rows):
+            status = 1
+    if args.update_baseline and os.path.exists(BASELINE_PATH):
+        # 다른 항목과 같은 기준으로 비교되도록 기준값 측정 때의 기계 속도로 환산해 합침
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            merged = json.load(f)
+        base_calibration = merged.get("meta", {}).get("calibration_seconds")
+        scale = base_calibration / calibration if base_calibration and not args.no_normalize else 1.0
+        for name, r in results.items():
+            merged.setdefault("results", {})[name] = dict(
+                r, **{k: r[k] * scale for k in ("median_seconds", "min_seconds", "stdev_seconds")})
+        report = merged
+    if args.save_baseline or args.update_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n기준값 저장: {os.path.relpath(BASELINE_PATH, ROOT)}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+rerun 지연 시간 벤치마크: 실제 Streamlit 서버를 띄우고 브라우저와 같은 websocket 프로토콜로
+위젯 조작을 보내, 같은 조작을 전체 rerun으로 처리할 때와 탭 fragment만 다시 실행할 때를 비교.
+
+    python benchmarks/reruns.py [--repeat 20] [--port 8597] [--json out.json]
+
+각 조작마다 '조작 전송 -> script_finished 수신' 시간과 받은 메시지 수/바이트를 잰다.
+전체 rerun은 fragment 도입 전 동작(위젯 하나만 바꿔도 스크립트 전체 실행)과 같다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (이름, 탭 라벨, 위젯 key, 값 생성 함수(i) -> (WidgetState 필드, 값))
+INTERACTIONS = [
+    ("engine1: 초기 용량 입력", "  Engine 1  ", "t1_cap", lambda i: ("double_value", 300.0 + i)),
+    ("engine2: 건조 온도 슬라이더", "  Engine 2  ", "e2_temp", lambda i: ("double_array_value", [100.0 + i])),
+    ("our data: 샘플 선택", "  Our Data  ", "t2_radio", lambda i: ("int_value", i % 3)),
+]
+FINISHED = {0: "ok", 1: "rerun", 2: "error", 3: "fragment ok"}
+
+
+def start_server(port):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", os.path.join(ROOT, "app.py"),
+         "--server.headless", "true", "--server.port", str(port),
+         "--server.enableXsrfProtection", "false", "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).read()
+            return proc
+        except OSError:
+            time.sleep(0.3)
+    proc.terminate()
+    raise RuntimeError("Streamlit 서버가 시작되지 않았습니다")
+
+
+class Session:
+    """브라우저 한 탭처럼 rerun 요청을 보내고 결과 메시지를 받는 최소 클라이언트"""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}     # key -> (위젯 id, fragment id)
+        self.states = {}      # 위젯 id -> (필드, 값)
+
+    async def rerun(self, fragment_id=""):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        msg.rerun_script.fragment_id = fragment_id
+        for widget_id, (field, value) in self.states.items():
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            if field.endswith("_array_value"):
+                getattr(state, field).data.extend(value)
+            else:
+                setattr(state, field, value)
+
+        t0 = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        n_msgs = n_bytes = 0
+        while True:
+            raw = await self.ws.recv()
+            n_msgs += 1
+            n_bytes += len(raw)
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            kind = fwd.WhichOneof("type")
+            if kind == "delta":
+                self._collect(fwd.delta)
+            elif kind == "script_finished":
+                return time.perf_counter() - t0, n_msgs, n_bytes, FINISHED.get(fwd.script_finished, fwd.script_finished)
+
+    def _collect(self, delta):
+        if delta.WhichOneof("type") == "add_block" and delta.add_block.WhichOneof("type") == "tab_container":
+            self.widgets["main_tabs"] = (delta.add_block.id, "")
+        elif delta.WhichOneof("type") == "new_element":
+            element = getattr(delta.new_element, delta.new_element.WhichOneof("type"))
+            widget_id = getattr(element, "id", "")
+            if widget_id.startswith("$$ID-"):
+                self.widgets[widget_id.split("-", 2)[2]] = (widget_id, delta.fragment_id)
+
+    def set(self, key, field, value):
+        self.states[self.widgets[key][0]] = (field, value)
+
+
+async def run_benchmark(port, repeat):
+    import websockets
+
+    results = {}
+    async with websockets.connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None) as ws:
+        session = Session(ws)
+        await session.rerun()   # 첫 로드 (Home)
+        for name, tab, key, value_fn in INTERACTIONS:
+            session.set("main_tabs", "string_value", tab)
+            await session.rerun()
+            if key not in session.widgets:
+                raise RuntimeError(f"위젯 '{key}'을 찾지 못했습니다")
+            fragment_id = session.widgets[key][1]
+            row = {}
+            for mode, frag in (("full", ""), ("fragment", fragment_id)):
+                times, msgs, sizes, status = [], [], [], set()
+                for i in range(repeat + 2):
+                    session.set(key, *value_fn(i))
+                    seconds, n_msgs, n_bytes, finished = await session.rerun(frag)
+                    if i >= 2:   # 처음 두 번은 캐시 준비
+                        times.append(seconds)
+                        msgs.append(n_msgs)
+                        sizes.append(n_bytes)
+                    status.add(finished)
+                row[mode] = {"p50_ms": float(np.median(times) * 1e3), "p95_ms": float(np.percentile(times, 95) * 1e3),
+                             "messages": float(np.median(msgs)), "bytes": float(np.median(sizes)), "status": sorted(status)}
+            results[name] = row
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8597)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    proc = start_server(args.port)
+    try:
+        results = asyncio.run(run_benchmark(args.port, args.repeat))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    for name, row in results.items():
+        print(name)
+        for mode, r in row.items():
+            print(f"  {mode:<9} p50={r['p50_ms']:8.1f} ms  p95={r['p95_ms']:8.1f} ms  "
+                  f"msgs={r['messages']:4.0f}  bytes={r['bytes']:9,.0f}  ({', '.join(map(str, r['status']))})")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"repeat": args.repeat, "results": results}, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+시작 비용 벤치마크: 계산 코어 import 시간과 app.py 첫 렌더링 시간을 측정.
+
+    python benchmarks/startup.py [--repeat 3] [--json startup.json]
+
+각 측정은 새 파이썬 프로세스에서 실행하여 모듈 캐시의 영향을 받지 않는다.
+무거운 모듈(pandas, matplotlib, sklearn, pyarrow)이 언제 로드되는지도 함께 기록한다.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["streamlit", "pandas", "matplotlib", "sklearn", "pyarrow"]
+CORE_MODULES = ["engine1", "engine2", "montecarlo", "calibration", "degradation", "surrogate", "assets", "charts", "labdata", "compute", "profiling", "parallel", "rul", "sensitivity", "cli", "api", "cooptimize"]
+
+CORE_PROBE = f"""
+import json, sys, time
+t0 = time.perf_counter()
+import {", ".join(CORE_MODULES)}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+RENDER_PROBE = f"""
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({os.path.join(ROOT, "app.py")!r}, default_timeout=120)
+t1 = time.perf_counter()
+at.run()
+t2 = time.perf_counter()
+at.run()
+t3 = time.perf_counter()
+print(json.dumps({{
+    "import_streamlit_seconds": t1 - t0,
+    "first_render_seconds": t2 - t1,
+    "rerun_seconds": t3 - t2,
+    "exceptions": len(at.exception),
+    "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_probe(code):
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    core = [run_probe(CORE_PROBE) for _ in range(args.repeat)]
+    render = [run_probe(RENDER_PROBE) for _ in range(args.repeat)]
+    result = {
+        "core_import_seconds": statistics.median(r["seconds"] for r in core),
+        "core_loaded_heavy_modules": core[-1]["loaded"],
+        "streamlit_import_seconds": statistics.median(r["import_streamlit_seconds"] for r in render),
+        "first_render_seconds": statistics.median(r["first_render_seconds"] for r in render),
+        "rerun_seconds": statistics.median(r["rerun_seconds"] for r in render),
+        "render_exceptions": max(r["exceptions"] for r in render),
+        "render_loaded_heavy_modules": render[-1]["loaded"],
+    }
+
+    for key, value in result.items():
+        print(f"{key:<30} {value:.3f}" if isinstance(value, float) else f"{key:<30} {value}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from engine1 import ACC_FADE_AMP, ACC_FADE_RATE, LINEAR_FADE
+
+
+# ==============================================================================
+# [보정] 실측 History에 Engine 1 경험식(predict_life_and_ce)의 열화 계수를 최소제곱으로 맞춤
+# ==============================================================================
+# capacity(n) = base_capacity · (1 - decay_rate · (LINEAR_FADE·n + ACC_FADE_AMP·exp(acc_fade_rate·n)))
+# 맞춘 값은 그대로 predict_life_and_ce(decay_rate, base_capacity, acc_fade_rate=acc_fade_rate)에 넣을 수 있다.
+FadeFit = namedtuple("FadeFit", [
+    "base_capacity", "decay_rate", "acc_fade_rate",
+    "rmse", "r2", "n_points", "iterations", "converged",
+])
+
+MAX_ITER = 100
+FTOL = 1e-10               # 잔차 제곱합의 상대 감소가 이보다 작으면 수렴
+MAX_EXPONENT = 50.0        # acc_fade_rate × 최대 사이클 상한 (exp overflow 방지)
+FIT_CACHE_SIZE = 256
+
+_fit_cache = OrderedDict()   # 데이터 해시 -> FadeFit
+_fit_lock = threading.Lock()
+
+
+def _model(theta, n):
+    """theta (S, 3), n (S, M) -> 예측 용량 (S, M), 해석적 야코비안 (S, M, 3)"""
+    q0, decay, rate = theta[:, 0:1], theta[:, 1:2], theta[:, 2:3]
+    growth = np.exp(rate * n)
+    u = LINEAR_FADE * n + ACC_FADE_AMP * growth
+    retention = 1.0 - decay * u
+    jac = np.stack([retention, -q0 * u, -q0 * decay * ACC_FADE_AMP * n * growth], axis=-1)
+    return q0 * retention, jac
+
+
+def _pad(series):
+    """길이가 다른 (cycle, capacity) 목록을 (S, M) 배열 + 유효 표시(1/0)로 맞춤"""
+    width = max(len(c) for c, _ in series)
+    n = np.zeros((len(series), width))
+    y = np.zeros((len(series), width))
+    w = np.zeros((len(series), width))
+    for i, (cycle, capacity) in enumerate(series):
+        n[i, :len(cycle)] = cycle
+        y[i, :len(cycle)] = capacity
+        w[i, :len(cycle)] = 1.0
+    return n, y, w
+
+
+def _initial_guess(n, y, w):
+    """직선 y ≈ a + b·n 회귀로 시작값: base = a, decay = -b / (a·LINEAR_FADE), acc_fade_rate = 기본값"""
+    count = np.maximum(w.sum(axis=1), 1.0)
+    n_mean = (w * n).sum(axis=1) / count
+    y_mean = (w * y).sum(axis=1) / count
+    dn = (n - n_mean[:, None]) * w
+    var = (dn * dn).sum(axis=1)
+    slope = np.where(var > 0, (dn * (y - y_mean[:, None])).sum(axis=1) / np.where(var > 0, var, 1.0), 0.0)
+    base = y_mean - slope * n_mean
+    base = np.where(np.abs(base) > 1e-9, base, np.where(y_mean != 0, y_mean, 1.0))
+    return np.column_stack([base, -slope / (base * LINEAR_FADE), np.full(len(base), ACC_FADE_RATE)])
+
+
+def fit_fade_batch(series, max_iter=MAX_ITER):
+    """
+    여러 샘플의 (cycle, capacity)를 한 번에 Levenberg-Marquardt로 맞춤.
+    샘플마다 3×3 정규방정식을 배치로 풀고, 감쇠 계수(λ)와 수렴 여부도 샘플별로 따로 관리한다.
+    반환: 입력 순서대로 FadeFit 목록
+    """
+    if not series:
+        return []
+    n, y, w = _pad([(np.asarray(c, dtype=float), np.asarray(q, dtype=float)) for c, q in series])
+    n_samples = len(series)
+    rate_max = MAX_EXPONENT / np.maximum(n.max(axis=1), 1.0)
+
+    theta = _initial_guess(n, y, w)
+    pred, jac = _model(theta, n)
+    res = (y - pred) * w
+    sse = (res * res).sum(axis=1)
+    lam = np.full(n_samples, 1e-3)
+    active = np.ones(n_samples, dtype=bool)
+    converged = np.zeros(n_samples, dtype=bool)
+    iterations = np.zeros(n_samples, dtype=np.int64)
+    rows = np.arange(3)
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        for _ in range(max_iter):
+            if not active.any():
+                break
+            idx = np.flatnonzero(active)
+            jw = jac[idx] * w[idx, :, None]
+            jwt = jw.transpose(0, 2, 1)
+            jtj = jwt @ jw
+            grad = (jwt @ res[idx, :, None])[..., 0]
+            # Marquardt 스케일링: λ·diag(JᵀJ) (기울기가 없는 파라미터도 풀리도록 하한을 둠)
+            diag = jtj[:, rows, rows]
+            diag = np.maximum(diag, 1e-12 * diag.max(axis=1, keepdims=True) + 1e-300)
+            damped = jtj.copy()
+            damped[:, rows, rows] += lam[idx, None] * diag
+            step = np.linalg.solve(damped, grad[..., None])[..., 0]
+
+            trial = theta[idx] + step
+            trial[:, 2] = np.clip(trial[:, 2], 0.0, rate_max[idx])
+            pred_t, jac_t = _model(trial, n[idx])
+            res_t = (y[idx] - pred_t) * w[idx]
+            sse_t = (res_t * res_t).sum(axis=1)
+            better = np.isfinite(sse_t) & (sse_t < sse[idx])
+
+            acc = idx[better]
+            gain = sse[acc] - sse_t[better]
+            theta[acc], jac[acc], res[acc], sse[acc] = trial[better], jac_t[better], res_t[better], sse_t[better]
+            lam[idx] = np.where(better, lam[idx] / 3.0, lam[idx] * 2.0)
+            iterations[idx] += 1
+
+            # 개선 폭이 충분히 작거나, λ가 커져도 더 줄일 수 없으면(최소점) 종료
+            done = np.zeros(len(idx), dtype=bool)
+            done[better] = gain <= FTOL * np.maximum(sse[acc], 1e-300)
+            done |= lam[idx] > 1e12
+            converged[idx[done]] = True
+            active[idx[done]] = False
+
+    count = w.sum(axis=1)
+    y_mean = (w * y).sum(axis=1) / np.maximum(count, 1.0)
+    sst = (((y - y_mean[:, None]) * w) ** 2).sum(axis=1)
+    rmse = np.sqrt(sse / np.maximum(count, 1.0))
+    r2 = np.where(sst > 0, 1.0 - sse / np.where(sst > 0, sst, 1.0), np.nan)
+    return [
+        FadeFit(float(theta[i, 0]), float(theta[i, 1]), float(theta[i, 2]),
+                float(rmse[i]), float(r2[i]), int(count[i]), int(iterations[i]), bool(converged[i]))
+        for i in range(n_samples)
+    ]
+
+
+def fit_fade(cycle, capacity):
+    """단일 샘플 보정"""
+    return fit_fade_batch([(cycle, capacity)])[0]
+
+
+# ==============================================================================
+# [보정 캐시] 데이터 내용 해시 기준: 바뀌지 않은 샘플은 다시 맞추지 않음
+# ==============================================================================
+def data_key(cycle, capacity):
+    """(cycle, capacity) 배열 내용의 해시"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(cycle, dtype=np.int64).tobytes())
+    h.update(np.ascontiguousarray(capacity, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def calibrate_series(series):
+    """
+    {이름: (cycle, capacity)} -> {이름: FadeFit}.
+    캐시에 없는 데이터만 모아 fit_fade_batch 한 번으로 맞춘다. 빈 데이터는 제외.
+    """
+    keys = {name: data_key(*s) for name, s in series.items() if len(s[0])}
+    fits = {}
+    with _fit_lock:
+        for name, key in keys.items():
+            if key in _fit_cache:
+                _fit_cache.move_to_end(key)
+                fits[name] = _fit_cache[key]
+    missing = [name for name in keys if name not in fits]
+    if missing:
+        new_fits = fit_fade_batch([series[name] for name in missing])
+        with _fit_lock:
+            for name, fit in zip(missing, new_fits):
+                _fit_cache[keys[name]] = fits[name] = fit
+            while len(_fit_cache) > FIT_CACHE_SIZE:
+                _fit_cache.popitem(last=False)
+    return {name: fits[name] for name in keys}
+
+
+def calibrate_store(store, data_type="History"):
+    """labdata.CycleStore의 샘플별 data_type 기록을 보정"""
+    return calibrate_series({sample: tuple(store.get(sample, data_type)) for sample in store.samples})
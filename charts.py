@@ -0,0 +1,244 @@
+import io
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+
+# ==============================================================================
+# [차트] 그래프 사양(Panel/Layer) -> PNG(matplotlib) 또는 브라우저 렌더링(Altair)
+# ==============================================================================
+# 한 패널(축)에 들어가는 그래프 요소. kind: scatter / line / band / bar
+Layer = namedtuple("Layer", ["kind", "x", "y", "y2", "label", "color", "marker", "alpha", "size"])
+Panel = namedtuple("Panel", ["layers", "title", "xlabel", "ylabel", "ylim"])
+
+MAX_POINTS = 2000        # 계열당 화면에 그리는 최대 점 수 (초과하면 구간별 min/max로 줄임)
+PNG_CACHE_SIZE = 64
+
+
+def scatter(x, y, label=None, color="black", marker="o", alpha=0.6, size=15):
+    return Layer("scatter", np.asarray(x), np.asarray(y, dtype=float), None, label, color, marker, alpha, size)
+
+
+def line(x, y, label=None, color="black", alpha=1.0, size=2):
+    return Layer("line", np.asarray(x), np.asarray(y, dtype=float), None, label, color, None, alpha, size)
+
+
+def band(x, lo, hi, label=None, color="black", alpha=0.25):
+    return Layer("band", np.asarray(x), np.asarray(lo, dtype=float), np.asarray(hi, dtype=float), label, color, None, alpha, None)
+
+
+def bar(x, y, label=None, color="black", alpha=0.7, size=1.0):
+    return Layer("bar", np.asarray(x), np.asarray(y, dtype=float), None, label, color, None, alpha, size)
+
+
+def panel(layers, title=None, xlabel=None, ylabel=None, ylim=None):
+    return Panel(list(layers), title, xlabel, ylabel, ylim)
+
+
+# ==============================================================================
+# [다운샘플링] 구간별 최솟값/최댓값만 남겨 노이즈 폭(포락선)을 유지
+# ==============================================================================
+def minmax_indices(y, n_out=MAX_POINTS):
+    """
+    y를 약 n_out/2개 구간으로 나누어 구간마다 최솟값과 최댓값 위치만 남긴 인덱스(정렬됨).
+    첫 점과 마지막 점은 항상 포함되며, NaN은 선택되지 않는다(구간 전체가 NaN인 경우 제외).
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    n_buckets = max((n_out - 2) // 2, 1)
+    inner = y[1:n - 1]
+    size = -(-len(inner) // n_buckets)
+    pad = n_buckets * size - len(inner)
+    nan = np.isnan(inner)
+    lo = np.pad(np.where(nan, np.inf, inner), (0, pad), constant_values=np.inf).reshape(n_buckets, size)
+    hi = np.pad(np.where(nan, -np.inf, inner), (0, pad), constant_values=-np.inf).reshape(n_buckets, size)
+    starts = np.arange(n_buckets) * size + 1
+    idx = np.concatenate([[0], starts + lo.argmin(axis=1), starts + hi.argmax(axis=1), [n - 1]])
+    return np.unique(np.minimum(idx, n - 1))
+
+
+def downsample(layer, n_out=MAX_POINTS):
+    """Layer의 점 수를 n_out 근처로 줄임 (band는 하한/상한 양쪽의 극값을 유지)"""
+    if len(layer.y) <= n_out:
+        return layer
+    if layer.kind == "band":
+        idx = np.union1d(minmax_indices(layer.y, n_out // 2), minmax_indices(layer.y2, n_out // 2))
+        return layer._replace(x=layer.x[idx], y=layer.y[idx], y2=layer.y2[idx])
+    idx = minmax_indices(layer.y, n_out)
+    return layer._replace(x=layer.x[idx], y=layer.y[idx])
+
+
+# ==============================================================================
+# [PNG 렌더링] pyplot 전역 레지스트리를 거치지 않는 Figure + 입력 키 기준 LRU 캐시
+# ==============================================================================
+_png_cache = OrderedDict()
+_png_lock = threading.Lock()
+
+
+def _draw_panel(ax, p):
+    for layer in p.layers:
+        if layer.kind == "scatter":
+            ax.scatter(layer.x, layer.y, color=layer.color, s=layer.size, alpha=layer.alpha, marker=layer.marker, label=layer.label)
+        elif layer.kind == "line":
+            ax.plot(layer.x, layer.y, color=layer.color, lw=layer.size, alpha=layer.alpha, label=layer.label)
+        elif layer.kind == "band":
+            ax.fill_between(layer.x, layer.y, layer.y2, color=layer.color, alpha=layer.alpha, label=layer.label)
+        elif layer.kind == "bar":
+            ax.bar(layer.x, layer.y, width=layer.size, color=layer.color, alpha=layer.alpha, label=layer.label)
+    if p.title:
+        ax.set_title(p.title, fontweight='bold')
+    if p.xlabel:
+        ax.set_xlabel(p.xlabel, fontweight='bold')
+    if p.ylabel:
+        ax.set_ylabel(p.ylabel, fontweight='bold')
+    if p.ylim is not None:
+        ax.set_ylim(*p.ylim)
+    if any(layer.label for layer in p.layers):
+        ax.legend()
+    ax.grid(True, alpha=0.3)
+
+
+def render_png(panels, figsize=(10, 5), dpi=100, max_points=MAX_POINTS):
+    """패널 목록을 세로로 쌓아 PNG 바이트로 렌더링. 사용한 Figure는 바로 닫는다."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    try:
+        axes = fig.subplots(len(panels), 1, sharex=True, squeeze=False)[:, 0]
+        for ax, p in zip(axes, panels):
+            _draw_panel(ax, p._replace(layers=[downsample(layer, max_points) for layer in p.layers]))
+        fig.tight_layout()
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png")
+        return buf.getvalue()
+    finally:
+        fig.clear()
+
+
+def cached_png(key, build, figsize=(10, 5), dpi=100, max_points=MAX_POINTS):
+    """
+    key(해시 가능한 입력값 튜플)가 같으면 이전에 렌더링한 PNG를 그대로 반환.
+    build(): 캐시에 없을 때만 호출되어 패널 목록을 만든다.
+    """
+    key = (key, figsize, dpi, max_points)
+    with _png_lock:
+        if key in _png_cache:
+            _png_cache.move_to_end(key)
+            return _png_cache[key]
+    png = render_png(build(), figsize=figsize, dpi=dpi, max_points=max_points)
+    with _png_lock:
+        _png_cache[key] = png
+        while len(_png_cache) > PNG_CACHE_SIZE:
+            _png_cache.popitem(last=False)
+    return png
+
+
+def grouped_bar_png(categories, groups, ylabel=None, figsize=(8, 4), dpi=100):
+    """
+    범주별 묶음 막대 그래프 PNG. groups: [(라벨, 값 목록, 색, 테두리색 또는 None), ...]
+    막대 위에 값을 표시한다.
+    """
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    try:
+        ax = fig.subplots()
+        x = np.arange(len(categories)); width = 0.7 / len(groups)
+        for i, (label, values, color, edgecolor) in enumerate(groups):
+            offset = (i - (len(groups) - 1) / 2) * width
+            rects = ax.bar(x + offset, values, width, label=label, color=color, edgecolor=edgecolor, alpha=0.7 if edgecolor is None else 1.0)
+            for rect in rects:
+                h = rect.get_height()
+                ax.annotate(f'{h:.2f}', xy=(rect.get_x() + rect.get_width() / 2, h), xytext=(0, 3), textcoords="offset points", ha='center', fontsize=9)
+        ax.set_xticks(x); ax.set_xticklabels(categories)
+        if ylabel:
+            ax.set_ylabel(ylabel)
+        ax.legend(); ax.grid(axis='y', linestyle=':')
+        fig.tight_layout()
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png")
+        return buf.getvalue()
+    finally:
+        fig.clear()
+
+
+# ==============================================================================
+# [브라우저 렌더링] 같은 사양을 Vega-Lite(Altair) 차트로 변환 (서버는 PNG를 만들지 않음)
+# ==============================================================================
+ALTAIR_MARKS = {"o": "circle", "s": "square"}
+
+
+def _layer_frame(layer, pd):
+    data = {"x": layer.x, "y": layer.y, "series": layer.label or ""}
+    if layer.kind == "band":
+        data["y2"] = layer.y2
+    return pd.DataFrame(data).dropna(subset=["y"])
+
+
+def _altair_panel(p, x_title, height, max_points, name):
+    import altair as alt
+    import pandas as pd
+
+    labels = [layer.label for layer in p.layers if layer.label]
+    colors = [layer.color for layer in p.layers if layer.label]
+    color_scale = alt.Scale(domain=labels, range=colors)
+    y_scale = alt.Scale(domain=list(p.ylim), clamp=True) if p.ylim is not None else alt.Scale(zero=False)
+
+    charts = []
+    for layer in p.layers:
+        layer = downsample(layer, max_points)
+        base = alt.Chart(_layer_frame(layer, pd))
+        if layer.kind == "scatter":
+            mark = getattr(base, f"mark_{ALTAIR_MARKS.get(layer.marker, 'circle')}")(opacity=layer.alpha, size=layer.size * 2)
+        elif layer.kind == "line":
+            mark = base.mark_line(opacity=layer.alpha, strokeWidth=layer.size)
+        elif layer.kind == "band":
+            mark = base.mark_area(opacity=layer.alpha)
+        else:
+            mark = base.mark_bar(opacity=layer.alpha)
+        enc = {
+            "x": alt.X("x:Q", title=x_title),
+            "y": alt.Y("y:Q", title=p.ylabel, scale=y_scale),
+            "color": alt.Color("series:N", scale=color_scale, title=None) if layer.label else alt.value(layer.color),
+            "tooltip": [alt.Tooltip("x:Q", title=x_title or "x"), alt.Tooltip("y:Q", title=p.ylabel or "y", format=".4f")],
+        }
+        if layer.kind == "band":
+            enc["y2"] = "y2:Q"
+        charts.append(mark.encode(**enc))
+    zoom = alt.selection_interval(bind="scales", encodings=["x"], name=name)   # x축 확대/이동
+    return alt.layer(*charts).add_params(zoom).properties(title=p.title or "", height=height)
+
+
+def altair_chart(panels, height=260, max_points=MAX_POINTS):
+    """패널 목록을 세로로 쌓은 Altair 차트. x축 라벨은 마지막 패널에만 표시 (matplotlib sharex와 동일)"""
+    import altair as alt
+
+    charts = []
+    for i, p in enumerate(panels):
+        x_title = p.xlabel if i == len(panels) - 1 or p.xlabel is None else None
+        charts.append(_altair_panel(p, x_title, height, max_points, f"zoom{i}"))
+    if len(charts) == 1:
+        return charts[0]
+    return alt.vconcat(*charts).resolve_scale(color="independent")
+
+
+def grouped_bar_altair(categories, groups, ylabel=None, height=300):
+    """grouped_bar_png와 같은 입력으로 만든 Altair 묶음 막대 그래프"""
+    import altair as alt
+    import pandas as pd
+
+    rows = [{"category": c, "group": label, "value": float(v)}
+            for label, values, _, _ in groups for c, v in zip(categories, values)]
+    df = pd.DataFrame(rows)
+    color = alt.Color("group:N", scale=alt.Scale(domain=[g[0] for g in groups], range=[g[2] for g in groups]), title=None)
+    base = alt.Chart(df).encode(
+        x=alt.X("category:N", sort=list(categories), title=None),
+        xOffset=alt.XOffset("group:N", sort=[g[0] for g in groups]),
+        y=alt.Y("value:Q", title=ylabel),
+    )
+    bars = base.mark_bar().encode(color=color, tooltip=["category", "group", alt.Tooltip("value:Q", format=".4f")])
+    text = base.mark_text(dy=-6, fontSize=10).encode(text=alt.Text("value:Q", format=".2f"))
+    return (bars + text).properties(height=height)
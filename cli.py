@@ -0,0 +1,188 @@
+"""
+Engine 1 / Engine 2 헤드리스 배치 실행기.
+
+    python cli.py engine1 scenarios.csv -o results.parquet --workers 4
+    python cli.py engine1 lfp_100k.csv -o summary.csv --stream      # 10만+ 사이클 요약 (메모리 일정)
+    python cli.py engine2 recipes.jsonl -o results.csv
+    python cli.py lut                                                # Engine 1 탭용 사전 계산 표 생성
+
+Engine 1 입력 열: pattern 또는 decay_rate, capacity(초기 용량, 기본 185), cycles(기본 1000)
+Engine 2 입력 열: binder, solvent, drying_temp, drying_time, loading
+입력은 chunk 단위로 읽고, 작업자 풀에서 계산한 결과를 입력 순서대로 바로 파일에 기록한다.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from engine1 import DECAY_RATES, build_pattern_lut, predict_life_and_ce_batch, solve_eol_cycles, summarize_stream
+from engine2 import calculate_lca_impact_batch
+from parallel import ordered_map
+
+
+# ==============================================================================
+# [입출력] chunk 단위 읽기 / 쓰기
+# ==============================================================================
+def read_chunks(path, chunk_size):
+    """CSV 또는 JSONL 시나리오 파일을 DataFrame chunk로 읽음"""
+    import pandas as pd
+
+    if path.endswith((".jsonl", ".json")):
+        reader = pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        reader = pd.read_csv(path, chunksize=chunk_size, encoding="utf-8-sig")
+    offset = 0
+    for chunk in reader:
+        chunk.columns = [str(c).strip() for c in chunk.columns]
+        yield offset, chunk.reset_index(drop=True)
+        offset += len(chunk)
+
+
+class ResultWriter:
+    """결과 chunk를 CSV(append) 또는 Parquet(row group)로 스트리밍 기록"""
+
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.fmt = fmt or ("parquet" if path.endswith(".parquet") else "csv")
+        self._writer = None
+        self._header = True
+        self.rows = 0
+
+    def write(self, df):
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            df.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+            self._header = False
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# ==============================================================================
+# [작업 단위] 프로세스 풀에서 실행되는 chunk 계산
+# ==============================================================================
+def _column(df, name, default):
+    return df[name].to_numpy() if name in df.columns else np.full(len(df), default)
+
+
+def run_engine1_chunk(offset, df, seed, eol_ratio, trajectory, stream=False):
+    import pandas as pd
+
+    if "decay_rate" in df.columns:
+        decay = df["decay_rate"].to_numpy(dtype=float)
+    else:
+        decay = df["pattern"].astype(str).str.strip().map(DECAY_RATES).to_numpy(dtype=float)
+    capacity_base = _column(df, "capacity", 185.0).astype(float)
+    cycles = _column(df, "cycles", 1000).astype(int)
+
+    # chunk 시작 행 번호로 seed를 파생하여 작업자 수와 무관하게 재현 가능
+    rng = np.random.default_rng([seed, offset])
+    scenario = np.arange(offset, offset + len(df))
+
+    if stream:
+        # 사이클 축을 float32 chunk로 나눠 요약값만 남김 (10만+ 사이클에서도 메모리 일정)
+        final_cap, final_ce, eol = summarize_stream(decay, capacity_base, cycles, eol_ratio, rng=rng)
+        out = df.copy()
+        out.insert(0, "scenario", scenario)
+        out["decay_rate"] = decay
+        out["final_capacity"] = final_cap
+        out["final_ce"] = final_ce
+        out["eol_cycle"] = eol
+        out["projected_eol_cycle"] = solve_eol_cycles(decay, eol_ratio, max_cycles=max(20000, int(cycles.max())))
+        return out
+
+    x, capacity, ce = predict_life_and_ce_batch(decay, capacity_base, cycles, rng=rng)
+
+    if trajectory:
+        valid = ~np.isnan(capacity)
+        rows, cols = np.nonzero(valid)
+        return pd.DataFrame({
+            "scenario": scenario[rows], "cycle": x[cols],
+            "capacity": capacity[valid], "ce": ce[valid],
+        })
+
+    last = cycles - 1
+    below = capacity < (capacity_base * eol_ratio)[:, None]
+    eol = np.where(below.any(axis=1), np.argmax(below, axis=1) + 1, np.nan)
+    out = df.copy()
+    out.insert(0, "scenario", scenario)
+    out["decay_rate"] = decay
+    out["final_capacity"] = capacity[np.arange(len(df)), last]
+    out["final_ce"] = ce[np.arange(len(df)), last]
+    out["eol_cycle"] = eol
+    out["projected_eol_cycle"] = solve_eol_cycles(decay, eol_ratio)
+    return out
+
+
+def run_engine2_chunk(offset, df):
+    co2, energy, voc, valid = calculate_lca_impact_batch(
+        df["binder"].astype(str).str.strip(), df["solvent"].astype(str).str.strip(),
+        df["drying_temp"], df["loading"], df["drying_time"],
+    )
+    out = df.copy()
+    out.insert(0, "scenario", np.arange(offset, offset + len(df)))
+    out["valid"] = valid
+    out["co2_kg_per_m2"] = np.where(valid, co2, np.nan)
+    out["energy_kwh_per_m2"] = np.where(valid, energy, np.nan)
+    out["voc_g_per_m2"] = np.where(valid, voc, np.nan)
+    return out
+
+
+# ==============================================================================
+# [CLI]
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Battery simulator batch runner")
+    parser.add_argument("engine", choices=["engine1", "engine2", "lut"])
+    parser.add_argument("input", nargs="?", help="시나리오 파일 (.csv 또는 .jsonl)")
+    parser.add_argument("-o", "--output", help="결과 파일 (.csv 또는 .parquet, lut는 .npy 경로)")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="출력 형식 (기본: 확장자로 판단)")
+    parser.add_argument("--chunk-size", type=int, help="chunk당 시나리오 수 (기본: engine1 2000, engine2 100000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="작업자 프로세스 수 (1이면 순차 실행)")
+    parser.add_argument("--seed", type=int, default=0, help="Engine 1 노이즈 seed")
+    parser.add_argument("--eol-ratio", type=float, default=0.8, help="Engine 1 수명 종료 기준 (초기 용량 대비)")
+    parser.add_argument("--trajectory", action="store_true", help="Engine 1 요약 대신 사이클별 곡선을 long 형식으로 출력")
+    parser.add_argument("--stream", action="store_true",
+                        help="Engine 1 요약을 사이클 chunk 단위 float32로 계산 (긴 수명 시나리오용, 메모리 일정)")
+    args = parser.parse_args(argv)
+    if args.engine == "lut":
+        path = build_pattern_lut(*([args.output] if args.output else []))
+        print(f"Engine 1 lookup table -> {path}", file=sys.stderr)
+        return 0
+    if not args.input or not args.output:
+        parser.error("engine1/engine2에는 입력 파일과 -o/--output이 필요합니다")
+    if args.stream and args.trajectory:
+        parser.error("--stream은 요약 출력에만 사용할 수 있습니다 (--trajectory와 함께 사용 불가)")
+
+    if args.engine == "engine1":
+        chunk_size = args.chunk_size or 2000
+        tasks = ((offset, df, args.seed, args.eol_ratio, args.trajectory, args.stream)
+                 for offset, df in read_chunks(args.input, chunk_size))
+        fn = run_engine1_chunk
+    else:
+        chunk_size = args.chunk_size or 100_000
+        tasks = read_chunks(args.input, chunk_size)
+        fn = run_engine2_chunk
+
+    writer = ResultWriter(args.output, args.format)
+    try:
+        for result in ordered_map(fn, tasks, args.workers):
+            writer.write(result)
+    finally:
+        writer.close()
+    print(f"{writer.rows:,} rows -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
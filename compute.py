@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ==============================================================================
+# [계산 서비스] 모든 세션이 공유하는 제한된 작업 풀 + 동일 요청 합치기 + 대기열 제한
+# ==============================================================================
+class ServiceBusy(RuntimeError):
+    """대기 중인 작업이 가득 차 queue_timeout 안에 자리가 나지 않음"""
+
+
+class ComputeService:
+    """
+    프로세스 전체에서 하나만 만들어 모든 세션이 공유하는 계산 서비스.
+
+    - 동시에 실행되는 작업은 workers개로 제한된다.
+    - 같은 key의 작업이 이미 대기/실행 중이면 새로 만들지 않고 그 Future를 함께 기다린다.
+    - 서로 다른 작업은 max_pending개까지만 받고, 가득 차면 queue_timeout초 동안 자리를 기다린 뒤 ServiceBusy.
+    작업 함수는 Streamlit API를 호출하지 않는 순수 계산이어야 한다 (작업 스레드에는 세션 정보가 없음).
+    """
+
+    def __init__(self, workers=None, max_pending=32, queue_timeout=10.0):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="compute")
+        self._cond = threading.Condition()
+        self._inflight = {}
+        self.stats = {"submitted": 0, "deduped": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    def submit(self, key, fn, *args, **kwargs):
+        """key 기준으로 합쳐진 Future 반환. key는 해시 가능한 값(보통 함수 이름 + 인자 튜플)"""
+        deadline = time.monotonic() + self.queue_timeout
+        with self._cond:
+            while True:
+                future = self._inflight.get(key)
+                if future is not None:
+                    self.stats["deduped"] += 1
+                    return future
+                if len(self._inflight) < self.max_pending:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    self.stats["rejected"] += 1
+                    raise ServiceBusy(f"계산 대기열이 가득 찼습니다 ({self.max_pending}개)")
+            future = self._pool.submit(fn, *args, **kwargs)
+            self._inflight[key] = future
+            self.stats["submitted"] += 1
+        future.add_done_callback(lambda f, key=key: self._finish(key, f))
+        return future
+
+    def _finish(self, key, future):
+        with self._cond:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            failed = future.cancelled() or future.exception() is not None
+            self.stats["failed" if failed else "completed"] += 1
+            self._cond.notify_all()
+
+    def run(self, key, fn, *args, timeout=None, **kwargs):
+        """작업을 제출하고 결과를 기다림 (작업에서 난 예외는 기다리던 모든 세션에 그대로 전달)"""
+        return self.submit(key, fn, *args, **kwargs).result(timeout)
+
+    def snapshot(self):
+        with self._cond:
+            return dict(self.stats, in_flight=len(self._inflight), workers=self.workers, max_pending=self.max_pending)
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
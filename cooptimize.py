@@ -0,0 +1,278 @@
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from engine1 import DECAY_RATES, solve_eol_cycles
+from engine2 import BINDER_SOLVENTS, CO2_FACTORS, DEFAULT_CO2_FACTOR, lca_impact_arrays, pareto_mask
+from parallel import ordered_map
+
+
+# ==============================================================================
+# [공정 -> 열화 속도] Engine 2 공정 조건이 Engine 1 열화 속도(decay_rate)에 주는 배율
+# ==============================================================================
+# decay_rate = DECAY_RATES[충/방전 패턴] × 바인더 배율 × 잔류 용매 배율 × 과열 배율 × 로딩량 배율
+#   잔류 용매: 건조 온도가 끓는점보다 낮을수록 용매가 빠지는 시간(τ)이 길어짐. 남은 비율 = exp(-건조 시간 / τ)
+#   과열: 바인더 허용 온도를 넘으면 1°C당 OVERHEAT_PENALTY만큼 열화가 빨라짐
+#   로딩량: 두꺼운 전극일수록 열화가 빨라짐 (LOADING_REF 대비 LOADING_EXPONENT 제곱)
+# 실측 공정-수명 데이터가 없어 문헌 경향을 따른 가정값이다. 데이터가 생기면 이 상수들을 보정한다.
+BINDER_FADE = {"PVDF": 1.0, "CMC": 1.15, "CMGG": 0.85, "GG": 1.0}
+DEFAULT_BINDER_FADE = 1.0
+BINDER_MAX_TEMP = {"PVDF": 180.0, "CMC": 150.0, "CMGG": 160.0, "GG": 150.0}   # °C
+DEFAULT_BINDER_MAX_TEMP = 150.0
+SOLVENT_BP = {"NMP": 204.1, "Water": 100.0}    # engine2 건조 에너지 모델과 같은 끓는점
+RESIDUAL_TAU_MIN = 30.0       # 끓는점에서 잔류 용매가 1/e로 줄어드는 시간 (min)
+RESIDUAL_T_SCALE = 25.0       # 끓는점보다 이만큼(°C) 낮을 때마다 τ가 e배 길어짐
+RESIDUAL_PENALTY = 2.0        # 잔류 용매가 모두 남았을 때 열화 속도 증가분
+OVERHEAT_PENALTY = 0.02       # 허용 온도 초과 1°C당 열화 속도 증가분
+LOADING_REF = 10.0            # mg/cm²
+LOADING_EXPONENT = 0.5
+
+
+def _decay_arrays(base_decay, fade, max_temp, is_nmp, drying_temp, drying_time, loading_mass):
+    bp = np.where(is_nmp, SOLVENT_BP["NMP"], SOLVENT_BP["Water"])
+    tau = RESIDUAL_TAU_MIN * np.exp(np.maximum(bp - drying_temp, 0.0) / RESIDUAL_T_SCALE)
+    residual = np.exp(-drying_time / tau)
+    overheat = np.maximum(drying_temp - max_temp, 0.0)
+    return (base_decay * fade * (1.0 + RESIDUAL_PENALTY * residual) * (1.0 + OVERHEAT_PENALTY * overheat)
+            * (loading_mass / LOADING_REF) ** LOADING_EXPONENT)
+
+
+# ==============================================================================
+# [평가] 설계 -> (EOL 사이클, 활물질 kg당 CO₂ / 건조 에너지 / VOC). 같은 설계는 메모 캐시에서 재사용
+# ==============================================================================
+# 로딩량이 낮을수록 m²당 영향은 작아지지만 만드는 활물질도 줄어들므로, 환경 영향은 활물질 kg당 값으로 비교한다.
+# (1 mg/cm² = 0.01 kg/m²)
+CoOptResult = namedtuple("CoOptResult", ["front", "n_evaluated", "n_computed", "generations", "seconds"])
+
+TEMP_STEP = 1.0               # 설계 변수 격자 (UI 슬라이더 단위): 같은 격자점은 한 번만 평가
+TIME_STEP = 1.0
+LOADING_STEP = 0.1
+EVAL_CHUNK = 4096             # 작업 하나의 최대 설계 수
+MIN_TASK = 32                 # 병렬 평가 시 작업 하나의 최소 설계 수 (이보다 작으면 프로세스 전달 비용이 더 큼)
+MEMO_SIZE = 200_000
+
+_memo = OrderedDict()         # (패턴, EOL 기준, 최대 사이클, 바인더, 온도, 시간, 로딩량) -> (EOL, CO₂, 에너지, VOC, 열화 속도)
+_memo_lock = threading.Lock()
+
+
+def _evaluate_chunk(pattern, eol_ratio, max_cycles, binders, binder_codes, temp, time_min, loading):
+    """작업 단위 (프로세스 풀에서도 실행): 코드/배열 입력 -> (설계 수, 5) 결과"""
+    is_nmp = np.array([BINDER_SOLVENTS.get(b) == "NMP" for b in binders])[binder_codes]
+    fade = np.array([BINDER_FADE.get(b, DEFAULT_BINDER_FADE) for b in binders])[binder_codes]
+    max_temp = np.array([BINDER_MAX_TEMP.get(b, DEFAULT_BINDER_MAX_TEMP) for b in binders])[binder_codes]
+    co2_lut = np.array([CO2_FACTORS.get(b, DEFAULT_CO2_FACTOR) for b in binders])
+
+    decay = _decay_arrays(DECAY_RATES[pattern], fade, max_temp, is_nmp, temp, time_min, loading)
+    eol = solve_eol_cycles(decay, eol_ratio, max_cycles)
+    eol = np.where(np.isnan(eol), max_cycles, eol)      # max_cycles 안에 도달하지 않으면 상한값
+    co2, energy, voc = lca_impact_arrays(binder_codes, is_nmp, temp, loading, time_min, co2_lut)
+    active_kg = loading * 0.01
+    return np.column_stack([eol, co2 / active_kg, energy / active_kg, voc / active_kg, decay])
+
+
+def evaluate_designs(pattern, binders, binder_codes, temp, time_min, loading, eol_ratio=0.8, max_cycles=20000,
+                     workers=None):
+    """
+    설계 배열 -> (설계 수, 5) [EOL, CO₂/kg, 에너지/kg, VOC/kg, 열화 속도].
+    메모 캐시에 없는 설계만 모아 workers개 작업으로 나눠 공유 프로세스 풀에서 평가한다
+    (작업당 MIN_TASK ~ EVAL_CHUNK개). workers: None이면 CPU 수, 1이면 현재 프로세스에서 순차 실행.
+    반환: (결과, 새로 계산한 설계 수)
+    """
+    binders = tuple(binders)
+    keys = [(pattern, eol_ratio, max_cycles, binders[c], t, m, l)
+            for c, t, m, l in zip(binder_codes.tolist(), temp.tolist(), time_min.tolist(), loading.tolist())]
+    out = np.empty((len(keys), 5))
+    missing = {}
+    with _memo_lock:
+        for i, key in enumerate(keys):
+            hit = _memo.get(key)
+            if hit is not None:
+                _memo.move_to_end(key)
+                out[i] = hit
+            else:
+                missing.setdefault(key, []).append(i)
+    if not missing:
+        return out, 0
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    rows = np.array([idx[0] for idx in missing.values()])
+    chunk = min(max(-(-len(rows) // workers), MIN_TASK), EVAL_CHUNK)
+    workers = min(workers, -(-len(rows) // chunk))
+    tasks = ((pattern, eol_ratio, max_cycles, binders, binder_codes[rows[s:s + chunk]], temp[rows[s:s + chunk]],
+              time_min[rows[s:s + chunk]], loading[rows[s:s + chunk]])
+             for s in range(0, len(rows), chunk))
+    values = np.concatenate(list(ordered_map(_evaluate_chunk, tasks, workers)))
+    with _memo_lock:
+        for (key, idx), value in zip(missing.items(), values):
+            out[idx] = value
+            _memo[key] = value
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return out, len(missing)
+
+
+# ==============================================================================
+# [NSGA-II] 비지배 정렬 + 혼잡도 거리 선택, SBX 교차 + 다항 변이 (유전자는 [0, 1] 실수)
+# ==============================================================================
+SBX_ETA = 15.0
+MUTATION_ETA = 20.0
+CROSSOVER_PROB = 0.9
+
+
+def non_dominated_rank(objectives):
+    """최소화 목적함수 (N, M) -> 각 해의 비지배 등급 (0이 Pareto 최적)"""
+    dominates = np.ones((len(objectives), len(objectives)), dtype=bool)
+    strictly = np.zeros_like(dominates)
+    for o in objectives.T:
+        dominates &= o[:, None] <= o[None, :]
+        strictly |= o[:, None] < o[None, :]
+    dominates &= strictly                           # dominates[i, j]: i가 j를 지배
+    dominated_by = dominates.sum(axis=0)            # 나를 지배하는 해의 수
+    rank = np.full(len(objectives), -1)
+    current = np.flatnonzero(dominated_by == 0)
+    level = 0
+    while len(current):
+        rank[current] = level
+        dominated_by = dominated_by - dominates[current].sum(axis=0)
+        dominated_by[rank >= 0] = -1
+        current = np.flatnonzero(dominated_by == 0)
+        level += 1
+    return rank
+
+
+def crowding_distance(objectives, rank):
+    """같은 등급 안에서 목적함수 공간의 이웃 간 거리 합 (양 끝은 무한대)"""
+    distance = np.zeros(len(objectives))
+    for level in np.unique(rank):
+        members = np.flatnonzero(rank == level)
+        if len(members) <= 2:
+            distance[members] = np.inf
+            continue
+        obj = objectives[members]
+        span = obj.max(axis=0) - obj.min(axis=0)
+        span[span == 0] = 1.0
+        order = np.argsort(obj, axis=0)
+        sorted_obj = np.take_along_axis(obj, order, axis=0)
+        gap = np.zeros_like(obj)
+        gap[1:-1] = (sorted_obj[2:] - sorted_obj[:-2]) / span
+        gap[[0, -1]] = np.inf
+        contrib = np.zeros_like(obj)
+        np.put_along_axis(contrib, order, gap, axis=0)
+        distance[members] = contrib.sum(axis=1)
+    return distance
+
+
+def _tournament(rng, rank, crowd, n):
+    """이진 토너먼트: 등급이 낮은 해, 같으면 혼잡도 거리가 큰 해"""
+    a, b = rng.integers(0, len(rank), size=(2, n))
+    better = (rank[a] < rank[b]) | ((rank[a] == rank[b]) & (crowd[a] > crowd[b]))
+    return np.where(better, a, b)
+
+
+def _sbx(rng, p1, p2):
+    u = rng.random(p1.shape)
+    beta = np.where(u <= 0.5, (2 * u) ** (1 / (SBX_ETA + 1)), (1 / (2 * (1 - u))) ** (1 / (SBX_ETA + 1)))
+    cross = rng.random(len(p1))[:, None] < CROSSOVER_PROB
+    beta = np.where(cross & (rng.random(p1.shape) < 0.5), beta, 1.0)
+    c1 = 0.5 * ((1 + beta) * p1 + (1 - beta) * p2)
+    c2 = 0.5 * ((1 - beta) * p1 + (1 + beta) * p2)
+    return np.clip(np.concatenate([c1, c2]), 0.0, 1.0)
+
+
+def _mutate(rng, genes):
+    u = rng.random(genes.shape)
+    delta = np.where(u < 0.5, (2 * u) ** (1 / (MUTATION_ETA + 1)) - 1, 1 - (2 * (1 - u)) ** (1 / (MUTATION_ETA + 1)))
+    mutate = rng.random(genes.shape) < 1.0 / genes.shape[1]
+    return np.clip(genes + np.where(mutate, delta, 0.0), 0.0, 1.0)
+
+
+def _decode(genes, n_binders, temp_range, time_range, loading_range):
+    """유전자 [0, 1]^4 -> (바인더 코드, 온도, 시간, 로딩량). 연속 변수는 설계 격자에 맞춤"""
+    def snap(u, lo, hi, step):
+        return np.clip(np.round((lo + u * (hi - lo)) / step) * step, lo, hi)
+
+    codes = np.minimum((genes[:, 0] * n_binders).astype(np.intp), n_binders - 1)
+    return (codes, snap(genes[:, 1], *temp_range, TEMP_STEP), snap(genes[:, 2], *time_range, TIME_STEP),
+            snap(genes[:, 3], *loading_range, LOADING_STEP))
+
+
+def co_optimize(pattern="Charge/Discharge", binders=tuple(BINDER_SOLVENTS), temp_range=(60, 200), time_range=(10, 720),
+                loading_range=(5.0, 30.0), pop_size=100, generations=40, seed=0, eol_ratio=0.8, max_cycles=20000,
+                workers=1):
+    """
+    충/방전 패턴이 주어졌을 때 공정 조건(바인더 -> 용매는 BINDER_SOLVENTS, 건조 온도/시간, 로딩량)을 NSGA-II로 탐색해
+    EOL 사이클(최대화)과 활물질 kg당 CO₂/건조 에너지(최소화)의 Pareto 최적 집합을 찾는다.
+    workers: 세대별 새 설계 평가의 병렬 작업 수 (evaluate_designs 참고). 결과는 workers와 상관없이 같다.
+    반환: CoOptResult. front는 이번 탐색에서 평가한 모든 설계 중 비지배 설계의 열 dict (EOL 내림차순).
+    """
+    binders = tuple(binders)
+    if not binders:
+        raise ValueError("바인더를 하나 이상 선택해 주세요.")
+    rng = np.random.default_rng(seed)
+    t0 = time.perf_counter()
+    n_computed = 0
+    archive = {}
+
+    def evaluate(genes):
+        nonlocal n_computed
+        design = _decode(genes, len(binders), temp_range, time_range, loading_range)
+        values, computed = evaluate_designs(pattern, binders, *design, eol_ratio, max_cycles, workers)
+        n_computed += computed
+        for i, key in enumerate(zip(*(d.tolist() for d in design))):
+            archive[key] = values[i]
+        # 최소화 목적함수: -EOL, CO₂/kg, 에너지/kg
+        return np.column_stack([-values[:, 0], values[:, 1], values[:, 2]])
+
+    genes = rng.random((pop_size, 4))
+    objectives = evaluate(genes)
+    rank = non_dominated_rank(objectives)
+    crowd = crowding_distance(objectives, rank)
+    for _ in range(generations):
+        half = (pop_size + 1) // 2
+        parents = _tournament(rng, rank, crowd, 2 * half)   # 홀수 pop_size면 부모 쌍을 하나 더 뽑고 자식 하나는 버림
+        children = _mutate(rng, _sbx(rng, genes[parents[:half]], genes[parents[half:2 * half]]))[:pop_size]
+        child_obj = evaluate(children)
+
+        # 부모 + 자식에서 (등급, -혼잡도) 순으로 pop_size개 선택
+        genes = np.concatenate([genes, children])
+        objectives = np.concatenate([objectives, child_obj])
+        rank = non_dominated_rank(objectives)
+        crowd = crowding_distance(objectives, rank)
+        keep = np.lexsort((-crowd, rank))[:pop_size]
+        genes, objectives = genes[keep], objectives[keep]
+        rank = non_dominated_rank(objectives)
+        crowd = crowding_distance(objectives, rank)
+
+    keys = list(archive)
+    values = np.array([archive[k] for k in keys])
+    front = pareto_mask((-values[:, 0], values[:, 1], values[:, 2]))
+    order = np.flatnonzero(front)[np.argsort(-values[front, 0], kind="stable")]
+    names = np.array(binders, dtype=object)
+    codes = np.array([keys[i][0] for i in order], dtype=np.intp)
+    columns = {
+        "Binder_Type": names[codes],
+        "Solvent_Type": np.array([BINDER_SOLVENTS.get(b, "") for b in names[codes]], dtype=object),
+        "Drying_Temp_C": np.array([keys[i][1] for i in order]),
+        "Drying_Time_min": np.array([keys[i][2] for i in order]),
+        "Loading_mg_cm2": np.array([keys[i][3] for i in order]),
+        "Decay_Rate": values[order, 4],
+        "EOL_Cycle": values[order, 0],
+        "CO2_kg_per_kg": values[order, 1],
+        "Energy_kWh_per_kg": values[order, 2],
+        "VOC_g_per_kg": values[order, 3],
+    }
+    n_evaluated = pop_size * (generations + 1)
+    return CoOptResult(columns, n_evaluated, n_computed, generations, time.perf_counter() - t0)
+
+
+@lru_cache(maxsize=16)
+def co_optimize_cached(pattern, binders, temp_range, time_range, loading_range, generations=40, pop_size=100, seed=0,
+                       workers=None):
+    """Engine 2 탭용: 조건(해시 가능한 값)별 공동 최적화 결과 (캐시). workers: None이면 CPU 수"""
+    return co_optimize(pattern, binders, temp_range, time_range, loading_range, pop_size, generations, seed,
+                       workers=workers)
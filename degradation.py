@@ -0,0 +1,160 @@
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from engine1 import CAP_NOISE_SCALE, CE_NOISE_SCALE
+
+
+# ==============================================================================
+# [물리 기반 열화 모델] SEI 성장(√t) + 리튬 plating(C-rate) + Arrhenius 온도 의존성
+# ==============================================================================
+GAS_CONSTANT = 8.314         # J/(mol·K)
+T_REF = 298.15               # 기준 온도 25°C (K)
+
+# 충/방전 패턴별 C-rate (Engine 1 탭 선택 목록과 동일한 이름)
+PATTERN_C_RATES = {
+    "Slow Charge/Discharge": 0.5,
+    "Charge/Discharge": 1.0,
+    "Fast Charge/Discharge": 3.0,
+}
+
+# 용량 손실(초기 용량 대비 비율)
+#   SEI:     loss_sei² 이 누적 시간 × k_sei² × A_sei(T) 에 비례 (일정 온도에서 loss_sei = k_sei·√t)
+#   plating: 사이클마다 k_plating × A_plating(T) × max(실효 C-rate - c_crit, 0)^plating_order
+# A(T) = exp(-Ea/R · (1/T - 1/T_REF)). plating은 저온에서 빨라지므로 ea_plating이 음수.
+# 기본값은 25°C에서 경험식(engine1)의 패턴별 EOL 사이클과 비슷해지도록 맞춘 값이다.
+DegradationParams = namedtuple("DegradationParams", [
+    "k_sei", "ea_sei", "k_plating", "c_crit", "plating_order", "ea_plating",
+])
+DEFAULT_PARAMS = DegradationParams(
+    k_sei=0.0025,            # 1/√h
+    ea_sei=35e3,             # J/mol
+    k_plating=3.7e-4,        # 사이클당
+    c_crit=0.5,
+    plating_order=1.0,
+    ea_plating=-40e3,        # J/mol
+)
+
+DegradationResult = namedtuple("DegradationResult", ["x", "retention", "ce", "sei_loss", "plating_loss"])
+
+
+def arrhenius(ea, temp_c):
+    """기준 온도(25°C) 대비 반응 속도 배율"""
+    temp_k = np.asarray(temp_c, dtype=float) + 273.15
+    return np.exp(-ea / GAS_CONSTANT * (1.0 / temp_k - 1.0 / T_REF))
+
+
+def _per_cell(values, n_cells, cycles):
+    """
+    스칼라/(셀,)/(셀, 사이클) 입력을 적분 루프용으로 정리.
+    반환: (배열, 사이클별 여부). 사이클별 입력은 (사이클, 셀)로 바꿔 루프에서 행 단위로 연속 접근한다.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 2:
+        return np.ascontiguousarray(np.broadcast_to(values, (n_cells, cycles)).T), True
+    return np.broadcast_to(values, (n_cells,)).copy(), False
+
+
+def integrate_degradation(c_rates, temps_c=25.0, cycles=1000, params=DEFAULT_PARAMS, rest_hours=0.0,
+                          k_scale=1.0):
+    """
+    여러 셀의 용량 유지율을 사이클 단위 고정 스텝(Euler)으로 한 번에 적분 (노이즈 없음).
+
+    c_rates, temps_c, rest_hours: 스칼라, (셀,) 또는 사이클별 프로파일 (셀, 사이클)
+    k_scale: 셀별 열화 계수 배율 (제조 편차), 스칼라 또는 (셀,)
+
+    - SEI는 loss² 을 누적하므로 온도가 바뀌어도 √t 성장을 스텝 오차 없이 따라간다.
+    - 같은 전류로 줄어든 용량을 충전하므로 실효 C-rate = C-rate / 유지율 이 되어
+      용량이 줄수록 plating이 빨라진다 (후반 가속 열화).
+    - 쿨롱 효율 = 이번 사이클 유지율 / 이전 사이클 유지율 (사이클당 비가역 손실)
+    반환: DegradationResult. 배열은 (셀, 사이클) 형태다.
+    """
+    scale = np.atleast_1d(np.asarray(k_scale, dtype=float))
+    n_cells = max(np.atleast_1d(np.asarray(c_rates)).shape[0], np.atleast_1d(np.asarray(temps_c)).shape[0], len(scale))
+    c_rate, c_by_cycle = _per_cell(c_rates, n_cells, cycles)
+    temp, t_by_cycle = _per_cell(temps_c, n_cells, cycles)
+    rest, r_by_cycle = _per_cell(rest_hours, n_cells, cycles)
+    scale = np.broadcast_to(scale, (n_cells,))
+    # 온도 배율과 셀별 계수를 미리 곱해 둠 (루프 안에서는 덧셈/곱셈만)
+    sei_rate = params.k_sei ** 2 * arrhenius(params.ea_sei, temp) * scale ** 2
+    plating_rate = params.k_plating * arrhenius(params.ea_plating, temp) * scale
+
+    sei2 = np.zeros(n_cells)
+    plating = np.zeros(n_cells)
+    q = np.ones(n_cells)
+    c_eff = np.empty(n_cells)
+    dt = np.empty(n_cells)
+    drive = np.empty(n_cells)
+    q_new = np.empty(n_cells)
+    retention = np.empty((cycles, n_cells))
+    ce = np.empty((cycles, n_cells))
+    sei_loss = np.empty((cycles, n_cells))
+    plating_loss = np.empty((cycles, n_cells))
+    order = params.plating_order
+
+    for n in range(cycles):
+        c_n = c_rate[n] if c_by_cycle else c_rate
+        np.maximum(q, 1e-6, out=q_new)
+        np.divide(c_n, q_new, out=c_eff)
+        # 사이클 시간(h) = 충전 + 방전 = 2 / 실효 C-rate (+ 휴지)
+        np.divide(2.0, c_eff, out=dt)
+        dt += rest[n] if r_by_cycle else rest
+        sei2 += dt * (sei_rate[n] if t_by_cycle else sei_rate)
+        np.subtract(c_eff, params.c_crit, out=drive)
+        np.maximum(drive, 0.0, out=drive)
+        if order != 1.0:
+            drive **= order
+        drive *= plating_rate[n] if t_by_cycle else plating_rate
+        plating += drive
+        np.sqrt(sei2, out=sei_loss[n])
+        plating_loss[n] = plating
+        np.subtract(1.0, sei_loss[n], out=q_new)
+        q_new -= plating
+        np.maximum(q_new, 0.0, out=q_new)
+        np.divide(q_new, np.maximum(q, 1e-6), out=ce[n])
+        retention[n] = q_new
+        q, q_new = q_new, q
+
+    ce *= 100.0
+    return DegradationResult(np.arange(1, cycles + 1), retention.T, ce.T, sei_loss.T, plating_loss.T)
+
+
+def predict_life_and_ce_physics(c_rates, specific_cap_bases=185.0, cycles=1000, temps_c=25.0,
+                                params=DEFAULT_PARAMS, k_scale=1.0, rng=None):
+    """
+    predict_life_and_ce_batch와 같은 형태(x, capacity (N, C), ce (N, C))로 물리 모델 결과를 반환.
+    측정 노이즈는 경험식과 같은 크기(CAP_NOISE_SCALE)를 용량에, CE_NOISE_SCALE을 쿨롱 효율(%)에 더한다.
+    """
+    rng = np.random.default_rng(rng)
+    result = integrate_degradation(c_rates, temps_c, cycles, params, k_scale=k_scale)
+    cap_base = np.atleast_1d(np.asarray(specific_cap_bases, dtype=float))[:, None]
+    n_cells = result.retention.shape[0]
+    capacity = (result.retention + rng.normal(0, CAP_NOISE_SCALE, size=(n_cells, cycles))) * cap_base
+    ce = result.ce + rng.normal(0, CE_NOISE_SCALE, size=(n_cells, cycles))
+    return result.x, np.clip(capacity, 0, None), np.clip(ce, 0, 100.0)
+
+
+@lru_cache(maxsize=64)
+def simulate_patterns_physics(patterns, specific_cap_base, cycles, seed, temp_c=25.0):
+    """Engine 1 탭용: simulate_patterns와 같은 형태의 물리 모델 결과 (읽기 전용, 캐시)"""
+    x, capacity, ce = predict_life_and_ce_physics(
+        [PATTERN_C_RATES[p] for p in patterns], specific_cap_base, cycles, temp_c, rng=seed
+    )
+    for arr in (x, capacity, ce):
+        arr.setflags(write=False)
+    return x, capacity, ce
+
+
+def solve_eol_cycles_physics(c_rates, temps_c=25.0, eol_ratio=0.8, max_cycles=20000, params=DEFAULT_PARAMS):
+    """노이즈 없는 물리 모델에서 유지율이 eol_ratio 미만이 되는 첫 사이클 (도달하지 않으면 NaN)"""
+    retention = integrate_degradation(c_rates, temps_c, max_cycles, params).retention
+    below = retention < eol_ratio
+    hit = below.any(axis=1)
+    return np.where(hit, np.argmax(below, axis=1) + 1, np.nan)
+
+
+@lru_cache(maxsize=64)
+def pattern_eol_physics(pattern, temp_c=25.0, eol_ratio=0.8):
+    """Engine 1 탭용: 패턴/온도별 예상 EOL 사이클 (캐시)"""
+    return float(solve_eol_cycles_physics(PATTERN_C_RATES[pattern], temp_c, eol_ratio)[0])
@@ -0,0 +1,412 @@
+import json
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+# ==============================================================================
+# [Engine 1] 배터리 수명(용량 유지율) 및 쿨롱 효율 예측 모델
+# ==============================================================================
+# 충/방전 패턴별 열화 속도 (Engine 1 탭 선택 목록과 동일한 이름)
+DECAY_RATES = {
+    "Slow Charge/Discharge": 0.5,
+    "Charge/Discharge": 2.5,
+    "Fast Charge/Discharge": 8.0,
+}
+
+# 용량 감소 모델: retention = 1 - LINEAR_FADE * x * d - ACC_FADE_AMP * exp(ACC_FADE_RATE * x) * d
+LINEAR_FADE = 0.00015
+ACC_FADE_AMP = 1e-9
+ACC_FADE_RATE = 0.015
+CAP_NOISE_SCALE = 0.0015
+# 물리 모델의 쿨롱 효율(%) 측정 노이즈 표준편차: 용량 노이즈(0.15%)의 1/10 크기를 %p 단위로 (= 0.015%p)
+CE_NOISE_SCALE = CAP_NOISE_SCALE * 10
+# 가속 열화 항 상한(자연로그): 항이 2를 넘으면 decay > 0인 시나리오의 유지율은 이미 0 미만이라
+# clip 후 용량은 그대로 0이다. exp(0.015·x)가 x ≈ 47,000에서 overflow 나는 것을 막는다.
+EXP_SATURATION = np.log(2.0)
+EXP_ARG_MAX = 700.0           # float64 exp overflow(≈709) 전 지수 상한
+
+
+def fade_retention(decay_rate, x, acc_fade_rate=ACC_FADE_RATE):
+    """
+    노이즈를 제외한 결정론적 용량 유지율 (decay_rate, x, acc_fade_rate는 서로 브로드캐스트 가능한 배열).
+    가속 열화 항은 ±exp(EXP_SATURATION)에서 잘라 사이클 수와 상관없이 overflow가 없다 (stream_life_and_ce와 같은 상한).
+    """
+    linear_fade = LINEAR_FADE * x * decay_rate
+    growth = ACC_FADE_AMP * np.exp(np.minimum(acc_fade_rate * x, EXP_ARG_MAX))
+    limit = np.exp(EXP_SATURATION)
+    with np.errstate(over="ignore"):
+        acc_fade = growth * decay_rate
+        if np.size(acc_fade) and np.max(growth) * np.max(np.abs(decay_rate)) > limit:   # 짧은 시뮬레이션은 자를 필요 없음
+            acc_fade = np.clip(acc_fade, -limit, limit)   # 스칼라 입력이면 out= 인자를 쓸 수 없음
+    return 1.0 - linear_fade - acc_fade
+
+
+def ce_profile(decay_rate, x):
+    """열화 속도 구간별 기준 쿨롱 효율(%)과 노이즈 크기 반환 (decay < 1.5 / < 3.0 / 그 외)"""
+    decay_rate = np.asarray(decay_rate, dtype=float)
+    base_ce = np.where(decay_rate < 1.5, 99.98, np.where(decay_rate < 3.0, 99.90, 99.5 - (x * 0.0005)))
+    ce_noise_scale = np.where(decay_rate < 1.5, 0.01, np.where(decay_rate < 3.0, 0.03, 0.15))
+    return base_ce, ce_noise_scale
+
+
+def predict_life_and_ce(decay_rate, specific_cap_base=185.0, cycles=1000, rng=None, acc_fade_rate=ACC_FADE_RATE):
+    """
+    단일 패턴 용량/쿨롱 효율 예측.
+    rng: numpy Generator 또는 seed(int). 같은 seed면 같은 곡선을 반환한다.
+    acc_fade_rate: 가속 열화 지수 (calibration.fit_fade로 실측 데이터에 맞춘 값을 넣을 수 있음)
+    """
+    rng = np.random.default_rng(rng)
+    x = np.arange(1, cycles + 1)
+    cap_noise = rng.normal(0, CAP_NOISE_SCALE, size=len(x))
+    retention = fade_retention(decay_rate, x, acc_fade_rate) + cap_noise
+    capacity = retention * specific_cap_base
+
+    base_ce, ce_noise_scale = ce_profile(decay_rate, x)
+    ce_noise = rng.normal(0, ce_noise_scale, size=len(x))
+    ce = np.clip(base_ce + ce_noise, 0, 100.0)
+    return x, np.clip(capacity, 0, None), ce
+
+
+def predict_life_and_ce_batch(decay_rates, specific_cap_bases=185.0, cycles=1000, rng=None):
+    """
+    여러 시나리오(열화 속도 × 초기 용량 × 사이클 수)를 한 번에 계산.
+    인자는 스칼라 또는 1-D 배열이며 서로 브로드캐스트된다. rng: Generator 또는 seed.
+
+    반환: x (C,), capacity (N, C), ce (N, C)
+          C = 시나리오 중 최대 사이클 수. 각 시나리오의 cycles 이후 구간은 NaN.
+    """
+    decay, cap_base, n_cycles = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(decay_rates, dtype=float)),
+        np.atleast_1d(np.asarray(specific_cap_bases, dtype=float)),
+        np.atleast_1d(np.asarray(cycles, dtype=int)),
+    )
+    rng = np.random.default_rng(rng)
+    n_scenarios = decay.shape[0]
+    x = np.arange(1, int(n_cycles.max()) + 1)
+    d = decay[:, None]
+
+    cap_noise = rng.normal(0, CAP_NOISE_SCALE, size=(n_scenarios, len(x)))
+    retention = fade_retention(d, x) + cap_noise
+    capacity = np.clip(retention * cap_base[:, None], 0, None)
+
+    base_ce, ce_noise_scale = ce_profile(d, x)
+    ce_noise = rng.normal(0, 1.0, size=(n_scenarios, len(x))) * ce_noise_scale
+    ce = np.clip(base_ce + ce_noise, 0, 100.0)
+
+    # 시나리오별 목표 사이클 이후는 비워둠
+    beyond = x[None, :] > n_cycles[:, None]
+    capacity[beyond] = np.nan
+    ce[beyond] = np.nan
+    return x, capacity, ce
+
+
+# ==============================================================================
+# [사전 계산 테이블] 패턴별 결정론적 유지율/기준 CE를 한 번 계산해 .npy로 저장 (memory-map)
+# ==============================================================================
+# Engine 1 탭 입력은 패턴 3개 × 사이클 최대 2000이고, 용량은 초기 용량에 비례하므로
+# (패턴, 사이클) 표 하나로 모든 조합을 자르고 곱하는 것만으로 만들 수 있다.
+LUT_DIR = os.path.join(current_dir, ".data_cache")
+LUT_PATH = os.path.join(LUT_DIR, "engine1_lut.npy")     # (2, 패턴, 사이클): [유지율, 기준 CE]
+LUT_MAX_CYCLES = 2000
+
+PatternLUT = namedtuple("PatternLUT", ["index", "retention", "base_ce", "max_cycles"])
+
+
+def _lut_signature(max_cycles):
+    """표를 만든 모델 상수. 상수가 바뀌면 저장된 표를 다시 만든다."""
+    return {
+        "max_cycles": max_cycles, "decay_rates": DECAY_RATES,
+        "linear_fade": LINEAR_FADE, "acc_fade_amp": ACC_FADE_AMP, "acc_fade_rate": ACC_FADE_RATE,
+    }
+
+
+def _lut_arrays(max_cycles):
+    decay = np.array(list(DECAY_RATES.values()))[:, None]
+    x = np.arange(1, max_cycles + 1)
+    base_ce, _ = ce_profile(decay, x)
+    return np.stack([fade_retention(decay, x), np.broadcast_to(base_ce, (len(decay), max_cycles))])
+
+
+def build_pattern_lut(path=LUT_PATH, max_cycles=LUT_MAX_CYCLES):
+    """
+    사전 계산 단계: 표(.npy)와 색인(.json: 패턴 순서 + 모델 상수)을 저장.
+    python cli.py lut 로 배포 전에 한 번 실행해 둘 수 있다 (없으면 첫 사용 때 만든다).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(tmp_path, _lut_arrays(max_cycles))
+    index = dict(_lut_signature(max_cycles), patterns=list(DECAY_RATES))
+    with open(f"{tmp_path}.json", "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    os.replace(f"{tmp_path}.json", os.path.splitext(path)[0] + ".json")
+    return path
+
+
+@lru_cache(maxsize=2)
+def load_pattern_lut(path=LUT_PATH, max_cycles=LUT_MAX_CYCLES):
+    """
+    저장된 표를 memory-map으로 열어 PatternLUT 반환. 없거나 모델 상수가 다르면 새로 만든다.
+    디렉터리에 쓸 수 없으면 메모리에서만 계산한 표를 쓴다.
+    """
+    index_path = os.path.splitext(path)[0] + ".json"
+    table = None
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        if {k: index.get(k) for k in _lut_signature(max_cycles)} == json.loads(json.dumps(_lut_signature(max_cycles))):
+            table = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        table = None
+    if table is None:
+        try:
+            build_pattern_lut(path, max_cycles)
+            table = np.load(path, mmap_mode="r")
+        except OSError:
+            table = _lut_arrays(max_cycles)
+    patterns = list(DECAY_RATES)
+    return PatternLUT({p: i for i, p in enumerate(patterns)}, table[0], table[1], max_cycles)
+
+
+def lut_life_and_ce(lut, patterns, specific_cap_base, cycles, rng=None):
+    """
+    표를 잘라 초기 용량을 곱하고 노이즈만 더함 (predict_life_and_ce_batch와 같은 난수 순서라 같은 seed면 같은 값).
+    """
+    rng = np.random.default_rng(rng)
+    rows = [lut.index[p] for p in patterns]
+    x = np.arange(1, cycles + 1)
+    retention = lut.retention[rows, :cycles]
+    base_ce = lut.base_ce[rows, :cycles]
+    _, ce_noise_scale = ce_profile(np.array([DECAY_RATES[p] for p in patterns])[:, None], 0.0)
+
+    capacity = retention + rng.normal(0, CAP_NOISE_SCALE, size=retention.shape)
+    capacity *= specific_cap_base
+    np.maximum(capacity, 0, out=capacity)
+    ce = rng.normal(0, 1.0, size=retention.shape)
+    ce *= ce_noise_scale
+    ce += base_ce
+    np.clip(ce, 0, 100.0, out=ce)
+    return x, capacity, ce
+
+
+@lru_cache(maxsize=128)
+def simulate_patterns(patterns, specific_cap_base, cycles, seed):
+    """
+    패턴 이름 튜플 기준 배치 예측. (패턴, 초기 용량, 사이클 수, seed)가 같으면 캐시된 결과를 즉시 반환.
+    탭 입력 범위 안이면 사전 계산 표를 잘라 쓰고, 범위 밖이면 직접 계산한다.
+    반환 배열은 캐시와 공유되므로 읽기 전용으로 고정한다.
+    """
+    if cycles <= LUT_MAX_CYCLES:
+        x, capacity, ce = lut_life_and_ce(load_pattern_lut(), patterns, specific_cap_base, cycles, rng=seed)
+    else:
+        x, capacity, ce = predict_life_and_ce_batch(
+            [DECAY_RATES[p] for p in patterns], specific_cap_base, cycles, rng=seed
+        )
+    for arr in (x, capacity, ce):
+        arr.setflags(write=False)
+    return x, capacity, ce
+
+
+# ==============================================================================
+# [스트리밍] 긴 수명(10만+ 사이클) 시나리오를 고정 크기 버퍼로 나눠 계산 (메모리는 사이클 수와 무관)
+# ==============================================================================
+STREAM_CHUNK = 4096
+
+
+def stream_life_and_ce(decay_rates, specific_cap_bases=185.0, cycles=1000, chunk_size=STREAM_CHUNK, rng=None,
+                       dtype=np.float32, acc_fade_rate=ACC_FADE_RATE):
+    """
+    predict_life_and_ce_batch의 스트리밍 버전. 사이클 축을 chunk_size씩 나눠
+    (x (k,), capacity (N, k), ce (N, k))를 차례로 yield한다.
+
+    - 버퍼는 chunk마다 재사용되므로 값을 보관하려면 복사해야 한다.
+    - 가속 열화 항은 fade_retention과 같이 EXP_SATURATION에서 잘라 계산하므로 overflow가 없다
+      (decay < 0인 시나리오는 유지율 상승 폭이 이 상한에서 멈춘다).
+    - 노이즈 생성 방식과 정밀도(dtype)가 달라 같은 seed라도 배치 계산과 값이 일치하지는 않는다 (분포는 같음).
+    cycles가 시나리오별 배열이면 각 시나리오의 cycles 이후 구간은 NaN.
+    """
+    decay, cap_base, n_cycles = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(decay_rates, dtype=float)),
+        np.atleast_1d(np.asarray(specific_cap_bases, dtype=float)),
+        np.atleast_1d(np.asarray(cycles, dtype=np.int64)),
+    )
+    rng = np.random.default_rng(rng)
+    n_scenarios = decay.shape[0]
+    total = int(n_cycles.max())
+    ragged = bool((n_cycles != total).any())
+
+    # 시나리오별 상수는 float64로 계산한 뒤 (N, 1) 열로 변환
+    col = lambda v: np.asarray(v, dtype=dtype).reshape(n_scenarios, 1)
+    with np.errstate(divide="ignore"):
+        log_amp = col(np.log(ACC_FADE_AMP * np.abs(decay)))       # decay = 0 -> -inf -> 항 = 0
+    acc_sign = col(np.sign(decay))
+    lin = col(LINEAR_FADE * decay)
+    rate = col(np.broadcast_to(acc_fade_rate, decay.shape))
+    base = col(cap_base)
+    ce_base, ce_scale = ce_profile(decay, 0.0)
+    ce_slope = col(ce_base - ce_profile(decay, 1.0)[0])           # 사이클당 기준 CE 감소량
+    ce_base, ce_scale = col(ce_base), col(ce_scale)
+    last = col(n_cycles)
+
+    # 1차원 버퍼를 (N, k)로 잘라 써서 마지막 짧은 chunk도 연속 배열로 유지
+    width = min(chunk_size, total)
+    x_buf = np.empty(width, dtype=dtype)
+    cap_buf = np.empty(n_scenarios * width, dtype=dtype)
+    ce_buf = np.empty(n_scenarios * width, dtype=dtype)
+    tmp_buf = np.empty(n_scenarios * width, dtype=dtype)
+    mask_buf = np.empty(n_scenarios * width, dtype=bool)
+
+    for start in range(0, total, width):
+        k = min(width, total - start)
+        x = x_buf[:k]
+        cap, ce, tmp = (buf[:n_scenarios * k].reshape(n_scenarios, k) for buf in (cap_buf, ce_buf, tmp_buf))
+        x[:] = np.arange(start + 1, start + k + 1)
+
+        # 가속 열화 항: sign · exp(min(log(amp·|d|) + rate·x, 상한))
+        np.multiply(rate, x, out=tmp)
+        tmp += log_amp
+        np.minimum(tmp, EXP_SATURATION, out=tmp)
+        np.exp(tmp, out=tmp)
+        tmp *= acc_sign
+        # 용량 = (1 - lin·x - 가속 항 + 노이즈) · 초기 용량
+        np.multiply(lin, x, out=cap)
+        cap += tmp
+        np.subtract(1.0, cap, out=cap)
+        rng.standard_normal(out=tmp, dtype=dtype)
+        tmp *= CAP_NOISE_SCALE
+        cap += tmp
+        cap *= base
+        np.maximum(cap, 0, out=cap)
+
+        # 쿨롱 효율 = 기준 CE - slope·x + 노이즈
+        np.multiply(ce_slope, x, out=ce)
+        np.subtract(ce_base, ce, out=ce)
+        rng.standard_normal(out=tmp, dtype=dtype)
+        tmp *= ce_scale
+        ce += tmp
+        np.clip(ce, 0, 100.0, out=ce)
+
+        if ragged:
+            mask = mask_buf[:n_scenarios * k].reshape(n_scenarios, k)
+            np.greater(x, last, out=mask)
+            np.copyto(cap, np.nan, where=mask)
+            np.copyto(ce, np.nan, where=mask)
+        yield x, cap, ce
+
+
+def summarize_stream(decay_rates, specific_cap_bases=185.0, cycles=1000, eol_ratio=0.8, **kwargs):
+    """
+    stream_life_and_ce를 끝까지 돌며 시나리오별 (마지막 용량, 마지막 CE, 첫 EOL 사이클)만 남김.
+    전체 곡선을 만들지 않으므로 메모리는 chunk 크기 × 시나리오 수로 일정하다. 도달하지 않은 EOL은 NaN.
+    """
+    decay, cap_base, n_cycles = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(decay_rates, dtype=float)),
+        np.atleast_1d(np.asarray(specific_cap_bases, dtype=float)),
+        np.atleast_1d(np.asarray(cycles, dtype=np.int64)),
+    )
+    limit = (cap_base * eol_ratio)[:, None]
+    final_cap = np.full(decay.shape, np.nan)
+    final_ce = np.full(decay.shape, np.nan)
+    eol = np.full(decay.shape, np.nan)
+    rows = np.arange(len(decay))
+    for x, cap, ce in stream_life_and_ce(decay, cap_base, n_cycles, **kwargs):
+        below = cap < limit
+        hit = np.isnan(eol) & below.any(axis=1)
+        eol[hit] = x[np.argmax(below[hit], axis=1)]
+        ends = (n_cycles >= x[0]) & (n_cycles <= x[-1])
+        col = n_cycles[ends] - int(x[0])
+        final_cap[ends] = cap[rows[ends], col]
+        final_ce[ends] = ce[rows[ends], col]
+    return final_cap, final_ce, eol
+
+
+# ==============================================================================
+# [EOL 계산] 전체 곡선을 만들지 않고 수명 종료(EOL) 사이클을 직접 계산
+# ==============================================================================
+def first_cycle_below(lin, amp, threshold, max_cycles):
+    """
+    retention(n) = 1 - lin * n - amp * exp(ACC_FADE_RATE * n) 이 threshold 미만이 되는 첫 사이클(1-based).
+    lin, amp >= 0 이면 retention은 단조 감소하므로 정수 이분 탐색(log2(max_cycles)회)으로 시나리오 전체를 한 번에 푼다.
+    max_cycles 안에 도달하지 않으면 NaN.
+    """
+    lin, amp, threshold = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(lin, dtype=float)),
+        np.atleast_1d(np.asarray(amp, dtype=float)),
+        np.atleast_1d(np.asarray(threshold, dtype=float)),
+    )
+    lo = np.zeros(lin.shape, dtype=np.int64)
+    hi = np.full(lin.shape, max_cycles + 1, dtype=np.int64)   # max_cycles + 1: '도달 못함' 표식
+    with np.errstate(over="ignore"):
+        while True:
+            active = hi - lo > 1
+            if not active.any():
+                break
+            mid = (lo + hi) // 2
+            retention = 1.0 - lin * mid - amp * np.exp(ACC_FADE_RATE * mid)
+            below = (retention < threshold) & active
+            hi = np.where(below, mid, hi)
+            lo = np.where(active & ~below, mid, lo)
+    eol = hi.astype(float)
+    eol[hi > max_cycles] = np.nan
+    return eol
+
+
+def solve_eol_cycles(decay_rates, eol_ratio=0.8, max_cycles=20000):
+    """
+    노이즈를 제외한 결정론적 모델에서 용량이 초기값의 eol_ratio 미만이 되는 첫 사이클.
+    용량은 초기 용량에 비례하므로 EOL 사이클은 열화 속도에만 의존한다.
+    """
+    decay = np.atleast_1d(np.asarray(decay_rates, dtype=float))
+    return first_cycle_below(LINEAR_FADE * decay, ACC_FADE_AMP * decay, eol_ratio, max_cycles)
+
+
+def sample_eol_cycles(decay_rates, n_draws=1000, eol_ratio=0.8, max_cycles=20000, band_sigma=6.0, max_block=4_000_000, rng=None):
+    """
+    용량 노이즈(사이클별 독립 정규분포)를 포함한 EOL 사이클 분포를 Monte Carlo로 추정.
+
+    노이즈가 ±band_sigma·σ를 넘을 확률은 무시할 수 있으므로, 결정론적 유지율이
+    eol_ratio ± band_sigma·σ 사이에 있는 좁은 구간에서만 노이즈를 생성한다.
+    반환: (시나리오 수, n_draws) 배열, max_cycles 안에 도달하지 않으면 NaN.
+    """
+    rng = np.random.default_rng(rng)
+    decay = np.atleast_1d(np.asarray(decay_rates, dtype=float))
+    lin, amp = LINEAR_FADE * decay, ACC_FADE_AMP * decay
+    band = band_sigma * CAP_NOISE_SCALE
+    n_lo = first_cycle_below(lin, amp, eol_ratio + band, max_cycles)
+    n_hi = first_cycle_below(lin, amp, eol_ratio - band, max_cycles)
+    n_hi = np.where(np.isnan(n_hi), max_cycles, n_hi)
+
+    samples = np.full((len(decay), n_draws), np.nan)
+    reachable = np.flatnonzero(~np.isnan(n_lo))
+    if len(reachable) == 0:
+        return samples
+
+    widths = (n_hi[reachable] - n_lo[reachable]).astype(np.int64) + 1
+    # 구간 폭이 비슷한 시나리오끼리 묶어 (draws × 시나리오 × 구간) 블록 크기를 제한
+    order = reachable[np.argsort(widths)]
+    widths = np.sort(widths)
+    start = 0
+    while start < len(order):
+        stop = start + 1
+        while stop < len(order) and n_draws * int(widths[stop]) * (stop - start + 1) <= max_block:
+            stop += 1
+        idx = order[start:stop]
+        width = int(widths[stop - 1])
+
+        n = n_lo[idx, None] + np.arange(width)                       # (k, W)
+        valid = n <= n_hi[idx, None]
+        with np.errstate(over="ignore"):
+            retention = 1.0 - lin[idx, None] * n - amp[idx, None] * np.exp(ACC_FADE_RATE * n)
+        noise = rng.normal(0, CAP_NOISE_SCALE, size=(n_draws, len(idx), width))
+        below = ((retention + noise) < eol_ratio) & valid              # (draws, k, W)
+        hit = below.any(axis=2)
+        first = np.argmax(below, axis=2)
+        samples[idx] = np.where(hit, n_lo[idx] + first, np.nan).T
+        start = stop
+    return samples
@@ -0,0 +1,327 @@
+import hashlib
+import os
+from functools import lru_cache
+
+import numpy as np
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(current_dir, "engine2_database.xlsx")
+CACHE_DIR = os.path.join(current_dir, ".data_cache")
+
+DB_COLUMNS = {
+    "binder": "Binder_Type",
+    "solvent": "Solvent_Type",
+    "temp": "Drying_Temp_C",
+    "time": "Drying_Time_min",
+    "loading": "Areal_Mass_Loading_mg_cm^2",
+    "co2": "CO2_kg_per_m2",
+    "energy": "Energy_kWh_per_m2",
+    "voc": "VOC_g_per_m2",
+}
+
+
+# ==============================================================================
+# [Engine 2] 공정 조건별 환경 영향 계산 (물리 기반 모델)
+# ==============================================================================
+# 바인더별 CO₂ 계수 (불소계 PVDF는 높고, 바이오 기반 수계 바인더는 낮음)
+CO2_FACTORS = {"PVDF": 0.45, "CMGG": 0.12, "GG": 0.12, "CMC": 0.12}
+DEFAULT_CO2_FACTOR = 0.3
+
+# 바인더가 녹는 용매 (PVDF는 소수성이라 NMP, 수계 바인더는 Water만 가능)
+BINDER_SOLVENTS = {"PVDF": "NMP", "CMGG": "Water", "GG": "Water", "CMC": "Water"}
+
+
+def calculate_lca_impact(binder_type, solvent_type, drying_temp, loading_mass, drying_time):
+    if solvent_type == "NMP":
+        voc_base = 3.0; voc_val = voc_base * (loading_mass / 10.0); voc_desc = "Critical (NMP Toxicity)"
+    else:
+        voc_val = 0.0; voc_desc = "Clean (Water Vapor)"
+
+    if binder_type == "PVDF":
+        chem_formula = "-(C₂H₂F₂)ₙ-"; co2_desc = f"High ({chem_formula})"
+    elif binder_type in ["CMGG", "GG", "CMC"]:
+        chem_formula = "Bio-based (C,H,O)"; co2_desc = f"Low ({chem_formula})"
+    else:
+        co2_desc = "Medium"
+    co2_val = CO2_FACTORS.get(binder_type, DEFAULT_CO2_FACTOR) * (loading_mass / 20.0)
+
+    energy_val = drying_energy(solvent_type, drying_temp, drying_time)
+
+    return co2_val, energy_val, voc_val, co2_desc, voc_desc
+
+
+def drying_energy(solvent_type, drying_temp, drying_time):
+    """건조 에너지 (kWh/m²): 용매 끓는점 대비 건조 온도에 따른 효율과 공정 가중치 반영 (배열 입력 가능)"""
+    return _drying_energy(np.asarray(solvent_type) == "NMP", drying_temp, drying_time)
+
+
+def _drying_energy(is_nmp, drying_temp, drying_time):
+    bp = np.where(is_nmp, 204.1, 100.0)
+    process_penalty = np.where(is_nmp, 1.5, 1.0)
+    delta_T = np.maximum(np.asarray(drying_temp, dtype=float) - 25, 0)
+    efficiency = np.where(np.asarray(drying_temp) >= bp, 1.0, 0.6)
+    energy = (delta_T * np.asarray(drying_time, dtype=float) * process_penalty) / (efficiency * 50000.0)
+    return float(energy) if np.ndim(energy) == 0 else energy
+
+
+# ==============================================================================
+# [Engine 2 DB] engine2_database.xlsx 실측값 조회 (Arrow 컬럼 캐시)
+# ==============================================================================
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _read_source(path):
+    """xlsx -> 정리된 Arrow 테이블 (필요한 열만, 바인더 없는 행 제거, Binder/Solvent 앞뒤 공백 제거)"""
+    import pandas as pd
+    import pyarrow as pa
+
+    df = pd.read_excel(path, sheet_name=0)
+    df = df[[c for c in DB_COLUMNS.values() if c in df.columns]].dropna(subset=[DB_COLUMNS["binder"]])
+    for key in ("binder", "solvent"):
+        if DB_COLUMNS[key] in df.columns:
+            df[DB_COLUMNS[key]] = df[DB_COLUMNS[key]].astype(str).str.strip()
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _build_cache(path, cache_path, meta):
+    """xlsx를 한 번만 파싱하여 압축하지 않은 Arrow IPC(Feather v2) 파일로 저장 (memory-map 가능)"""
+    import pyarrow.feather as feather
+
+    table = _read_source(path)
+    table = table.replace_schema_metadata({k: str(v) for k, v in meta.items()})
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, cache_path)
+
+
+@lru_cache(maxsize=4)
+def _load_columns(path, mtime_ns, size):
+    import pyarrow.feather as feather
+
+    cache_path = os.path.join(CACHE_DIR, os.path.splitext(os.path.basename(path))[0] + ".arrow")
+    table = None
+    if os.path.exists(cache_path):
+        try:
+            table = feather.read_table(cache_path, memory_map=True)
+            meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+            fresh = meta.get("source_mtime_ns") == str(mtime_ns) and meta.get("source_size") == str(size)
+            # 수정 시각만 바뀐 경우(복사/체크아웃)는 내용 해시로 재확인
+            if not fresh and meta.get("source_sha256") != _file_sha256(path):
+                table = None
+        except Exception:
+            table = None
+
+    if table is None:
+        meta = {"source_mtime_ns": mtime_ns, "source_size": size, "source_sha256": _file_sha256(path)}
+        try:
+            _build_cache(path, cache_path, meta)
+            table = feather.read_table(cache_path, memory_map=True)
+        except OSError:
+            # 캐시 디렉터리에 쓸 수 없으면 메모리에서만 변환 (정리 방식은 캐시와 같음)
+            table = _read_source(path)
+
+    columns = {}
+    for key, name in DB_COLUMNS.items():
+        if name in table.column_names:
+            col = table.column(name)
+            columns[key] = np.asarray(col.to_pylist(), dtype=object) if key in ("binder", "solvent") else col.to_numpy()
+    return columns
+
+
+def load_database(path=DB_PATH):
+    """실측 DB를 {키: numpy 배열} 형태로 반환. 파일이 없으면 None."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return _load_columns(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=16)
+def _fit_group(path, mtime_ns, size, binder_type, solvent_type):
+    """
+    (바인더, 용매) 그룹의 로딩량 선형 회귀 계수.
+    에너지는 실측 건조 조건의 영향을 물리 모델로 나눈 뒤 회귀하여, 다른 건조 조건으로 환산할 수 있게 한다.
+    반환: {'co2'|'energy'|'voc': (기울기, 절편)}, 그룹 행 수
+    """
+    db = _load_columns(path, mtime_ns, size)
+    rows = (db["binder"] == binder_type) & (db["solvent"] == solvent_type)
+    n_rows = int(rows.sum())
+    if n_rows == 0:
+        return None, 0
+
+    loading = db["loading"][rows].astype(float)
+    targets = {
+        "co2": db["co2"][rows],
+        "voc": db["voc"][rows],
+        "energy": db["energy"][rows] / np.maximum(drying_energy(solvent_type, db["temp"][rows], db["time"][rows]), 1e-12),
+    }
+    coefs = {}
+    for key, y in targets.items():
+        y = np.asarray(y, dtype=float)
+        if n_rows >= 2 and np.ptp(loading) > 0:
+            slope, intercept = np.polyfit(loading, y, 1)
+        else:
+            slope, intercept = y.mean() / loading.mean(), 0.0   # 한 점뿐이면 로딩량에 비례한다고 가정
+        coefs[key] = (float(slope), float(intercept))
+    return coefs, n_rows
+
+
+def estimate_lca_impact(binder_type, solvent_type, drying_temp, loading_mass, drying_time, path=DB_PATH):
+    """
+    실측 DB 기반 환경 영향 추정.
+    1) 조건이 정확히 일치하는 실측 행이 있으면 그 평균값
+    2) 없으면 같은 (바인더, 용매) 실측값으로 맞춘 회귀식 (로딩량 선형, 건조 에너지는 물리 모델로 환산)
+    3) DB에 해당 조합이 없으면 물리 모델(calculate_lca_impact)
+    반환: (co2, energy, voc, co2_desc, voc_desc, source)  source: 'measured' | 'regression' | 'model'
+    """
+    co2, energy, voc, co2_desc, voc_desc = calculate_lca_impact(binder_type, solvent_type, drying_temp, loading_mass, drying_time)
+    try:
+        stat = os.stat(path)
+        db = _load_columns(path, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return co2, energy, voc, co2_desc, voc_desc, "model"
+
+    exact = ((db["binder"] == binder_type) & (db["solvent"] == solvent_type)
+             & (db["temp"] == drying_temp) & (db["time"] == drying_time)
+             & np.isclose(db["loading"].astype(float), loading_mass, atol=1e-3))
+    if exact.any():
+        return (float(db["co2"][exact].mean()), float(db["energy"][exact].mean()), float(db["voc"][exact].mean()),
+                co2_desc, voc_desc, "measured")
+
+    coefs, n_rows = _fit_group(path, stat.st_mtime_ns, stat.st_size, binder_type, solvent_type)
+    if coefs is None:
+        return co2, energy, voc, co2_desc, voc_desc, "model"
+
+    def linear(key):
+        slope, intercept = coefs[key]
+        return max(slope * loading_mass + intercept, 0.0)
+
+    energy_est = linear("energy") * drying_energy(solvent_type, drying_temp, drying_time)
+    return linear("co2"), energy_est, linear("voc"), co2_desc, voc_desc, "regression"
+
+
+# ==============================================================================
+# [Engine 2 Sweep] 공정 조건 격자 전체를 벡터 연산으로 평가하고 Pareto 최적 집합 추출
+# ==============================================================================
+def lca_impact_arrays(binder_codes, is_nmp, drying_temp, loading_mass, drying_time, co2_lut):
+    """
+    calculate_lca_impact의 배열 버전. 범주형 인자는 코드 배열로 받아 조회표(co2_lut)로 변환한다.
+    반환: co2, energy, voc 배열
+    """
+    co2 = co2_lut[binder_codes] * (loading_mass / 20.0)
+    voc = np.where(is_nmp, 3.0 * (loading_mass / 10.0), 0.0)
+    energy = _drying_energy(is_nmp, drying_temp, drying_time)
+    return co2, energy, voc
+
+
+def calculate_lca_impact_batch(binder_types, solvent_types, drying_temps, loading_masses, drying_times):
+    """
+    문자열 배열 입력용 배치 계산 (CLI/API). 바인더/용매 이름을 코드로 바꾼 뒤 lca_impact_arrays로 한 번에 계산.
+    반환: co2, energy, voc, valid (valid: 바인더-용매 조합이 BINDER_SOLVENTS에 맞는지)
+    """
+    binder_names, binder_codes = np.unique(np.asarray(binder_types, dtype=str), return_inverse=True)
+    solvents = np.asarray(solvent_types, dtype=str)
+    co2_lut = np.array([CO2_FACTORS.get(b, DEFAULT_CO2_FACTOR) for b in binder_names])
+    required = np.array([BINDER_SOLVENTS.get(b, "") for b in binder_names])[binder_codes]
+    co2, energy, voc = lca_impact_arrays(
+        binder_codes, solvents == "NMP", np.asarray(drying_temps, dtype=float),
+        np.asarray(loading_masses, dtype=float), np.asarray(drying_times, dtype=float), co2_lut,
+    )
+    return co2, energy, voc, required == solvents
+
+
+def _reduce_ties(objectives, payload):
+    """
+    마지막 목적함수를 제외한 값이 모두 같은 점들 중에서는 마지막 값이 가장 작은 점만 Pareto 후보가 될 수 있으므로
+    하나만 남김 (격자 크기와 무관하게 후보 수를 줄이는 사전 축약)
+    """
+    order = np.lexsort(tuple(reversed(objectives)))
+    same = np.ones(max(len(order) - 1, 0), dtype=bool)
+    for o in objectives[:-1]:
+        o_s = o[order]
+        same &= o_s[1:] == o_s[:-1]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = ~same
+    keep = order[first]
+    return tuple(o[keep] for o in objectives), tuple(p[keep] for p in payload)
+
+
+def pareto_mask(objectives, block=1024):
+    """
+    최소화 목적함수들(튜플)에 대한 비지배(non-dominated) 마스크.
+    블록 단위 쌍 비교로 메모리를 (block × n)으로 제한한다.
+    """
+    objectives = [np.asarray(o) for o in objectives]
+    n = len(objectives[0])
+    mask = np.ones(n, dtype=bool)
+    for start in range(0, n, block):
+        # 목적함수별 2차원 비교를 누적 (길이가 짧은 마지막 축에 대한 all/any 축약보다 훨씬 빠름)
+        le = lt = None
+        for o in objectives:
+            cand = o[start:start + block, None]
+            le = o[None, :] <= cand if le is None else le & (o[None, :] <= cand)
+            lt = o[None, :] < cand if lt is None else lt | (o[None, :] < cand)
+        mask[start:start + block] = ~(le & lt).any(axis=1)
+    return mask
+
+
+def sweep_lca_grid(binders, solvents, drying_temps, drying_times, loading_masses, chunk_size=1_000_000,
+                   maximize_loading=True):
+    """
+    (바인더 × 용매 × 건조 온도 × 건조 시간 × 로딩량) 격자를 chunk_size 단위로 평가하여
+    유효한 조합(BINDER_SOLVENTS) 중 CO₂/에너지/VOC Pareto 최적 집합을 반환.
+    m²당 영향은 로딩량이 낮을수록 작아지므로, maximize_loading이면 로딩량(면적당 활물질)을
+    최대화 목적으로 함께 두어 '로딩량별 최소 환경 부담' 곡선을 얻는다.
+    목적함수가 모두 같은 조합은 대표 하나만 남긴다.
+    반환: (결과 dict[열 이름 -> 배열], 평가한 격자점 수, 유효한 격자점 수)
+    """
+    binders = list(binders); solvents = list(solvents)
+    axes = [np.arange(len(binders)), np.arange(len(solvents)),
+            np.asarray(drying_temps, dtype=float), np.asarray(drying_times, dtype=float),
+            np.asarray(loading_masses, dtype=float)]
+    shape = tuple(len(a) for a in axes)
+    total = int(np.prod(shape))
+
+    co2_lut = np.array([CO2_FACTORS.get(b, DEFAULT_CO2_FACTOR) for b in binders])
+    solvent_is_nmp = np.array([s == "NMP" for s in solvents])
+    valid_lut = np.array([[BINDER_SOLVENTS.get(b) == s for s in solvents] for b in binders])
+
+    objectives, payload, n_valid = None, None, 0
+    for start in range(0, total, chunk_size):
+        idx = np.unravel_index(np.arange(start, min(start + chunk_size, total)), shape)
+        valid = valid_lut[idx[0], idx[1]]
+        n_valid += int(valid.sum())
+        if not valid.any():
+            continue
+        idx = tuple(i[valid] for i in idx)
+        temp, time, loading = axes[2][idx[2]], axes[3][idx[3]], axes[4][idx[4]]
+        co2, energy, voc = lca_impact_arrays(idx[0], solvent_is_nmp[idx[1]], temp, loading, time, co2_lut)
+        # 에너지는 로딩량/바인더와 독립이므로 마지막에 두어 사전 축약 효과를 최대화
+        chunk_obj = (co2, voc, -loading, energy) if maximize_loading else (co2, voc, energy)
+        chunk_payload = (idx[0], idx[1], temp, time, loading)
+        if objectives is not None:
+            chunk_obj = tuple(np.concatenate(p) for p in zip(objectives, chunk_obj))
+            chunk_payload = tuple(np.concatenate(p) for p in zip(payload, chunk_payload))
+        objectives, payload = _reduce_ties(chunk_obj, chunk_payload)
+
+    columns = ["Binder_Type", "Solvent_Type", "Drying_Temp_C", "Drying_Time_min", "Loading_mg_cm2",
+               "CO2_kg_per_m2", "Energy_kWh_per_m2", "VOC_g_per_m2"]
+    if objectives is None:
+        return {c: np.array([]) for c in columns}, total, 0
+
+    front = pareto_mask(objectives)
+    b_code, s_code, temp, time, loading = (p[front] for p in payload)
+    co2, energy, voc = lca_impact_arrays(b_code, solvent_is_nmp[s_code], temp, loading, time, co2_lut)
+    order = np.lexsort((energy, co2, loading))
+    values = [np.array(binders, dtype=object)[b_code], np.array(solvents, dtype=object)[s_code],
+              temp, time, loading, co2, energy, voc]
+    return dict(zip(columns, [v[order] for v in values])), total, n_valid
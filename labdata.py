@@ -0,0 +1,460 @@
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(current_dir, "engine1_output.csv")
+
+
+# ==============================================================================
+# [실험 데이터] engine1_output.csv -> (Sample_Type, Data_Type)별 연속 numpy 배열
+# ==============================================================================
+CycleSeries = namedtuple("CycleSeries", ["cycle", "capacity"])
+
+EMPTY_SERIES = CycleSeries(np.empty(0, dtype=np.int64), np.empty(0, dtype=float))
+
+
+class CycleStore:
+    """
+    (Sample_Type, Data_Type) -> CycleSeries(cycle, capacity) 조회 테이블.
+    각 배열은 사이클 순으로 정렬된 연속 배열이며, 조회는 딕셔너리 접근 한 번이다.
+    version: 원본 파일의 (수정 시각, 크기) 등 데이터가 바뀌면 달라지는 값. 그래프 캐시 키 등에 사용.
+    """
+
+    def __init__(self, groups, version=None):
+        self.groups = groups
+        self.version = version
+        self.samples = sorted({sample for sample, _ in groups})
+
+    def __contains__(self, sample):
+        return sample in self.samples
+
+    def get(self, sample, data_type):
+        """없는 조합이면 빈 CycleSeries"""
+        return self.groups.get((sample, data_type), EMPTY_SERIES)
+
+    def __len__(self):
+        return sum(len(s.cycle) for s in self.groups.values())
+
+
+def _stripped_codes(column):
+    """
+    범주형 열의 (코드, 이름 목록). 앞뒤 공백 정리는 행 전체가 아니라 범주 목록에만 적용하고,
+    정리 후 같아지는 범주는 하나로 합친다. 빈 값(NaN)은 -1.
+    """
+    names, remap = np.unique(column.cat.categories.astype(str).str.strip(), return_inverse=True)
+    codes = column.cat.codes.to_numpy(np.int64)
+    return np.where(codes >= 0, remap[codes], -1), names.tolist()
+
+
+def read_cycle_csv(path=DATA_PATH, version=None):
+    """
+    CSV를 한 번 읽어 범주형(category) 열 코드 기준으로 그룹을 나눔.
+    BOM이 붙은 헤더(utf-8-sig)와 Sample_Type/Data_Type 앞뒤 공백은 여기서 정리한다.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(
+        path, encoding="utf-8-sig",
+        dtype={"Sample_Type": "category", "Data_Type": "category", "Cycle": np.int64, "Capacity": np.float64},
+    )
+    sample_codes, samples = _stripped_codes(df["Sample_Type"])
+    type_codes, data_types = _stripped_codes(df["Data_Type"])
+    valid = (sample_codes >= 0) & (type_codes >= 0)
+    n_types = len(data_types)
+    codes = (sample_codes * n_types + type_codes)[valid]
+    cycle = df["Cycle"].to_numpy()[valid]
+    capacity = df["Capacity"].to_numpy()[valid]
+    groups = {}
+    if len(codes) == 0:
+        return CycleStore(groups, version)
+
+    order = np.lexsort((cycle, codes))
+    codes = codes[order]
+    bounds = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate([[0], bounds])
+    stops = np.concatenate([bounds, [len(codes)]])
+    for start, stop in zip(starts, stops):
+        code = int(codes[start])
+        key = (samples[code // n_types], data_types[code % n_types])
+        idx = order[start:stop]
+        series = CycleSeries(np.ascontiguousarray(cycle[idx]), np.ascontiguousarray(capacity[idx]))
+        for arr in series:
+            arr.setflags(write=False)
+        groups[key] = series
+    return CycleStore(groups, version)
+
+
+@lru_cache(maxsize=4)
+def _load_store(path, mtime_ns, size):
+    return read_cycle_csv(path, version=(mtime_ns, size))
+
+
+# ==============================================================================
+# [증분 적재] 새 사이클 기록을 검증/중복 제거 후 샘플별 append-only 컬럼 저장소에 추가
+# ==============================================================================
+# 저장소 구조: STORE_DIR/<샘플>__<데이터 종류>-<해시>/seg-*.arrow (Arrow IPC, 추가할 때마다 세그먼트 하나)
+STORE_DIR = os.path.join(current_dir, ".data_cache", "labdata")
+WATCH_DIR = os.path.join(current_dir, "incoming")   # 사이클러 내보내기 파일(*.csv)을 넣어두면 자동 적재
+MANIFEST_NAME = "_ingested.json"                      # 적재한 원본 파일 해시 목록
+LOCK_NAME = ".lock"                                   # 적재/압축을 프로세스 간에 한 번에 하나씩 (앱과 API 작업자 공유)
+READ_RETRIES = 3                                      # 읽는 중 압축으로 세그먼트가 사라졌을 때 다시 읽는 횟수
+COMPACT_SEGMENTS = 32                                 # 세그먼트가 이보다 많아지면 하나로 합침
+
+DATA_TYPES = ("History", "Prediction")
+
+# 사이클러마다 다른 열 이름 -> 표준 열 이름 (소문자, 공백/밑줄 무시 비교)
+COLUMN_ALIASES = {
+    "sampletype": "Sample_Type", "sample": "Sample_Type", "cell": "Sample_Type", "cellid": "Sample_Type",
+    "cycle": "Cycle", "cycleindex": "Cycle", "cyclenumber": "Cycle", "cycleno": "Cycle",
+    "capacity": "Capacity", "specificcapacity": "Capacity", "dischargecapacity": "Capacity",
+    "datatype": "Data_Type",
+}
+
+IngestReport = namedtuple("IngestReport", ["added", "duplicates", "invalid", "partitions"])
+
+_ingest_lock = threading.Lock()   # 같은 프로세스 안의 스레드끼리 (파일 잠금은 프로세스 단위라 스레드를 구분하지 않음)
+_seen_sources = {}   # 원본 경로 -> (수정 시각, 크기): 바뀌지 않은 파일은 해시 계산도 건너뜀
+
+
+def normalize_records(df, sample_type=None, data_type="History"):
+    """
+    원본 표를 (Sample_Type, Data_Type, Cycle, Capacity) 열로 맞추고 잘못된 행을 걸러냄.
+    sample_type/data_type: 원본에 해당 열이 없을 때 사용할 값.
+    반환: (정리된 DataFrame, 버린 행 수)
+    """
+    import pandas as pd
+
+    rename = {}
+    for col in df.columns:
+        key = str(col).strip().lstrip("\ufeff").lower().replace("_", "").replace(" ", "")
+        key = key.split("(")[0]   # 'Discharge Capacity(mAh/g)' 같은 단위 표기 제거
+        if key in COLUMN_ALIASES and COLUMN_ALIASES[key] not in rename.values():
+            rename[col] = COLUMN_ALIASES[key]
+    df = df.rename(columns=rename)
+    if "Sample_Type" not in df.columns:
+        if not sample_type:
+            raise ValueError("Sample_Type 열이 없습니다. 샘플 이름을 지정해 주세요.")
+        df = df.assign(Sample_Type=sample_type)
+    if "Data_Type" not in df.columns:
+        df = df.assign(Data_Type=data_type)
+    missing = {"Cycle", "Capacity"} - set(df.columns)
+    if missing:
+        raise ValueError(f"필수 열이 없습니다: {', '.join(sorted(missing))}")
+
+    out = pd.DataFrame({
+        "Sample_Type": df["Sample_Type"].astype(str).str.strip(),
+        "Data_Type": df["Data_Type"].astype(str).str.strip(),
+        "Cycle": pd.to_numeric(df["Cycle"], errors="coerce"),
+        "Capacity": pd.to_numeric(df["Capacity"], errors="coerce"),
+    })
+    cycle = out["Cycle"].to_numpy(dtype=float)
+    capacity = out["Capacity"].to_numpy(dtype=float)
+    valid = (
+        (out["Sample_Type"] != "") & (out["Sample_Type"].str.lower() != "nan")
+        & out["Data_Type"].isin(DATA_TYPES).to_numpy()
+        & np.isfinite(cycle) & (cycle >= 1) & (cycle == np.round(cycle))
+        & np.isfinite(capacity) & (capacity >= 0)
+    )
+    out = out[valid].astype({"Cycle": np.int64})
+    return out, int((~valid).sum())
+
+
+def _partition_dir(store_dir, sample, data_type):
+    slug = re.sub(r"[^0-9A-Za-z]+", "_", f"{sample}__{data_type}").strip("_")[:48]
+    digest = hashlib.sha1(f"{sample}\0{data_type}".encode()).hexdigest()[:8]
+    return os.path.join(store_dir, f"{slug}-{digest}")
+
+
+def _partition_signature(part_dir):
+    """세그먼트 파일 (이름, 크기, 수정 시각) 목록. 바뀌지 않은 파티션은 캐시를 그대로 사용"""
+    try:
+        entries = [e for e in os.scandir(part_dir) if e.name.endswith(".arrow")]
+    except OSError:
+        return ()
+    signature = []
+    for e in entries:
+        try:
+            stat = e.stat()
+        except FileNotFoundError:   # 목록을 읽은 뒤 압축으로 지워진 세그먼트
+            continue
+        signature.append((e.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(sorted(signature))
+
+
+@lru_cache(maxsize=256)
+def _read_partition(part_dir, signature):
+    """
+    파티션의 세그먼트를 모두 읽어 사이클 순 CycleSeries로 합침. 반환: (샘플, 데이터 종류, CycleSeries)
+    같은 Cycle이 여러 세그먼트에 있으면 (압축 도중에 읽었거나 다른 프로세스와 겹쳐 적재된 경우) 먼저 쓴 세그먼트 값 유지.
+    """
+    import pyarrow.feather as feather
+
+    key, cycles, capacities = None, [], []
+    for name, _, _ in signature:
+        table = feather.read_table(os.path.join(part_dir, name), memory_map=True)
+        meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+        key = (meta["sample_type"], meta["data_type"])
+        cycles.append(table.column("Cycle").to_numpy())
+        capacities.append(table.column("Capacity").to_numpy())
+    cycle = np.concatenate(cycles).astype(np.int64)
+    order = np.argsort(cycle, kind="stable")     # 세그먼트 이름(쓴 시각) 순서를 유지한 정렬
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = cycle[order[1:]] != cycle[order[:-1]]
+    order = order[first]
+    series = CycleSeries(np.ascontiguousarray(cycle[order]), np.ascontiguousarray(np.concatenate(capacities)[order]))
+    for arr in series:
+        arr.setflags(write=False)
+    return key[0], key[1], series
+
+
+def _write_segment(part_dir, sample, data_type, cycle, capacity):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    os.makedirs(part_dir, exist_ok=True)
+    table = pa.table({"Cycle": pa.array(cycle, pa.int64()), "Capacity": pa.array(capacity, pa.float64())})
+    table = table.replace_schema_metadata({"sample_type": sample, "data_type": data_type})
+    name = f"seg-{time.time_ns():020d}-{os.getpid()}.arrow"
+    tmp_path = os.path.join(part_dir, f".{name}.tmp")
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, os.path.join(part_dir, name))
+
+
+def compact_partition(part_dir):
+    """세그먼트 여러 개를 하나로 합침 (새 세그먼트를 먼저 쓴 뒤 이전 세그먼트 삭제). 저장소 잠금 안에서 호출"""
+    signature = _partition_signature(part_dir)
+    if len(signature) <= 1:
+        return
+    sample, data_type, series = _read_partition(part_dir, signature)
+    _write_segment(part_dir, sample, data_type, series.cycle, series.capacity)
+    for name, _, _ in signature:
+        os.remove(os.path.join(part_dir, name))
+
+
+@contextmanager
+def _store_lock(store_dir):
+    """저장소 쓰기 잠금: 스레드 잠금 + store_dir/.lock 파일 잠금 (앱 서버와 API 작업자 프로세스 사이)"""
+    os.makedirs(store_dir, exist_ok=True)
+    with _ingest_lock, open(os.path.join(store_dir, LOCK_NAME), "a+b") as f:
+        try:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        except ImportError:   # Windows
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            try:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            except ImportError:
+                import msvcrt
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def append_records(df, store_dir=STORE_DIR, sample_type=None, data_type="History", base=None):
+    """
+    새 사이클 기록을 저장소에 추가. 같은 파티션에 이미 있는 Cycle과 입력 안의 중복 Cycle은 건너뜀
+    (먼저 들어온 값 유지). 기록이 추가된 파티션만 새 세그먼트가 생기므로 나머지 파티션의 캐시는 유지된다.
+    base: 합쳐서 보여줄 기본 CSV의 CycleStore. 여기에 있는 Cycle은 merge_stores에서 기본 CSV 값이 쓰이므로 중복으로 센다.
+    """
+    records, n_invalid = normalize_records(df, sample_type, data_type)
+    with _store_lock(store_dir):
+        return _append_locked(records, n_invalid, store_dir, base)
+
+
+def _append_locked(records, n_invalid, store_dir, base=None):
+    """append_records 본체 (_store_lock을 잡은 상태에서 호출)"""
+    added = duplicates = 0
+    touched = []
+    for (sample, dtype), group in records.groupby(["Sample_Type", "Data_Type"], sort=False):
+        part_dir = _partition_dir(store_dir, sample, dtype)
+        cycle = group["Cycle"].to_numpy()
+        capacity = group["Capacity"].to_numpy()
+        _, first = np.unique(cycle, return_index=True)
+        keep = np.zeros(len(cycle), dtype=bool)
+        keep[first] = True
+        signature = _partition_signature(part_dir)
+        if signature:
+            keep &= ~np.isin(cycle, _read_partition(part_dir, signature)[2].cycle)
+        if base is not None:
+            keep &= ~np.isin(cycle, base.get(sample, dtype).cycle)
+        duplicates += int((~keep).sum())
+        if keep.any():
+            _write_segment(part_dir, sample, dtype, cycle[keep], capacity[keep])
+            added += int(keep.sum())
+            touched.append((sample, dtype))
+            if len(signature) + 1 > COMPACT_SEGMENTS:
+                compact_partition(part_dir)
+    return IngestReport(added, duplicates, n_invalid, touched)
+
+
+def _read_manifest(store_dir):
+    try:
+        with open(os.path.join(store_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(store_dir, manifest):
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def ingest_bytes(data, name, store_dir=STORE_DIR, sample_type=None, data_type="History", force=False, base=None):
+    """
+    CSV 내용(bytes)을 적재. 같은 내용은 (해시 기준) 한 번만 적재하며, 이미 적재한 내용이면 None.
+    name: 적재 기록에 남길 파일 이름, base: append_records 참고 (기본 CSV에 있는 Cycle은 중복으로 보고)
+    """
+    import pandas as pd
+
+    digest = hashlib.sha256(data).hexdigest()
+    if digest in _read_manifest(store_dir) and not force:
+        return None
+    records, n_invalid = normalize_records(pd.read_csv(io.BytesIO(data), encoding="utf-8-sig"), sample_type, data_type)
+    # 적재 기록 확인 ~ 추가 ~ 기록 저장을 한 잠금 안에서: 다른 프로세스가 같은 파일을 동시에 적재해도 한 번만 들어감
+    with _store_lock(store_dir):
+        manifest = _read_manifest(store_dir)
+        if digest in manifest and not force:
+            return None
+        report = _append_locked(records, n_invalid, store_dir, base)
+        manifest[digest] = {"file": name, "added": report.added, "time": int(time.time())}
+        _write_manifest(store_dir, manifest)
+    return report
+
+
+def ingest_file(path, store_dir=STORE_DIR, sample_type=None, data_type="History", force=False, base=None):
+    """CSV 파일 하나를 적재 (ingest_bytes 참고)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return ingest_bytes(data, os.path.basename(path), store_dir, sample_type, data_type, force, base)
+
+
+def sync_sources(paths, store_dir=STORE_DIR, base=None):
+    """원본 파일 목록 중 처음 보거나 바뀐 파일만 적재. 반환: {경로: IngestReport}"""
+    reports = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stamp = (store_dir, stat.st_mtime_ns, stat.st_size)
+        if _seen_sources.get(path) == stamp:
+            continue
+        try:
+            report = ingest_file(path, store_dir, base=base)
+        except ValueError:
+            report = None   # 형식이 맞지 않는 파일은 건너뜀 (다음에 파일이 바뀌면 다시 시도)
+        _seen_sources[path] = stamp
+        if report is not None:
+            reports[path] = report
+    return reports
+
+
+def watched_files(watch_dir=WATCH_DIR):
+    try:
+        return sorted(e.path for e in os.scandir(watch_dir) if e.is_file() and e.name.lower().endswith(".csv"))
+    except OSError:
+        return []
+
+
+def open_store(store_dir=STORE_DIR):
+    """저장소의 파티션을 읽어 CycleStore로 반환 (바뀐 파티션만 다시 읽음)"""
+    groups, signatures = {}, []
+    try:
+        part_dirs = sorted(e.path for e in os.scandir(store_dir) if e.is_dir())
+    except OSError:
+        part_dirs = []
+    for part_dir in part_dirs:
+        # 잠금 없이 읽으므로, 다른 세션/프로세스의 압축으로 세그먼트가 사라지면 목록을 다시 읽어 재시도
+        for _ in range(READ_RETRIES):
+            signature = _partition_signature(part_dir)
+            if not signature:
+                break
+            try:
+                sample, data_type, series = _read_partition(part_dir, signature)
+            except FileNotFoundError:
+                continue
+            groups[(sample, data_type)] = series
+            signatures.append((os.path.basename(part_dir), signature))
+            break
+    return CycleStore(groups, version=hash(tuple(signatures)))
+
+
+def base_store(path=DATA_PATH):
+    """기본 CSV의 CycleStore ((수정 시각, 크기) 기준 캐시). 파일이 없으면 빈 CycleStore"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return CycleStore({})
+    return _load_store(path, stat.st_mtime_ns, stat.st_size)
+
+
+_merged = {}   # (기본 CSV 버전, 저장소 버전) -> 합친 CycleStore (마지막 하나만 보관)
+
+
+def merge_stores(base, store):
+    """
+    기본 CSV(base)와 적재 저장소(store)를 합침. 같은 (샘플, 데이터 종류)에 같은 Cycle이 있으면 기본 CSV 값을 쓰고,
+    저장소에만 있는 사이클을 더한다. 두 버전이 그대로면 이전 결과를 다시 쓴다.
+    """
+    version = (base.version, store.version)
+    cached = _merged.get(version)
+    if cached is not None:
+        return cached
+    groups = dict(base.groups)
+    for key, series in store.groups.items():
+        own = groups.get(key)
+        if own is None:
+            groups[key] = series
+            continue
+        extra = ~np.isin(series.cycle, own.cycle)
+        if not extra.any():
+            continue
+        cycle = np.concatenate([own.cycle, series.cycle[extra]])
+        order = np.argsort(cycle, kind="stable")
+        merged = CycleSeries(cycle[order], np.concatenate([own.capacity, series.capacity[extra]])[order])
+        for arr in merged:
+            arr.setflags(write=False)
+        groups[key] = merged
+    result = CycleStore(groups, version)
+    _merged.clear()
+    _merged[version] = result
+    return result
+
+
+def load_cycle_store(path=DATA_PATH, store_dir=STORE_DIR, watch_dir=WATCH_DIR):
+    """
+    실험 데이터 조회 테이블 반환. 데이터가 하나도 없으면 None.
+    기본 CSV는 저장소에 넣지 않고 (수정 시각, 크기) 기준 캐시로 직접 읽는다 -> 기존 행을 고쳐도 바로 반영된다.
+    감시 폴더(watch_dir)의 새 파일과 업로드만 저장소에 적재하고, 두 결과를 merge_stores로 합친다.
+    저장소에 쓸 수 없는 환경에서는 기본 CSV만 사용한다.
+    """
+    base = base_store(path)
+    try:
+        sync_sources(watched_files(watch_dir), store_dir, base)
+    except OSError:
+        return base if base.groups else None
+    store = open_store(store_dir)
+    if not store.groups:
+        return base if base.groups else None
+    return merge_stores(base, store)
@@ -0,0 +1,226 @@
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from degradation import PATTERN_C_RATES, integrate_degradation, predict_life_and_ce_physics
+from engine1 import CAP_NOISE_SCALE, CE_NOISE_SCALE, DECAY_RATES, ce_profile, fade_retention, predict_life_and_ce_batch
+from parallel import ordered_map
+
+
+# ==============================================================================
+# [Monte Carlo] Engine 1 노이즈 실현값 다수에 대한 불확실성 밴드
+# ==============================================================================
+MonteCarloResult = namedtuple("MonteCarloResult", [
+    "x", "quantiles", "cap_quantiles", "ce_quantiles",
+    "cap_mean", "cap_std", "ce_mean", "ce_std",
+    "eol_counts", "n_draws",
+])
+
+
+class StreamingStats:
+    """
+    사이클별 고정 구간 히스토그램 + 평균/분산 누적기.
+    메모리는 (사이클 수 × 구간 수)로 고정되어 draw 수와 무관하다.
+    lo, hi: 사이클별 히스토그램 범위 (범위 밖 값은 양 끝 구간에 포함)
+    """
+
+    def __init__(self, lo, hi, n_bins=256):
+        self.lo = np.asarray(lo, dtype=float)
+        self.width = np.maximum(np.asarray(hi, dtype=float) - self.lo, 1e-12) / n_bins
+        self.n_bins = n_bins
+        self.counts = np.zeros((len(self.lo), n_bins), dtype=np.int64)
+        self.n = 0
+        self.mean = np.zeros(len(self.lo))
+        self.m2 = np.zeros(len(self.lo))
+
+    def update(self, values):
+        """values: (draw 수, 사이클 수) 블록을 누적"""
+        n_cycles = len(self.lo)
+        bins = np.floor((values - self.lo) / self.width)
+        bins = np.clip(bins, 0, self.n_bins - 1).astype(np.int64)
+        flat = (bins + np.arange(n_cycles) * self.n_bins).ravel()
+        self.counts += np.bincount(flat, minlength=n_cycles * self.n_bins).reshape(n_cycles, self.n_bins)
+
+        k = values.shape[0]
+        chunk_mean = values.mean(axis=0)
+        chunk_m2 = ((values - chunk_mean) ** 2).sum(axis=0)
+        self._merge_moments(k, chunk_mean, chunk_m2)
+
+    def merge(self, other):
+        """다른 누적기(같은 범위/구간)를 합침"""
+        self.counts += other.counts
+        self._merge_moments(other.n, other.mean, other.m2)
+
+    def _merge_moments(self, k, mean, m2):
+        # Chan et al. 병렬 분산 합산
+        if k == 0:
+            return
+        total = self.n + k
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (k / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.n * k / total)
+        self.n = total
+
+    def std(self):
+        return np.sqrt(self.m2 / max(self.n - 1, 1))
+
+    def quantiles(self, qs):
+        """히스토그램 누적 분포에서 구간 내 선형 보간으로 분위수 계산. 반환: (len(qs), 사이클 수)"""
+        cum = np.cumsum(self.counts, axis=1)
+        out = np.empty((len(qs), len(self.lo)))
+        rows = np.arange(len(self.lo))
+        for i, q in enumerate(qs):
+            target = q * self.n
+            b = np.minimum((cum < target).sum(axis=1), self.n_bins - 1)
+            prev = np.where(b > 0, cum[rows, np.maximum(b - 1, 0)], 0)
+            in_bin = np.maximum(self.counts[rows, b], 1)
+            frac = np.clip((target - prev) / in_bin, 0.0, 1.0)
+            out[i] = self.lo + (b + frac) * self.width
+        return out
+
+
+def _stat_ranges(decay_rate, specific_cap_base, x, band_sigma):
+    """결정론적 평균 ± band_sigma·σ 로 히스토그램 범위 설정"""
+    cap_mid = fade_retention(decay_rate, x) * specific_cap_base
+    cap_band = band_sigma * CAP_NOISE_SCALE * specific_cap_base
+    base_ce, ce_scale = ce_profile(decay_rate, x)
+    base_ce = np.broadcast_to(base_ce, x.shape)
+    cap_range = (np.maximum(cap_mid - cap_band, 0.0), np.maximum(cap_mid + cap_band, cap_band))
+    ce_range = (np.clip(base_ce - band_sigma * ce_scale, 0, 100.0), np.clip(base_ce + band_sigma * ce_scale, 0, 100.0))
+    return cap_range, ce_range
+
+
+def _run_chunk(decay_rate, specific_cap_base, cycles, n_draws, seed_seq, n_bins, eol_ratio, band_sigma):
+    """
+    작업 단위: n_draws개 실현값을 생성하여 부분 누적기로 접어서 반환 (프로세스 풀에서 실행).
+    EOL 히스토그램의 마지막 칸(cycles + 1)은 '목표 사이클 안에 도달하지 않음'.
+    """
+    x, capacity, ce = predict_life_and_ce_batch(
+        np.full(n_draws, decay_rate), specific_cap_base, cycles, rng=np.random.default_rng(seed_seq)
+    )
+    cap_range, ce_range = _stat_ranges(decay_rate, specific_cap_base, x, band_sigma)
+    return _fold_block(capacity, ce, cap_range, ce_range, specific_cap_base * eol_ratio, cycles, n_bins)
+
+
+def _fold_block(capacity, ce, cap_range, ce_range, eol_limit, cycles, n_bins):
+    """(draw 수, 사이클 수) 블록을 부분 누적기와 EOL 히스토그램으로 접음"""
+    cap_stats = StreamingStats(*cap_range, n_bins=n_bins)
+    ce_stats = StreamingStats(*ce_range, n_bins=n_bins)
+    cap_stats.update(capacity)
+    ce_stats.update(ce)
+
+    below = capacity < eol_limit
+    eol = np.where(below.any(axis=1), np.argmax(below, axis=1) + 1, cycles + 1)
+    eol_counts = np.bincount(eol, minlength=cycles + 2)
+    return cap_stats, ce_stats, eol_counts
+
+
+def run_monte_carlo(decay_rate, specific_cap_base=185.0, cycles=1000, n_draws=2000, chunk_size=256,
+                    seed=None, workers=None, n_bins=256, eol_ratio=0.8, quantiles=(0.05, 0.5, 0.95),
+                    band_sigma=6.0):
+    """
+    n_draws개 실현값을 chunk_size 단위로 생성하며 스트리밍 누적기에 접어 분위수 밴드와 EOL 히스토그램을 계산.
+    workers: None이면 CPU 수, 1이면 현재 프로세스에서 순차 실행.
+    seed가 같으면 workers 수와 상관없이 같은 결과를 반환한다 (청크별 SeedSequence.spawn).
+    """
+    args = [(decay_rate, specific_cap_base, cycles, size, ss, n_bins, eol_ratio, band_sigma)
+            for size, ss in _chunk_seeds(n_draws, chunk_size, seed)]
+    return _collect(_run_chunk, args, workers, cycles, n_draws, quantiles)
+
+
+def _chunk_seeds(n_draws, chunk_size, seed):
+    """청크별 (draw 수, SeedSequence) 목록"""
+    n_chunks = -(-n_draws // chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    return [(min(chunk_size, n_draws - i * chunk_size), ss) for i, ss in enumerate(seeds)]
+
+
+def _collect(chunk_fn, args, workers, cycles, n_draws, quantiles):
+    """청크 작업을 (병렬로) 실행하고 부분 누적기를 합쳐 MonteCarloResult로 만듦"""
+    n_chunks = len(args)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, n_chunks)
+
+    total = None
+    for cap_stats, ce_stats, eol_counts in ordered_map(chunk_fn, args, workers):
+        if total is None:
+            total = [cap_stats, ce_stats, eol_counts]
+        else:
+            total[0].merge(cap_stats)
+            total[1].merge(ce_stats)
+            total[2] += eol_counts
+
+    cap_stats, ce_stats, eol_counts = total
+    return MonteCarloResult(
+        x=np.arange(1, cycles + 1),
+        quantiles=tuple(quantiles),
+        cap_quantiles=cap_stats.quantiles(quantiles),
+        ce_quantiles=ce_stats.quantiles(quantiles),
+        cap_mean=cap_stats.mean, cap_std=cap_stats.std(),
+        ce_mean=ce_stats.mean, ce_std=ce_stats.std(),
+        eol_counts=eol_counts,
+        n_draws=n_draws,
+    )
+
+
+def eol_percentiles(result, qs=(0.05, 0.5, 0.95)):
+    """EOL 히스토그램에서 분위수 사이클 계산. 도달하지 못한 비율이 q보다 크면 NaN."""
+    cum = np.cumsum(result.eol_counts[:-1])
+    out = []
+    for q in qs:
+        idx = np.searchsorted(cum, q * result.n_draws)
+        out.append(float(idx) if idx < len(cum) else np.nan)
+    return out
+
+
+@lru_cache(maxsize=16)
+def simulate_monte_carlo(pattern, specific_cap_base, cycles, n_draws, seed):
+    """Engine 1 탭용: (패턴, 초기 용량, 사이클 수, draw 수, seed) 단위로 결과 캐시"""
+    return run_monte_carlo(DECAY_RATES[pattern], specific_cap_base, cycles, n_draws=n_draws, seed=seed)
+
+
+# ==============================================================================
+# [Monte Carlo - 물리 모델] 셀 간 제조 편차(열화 계수 로그정규 분포)에 대한 불확실성 밴드
+# ==============================================================================
+def _physics_ranges(c_rate, temp_c, specific_cap_base, cycles, cell_spread, band_sigma):
+    """열화 계수 배율 exp(±band_sigma·cell_spread) 셀의 결정론적 곡선 ± 노이즈로 히스토그램 범위 설정"""
+    edge = np.exp(band_sigma * cell_spread)
+    ref = integrate_degradation(c_rate, temp_c, cycles, k_scale=[1.0 / edge, 1.0, edge])
+    cap_band = band_sigma * CAP_NOISE_SCALE
+    cap_range = (np.maximum(ref.retention.min(axis=0) - cap_band, 0.0) * specific_cap_base,
+                 (ref.retention.max(axis=0) + cap_band) * specific_cap_base)
+    ce_band = band_sigma * CE_NOISE_SCALE
+    ce_range = (np.clip(ref.ce.min(axis=0) - ce_band, 0, 100.0), np.clip(ref.ce.max(axis=0) + ce_band, 0, 100.0))
+    return cap_range, ce_range
+
+
+def _run_physics_chunk(c_rate, temp_c, specific_cap_base, cycles, n_draws, seed_seq, n_bins, eol_ratio, band_sigma, cell_spread):
+    """작업 단위: n_draws개 셀(열화 계수 편차 + 측정 노이즈)을 적분하여 부분 누적기로 접음"""
+    rng = np.random.default_rng(seed_seq)
+    k_scale = rng.lognormal(0.0, cell_spread, size=n_draws)
+    _, capacity, ce = predict_life_and_ce_physics(
+        np.full(n_draws, c_rate), specific_cap_base, cycles, temp_c, k_scale=k_scale, rng=rng
+    )
+    cap_range, ce_range = _physics_ranges(c_rate, temp_c, specific_cap_base, cycles, cell_spread, band_sigma)
+    return _fold_block(capacity, ce, cap_range, ce_range, specific_cap_base * eol_ratio, cycles, n_bins)
+
+
+def run_monte_carlo_physics(c_rate, temp_c=25.0, specific_cap_base=185.0, cycles=1000, n_draws=2000, chunk_size=1000,
+                            seed=None, workers=None, n_bins=256, eol_ratio=0.8, quantiles=(0.05, 0.5, 0.95),
+                            band_sigma=4.0, cell_spread=0.1):
+    """
+    물리 모델로 셀 n_draws개를 적분하여 분위수 밴드와 EOL 히스토그램 계산 (run_monte_carlo와 같은 결과 형태).
+    cell_spread: 셀별 열화 계수 배율의 로그정규 표준편차
+    """
+    args = [(c_rate, temp_c, specific_cap_base, cycles, size, ss, n_bins, eol_ratio, band_sigma, cell_spread)
+            for size, ss in _chunk_seeds(n_draws, chunk_size, seed)]
+    return _collect(_run_physics_chunk, args, workers, cycles, n_draws, quantiles)
+
+
+@lru_cache(maxsize=16)
+def simulate_monte_carlo_physics(pattern, specific_cap_base, cycles, n_draws, seed, temp_c=25.0):
+    """Engine 1 탭용 (물리 모델): (패턴, 초기 용량, 사이클 수, draw 수, seed, 온도) 단위로 결과 캐시"""
+    return run_monte_carlo_physics(PATTERN_C_RATES[pattern], temp_c, specific_cap_base, cycles, n_draws=n_draws, seed=seed)
@@ -0,0 +1,46 @@
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+# ==============================================================================
+# [병렬 실행] 재사용 프로세스 풀 + 순서 보장/동시 작업 수 제한 map
+# ==============================================================================
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_process_pool():
+    """
+    프로세스당 하나인 공유 풀 (CPU 수만큼, Streamlit 서버 스레드와 fork 충돌을 피하기 위해 spawn 사용).
+    한 번 만들면 바꾸지 않는다: 호출마다 다른 workers 값으로 풀을 다시 만들면 다른 세션이 쓰던 풀이 닫힌다.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+        return _POOL
+
+
+def ordered_map(fn, args, workers, max_in_flight=None):
+    """
+    args의 각 항목(튜플)에 fn을 적용한 결과를 입력 순서대로 내보냄.
+    대기 중인 작업 수를 제한하여 입력이 아무리 많아도 메모리 사용량이 일정하다.
+    workers는 이 호출이 공유 풀에서 동시에 쓰는 작업 수 (max_in_flight 기본값). workers <= 1이면 현재 프로세스에서 순차 실행.
+    """
+    if workers <= 1:
+        for a in args:
+            yield fn(*a)
+        return
+
+    pool = get_process_pool()
+    max_in_flight = max_in_flight or workers
+    pending = deque()
+    for a in args:
+        pending.append(pool.submit(fn, *a))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,187 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque, namedtuple
+
+
+# ==============================================================================
+# [프로파일링] 단계별 시간/메모리 할당 측정 (꺼져 있으면 빈 context manager만 반환)
+# ==============================================================================
+SpanRecord = namedtuple("SpanRecord", ["run", "stage", "parent", "start", "seconds", "alloc_blocks", "peak_bytes", "thread"])
+
+# Prometheus 히스토그램 구간(초)
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+RECENT_LIMIT = 5000          # 내보내기용으로 보관하는 최근 기록 수
+ALWAYS_ON = os.environ.get("BATTERY_PROFILE", "") not in ("", "0")   # 모든 세션의 rerun을 측정
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+_local = threading.local()
+_lock = threading.Lock()
+_stats = {}                  # stage -> [count, 합계(초), 최대(초), 할당 블록 합계, 최대 peak, 구간별 count]
+_recent = deque(maxlen=RECENT_LIMIT)
+_run_counter = [0]
+
+
+class _Span:
+    __slots__ = ("stage", "parent", "t0", "wall0", "blocks0", "trace")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        stack = _local.stack
+        self.parent = stack[-1] if stack else None
+        stack.append(self.stage)
+        self.trace = tracemalloc.is_tracing()
+        if self.trace:
+            tracemalloc.reset_peak()
+        self.blocks0 = sys.getallocatedblocks()
+        self.wall0 = time.time()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.t0
+        blocks = sys.getallocatedblocks() - self.blocks0
+        peak = tracemalloc.get_traced_memory()[1] if self.trace else None
+        _local.stack.pop()
+        record = SpanRecord(_local.run, self.stage, self.parent, self.wall0, seconds, blocks, peak, threading.current_thread().name)
+        _local.records.append(record)
+        _record(record)
+        return False
+
+
+def _record(record):
+    with _lock:
+        s = _stats.get(record.stage)
+        if s is None:
+            s = _stats[record.stage] = [0, 0.0, 0.0, 0, 0, [0] * len(BUCKETS)]
+        s[0] += 1
+        s[1] += record.seconds
+        s[2] = max(s[2], record.seconds)
+        s[3] += record.alloc_blocks
+        if record.peak_bytes is not None:
+            s[4] = max(s[4], record.peak_bytes)
+        for i, le in enumerate(BUCKETS):
+            if record.seconds <= le:
+                s[5][i] += 1
+        _recent.append(record)
+
+
+def span(stage):
+    """
+    측정 구간. `with span("engine1.simulate"): ...`
+    현재 스레드에서 측정이 켜져 있지 않으면 공유된 빈 객체를 반환하므로 비용이 거의 없다.
+    """
+    if active():
+        return _Span(stage)
+    return _NOOP
+
+
+def active():
+    """현재 스레드에서 측정 중인지 (begin_run 이후 end_run 전)"""
+    return getattr(_local, "enabled", False)
+
+
+def begin_run(enabled=False, trace_memory=False):
+    """
+    rerun 시작 시 호출. enabled(또는 BATTERY_PROFILE 환경 변수)면 이 스레드의 측정을 켠다.
+    trace_memory: tracemalloc으로 단계별 최대 메모리도 측정 (느려지므로 필요할 때만)
+    """
+    enabled = enabled or ALWAYS_ON
+    _local.enabled = enabled
+    _local.stack = []
+    _local.records = []
+    with _lock:
+        _run_counter[0] += 1
+        _local.run = _run_counter[0]
+    # tracemalloc은 프로세스 전체 설정이므로 측정 중인 세션만 켜고 끈다
+    if enabled and trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif enabled and not trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return enabled
+
+
+def end_run():
+    """이번 rerun에서 이 스레드가 기록한 SpanRecord 목록을 반환하고 측정을 끈다."""
+    records = getattr(_local, "records", [])
+    _local.enabled = False
+    _local.records = []
+    return records
+
+
+def summary():
+    """단계별 누적 통계: [(stage, count, 합계, 평균, 최대, 할당 블록 합계, 최대 peak)]"""
+    with _lock:
+        return [(stage, s[0], s[1], s[1] / s[0], s[2], s[3], s[4]) for stage, s in sorted(_stats.items())]
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _recent.clear()
+
+
+# ==============================================================================
+# [내보내기] Prometheus 텍스트 형식 / JSON Lines
+# ==============================================================================
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(prefix="battery_stage"):
+    """누적 통계를 Prometheus exposition 형식으로 반환"""
+    with _lock:
+        stats = {stage: (s[0], s[1], s[2], s[3], s[4], list(s[5])) for stage, s in sorted(_stats.items())}
+    lines = [
+        f"# HELP {prefix}_seconds Time spent in instrumented app stages.",
+        f"# TYPE {prefix}_seconds histogram",
+    ]
+    for stage, (count, total, _, _, _, buckets) in stats.items():
+        label = f'stage="{_label(stage)}"'
+        for le, n in zip(BUCKETS, buckets):
+            lines.append(f'{prefix}_seconds_bucket{{{label},le="{le}"}} {n}')
+        lines.append(f'{prefix}_seconds_bucket{{{label},le="+Inf"}} {count}')
+        lines.append(f"{prefix}_seconds_sum{{{label}}} {total:.6f}")
+        lines.append(f"{prefix}_seconds_count{{{label}}} {count}")
+    lines += [
+        f"# HELP {prefix}_max_seconds Slowest observed run of each stage.",
+        f"# TYPE {prefix}_max_seconds gauge",
+    ]
+    lines += [f'{prefix}_max_seconds{{stage="{_label(stage)}"}} {s[2]:.6f}' for stage, s in stats.items()]
+    lines += [
+        f"# HELP {prefix}_alloc_blocks_sum Net change of allocated Python memory blocks, summed over runs.",
+        f"# TYPE {prefix}_alloc_blocks_sum gauge",
+    ]
+    lines += [f'{prefix}_alloc_blocks_sum{{stage="{_label(stage)}"}} {s[3]}' for stage, s in stats.items()]
+    traced = {stage: s[4] for stage, s in stats.items() if s[4]}
+    if traced:
+        lines += [
+            f"# HELP {prefix}_peak_bytes Largest traced memory peak inside each stage (tracemalloc).",
+            f"# TYPE {prefix}_peak_bytes gauge",
+        ]
+        lines += [f'{prefix}_peak_bytes{{stage="{_label(stage)}"}} {peak}' for stage, peak in traced.items()]
+    return "\n".join(lines) + "\n"
+
+
+def jsonl(records=None):
+    """SpanRecord 목록(기본: 최근 기록 전체)을 한 줄에 하나씩 JSON으로 반환"""
+    if records is None:
+        with _lock:
+            records = list(_recent)
+    return "".join(json.dumps(r._asdict(), ensure_ascii=False) + "\n" for r in records)
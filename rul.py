@@ -0,0 +1,249 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from engine1 import ACC_FADE_AMP, ACC_FADE_RATE, CAP_NOISE_SCALE, LINEAR_FADE, first_cycle_below
+
+
+# ==============================================================================
+# [온라인 RUL 추정] 새 사이클이 들어올 때마다 셀별 Kalman 필터로 Engine 1 열화식 계수를 갱신
+# ==============================================================================
+# capacity(n) = a - b · u(n),  u(n) = LINEAR_FADE·n + ACC_FADE_AMP·exp(ACC_FADE_RATE·n)
+#   a = 초기 용량, b = 초기 용량 × 열화 속도 -> 상태 (a, b)에 대해 선형이므로 Kalman 필터가 정확하다.
+# 측정 잡음 분산 σ²는 모르는 값이므로 공분산을 σ² 단위(P = σ² · V)로 보관하고, σ²는 정규화한 혁신(innovation)
+# 제곱합으로 함께 추정한다 (정규-역감마 켤레 갱신). 이득(gain)이 σ² 추정값에 의존하지 않아 모든 관측이
+# 같은 가중치로 반영되고, 구간은 관측 수에 맞는 t 분포 분위수로 계산하므로 신뢰 수준이 명목값과 맞는다.
+# 셀마다 평균 2개 + 정규화 공분산 3개 + 혁신 제곱합 + 마지막 사이클/관측 수만 보관하고,
+# 갱신은 사이클 하나당 O(1) (전체 기록을 다시 맞추지 않음). 여러 셀의 갱신은 한 번에 벡터 연산으로 처리한다.
+# 가속 지수는 Engine 1 기본값(ACC_FADE_RATE)으로 고정한다 (first_cycle_below와 같은 식).
+RulEstimate = namedtuple("RulEstimate", [
+    "cells", "last_cycle", "n_obs", "capacity", "base_capacity", "decay_rate", "decay_std",
+    "eol", "eol_low", "eol_high", "rul",
+])
+
+PRIOR_DECAY = 2.5            # 첫 관측 전 열화 속도 사전값 (Charge/Discharge 수준)
+PRIOR_DECAY_STD = 10.0       # 사전 표준편차 (넓게: 첫 몇 사이클은 데이터가 결정)
+PRIOR_BASE_STD = 0.1         # 초기 용량 사전 표준편차 (첫 관측값 대비 비율)
+PRIOR_NOISE_OBS = 2.0        # 측정 잡음 사전값(noise_rel)의 무게 (관측 몇 개 분량): 작을수록 데이터가 빨리 결정
+NOISE_FLOOR_REL = 1e-5       # 잡음 분산 하한 (첫 관측값 대비 표준편차 비율): 잡음 없는 데이터에서 0으로 나누지 않도록
+PROCESS_NOISE = 0.0          # 사이클당 상태 변동 (a, b 크기 대비 비율). 0보다 크면 계수가 천천히 바뀌는 것을 허용하지만,
+                             # 계수가 실제로 일정하면 구간이 명목 수준보다 넓어진다
+CONFIDENCE = 0.90            # eol_low/eol_high 구간의 기본 신뢰 수준 (양측)
+
+
+def _fade_basis(cycle):
+    """u(n): 열화 속도 1일 때 초기 용량 대비 손실 비율"""
+    with np.errstate(over="ignore"):
+        return LINEAR_FADE * cycle + ACC_FADE_AMP * np.exp(ACC_FADE_RATE * cycle)
+
+
+def _occurrence_rank(idx):
+    """같은 셀이 한 배치에 여러 번 있을 때 각 항목이 그 셀의 몇 번째 관측인지 (입력 순서 유지)"""
+    order = np.argsort(idx, kind="stable")
+    sorted_idx = idx[order]
+    first = np.ones(len(idx), dtype=bool)
+    first[1:] = sorted_idx[1:] != sorted_idx[:-1]
+    pos = np.arange(len(idx))
+    starts = np.maximum.accumulate(np.where(first, pos, 0))
+    rank = np.empty(len(idx), dtype=np.int64)
+    rank[order] = pos - starts
+    return rank
+
+
+def _noise_var(scale, ss, n_obs, a):
+    """측정 잡음 분산 σ² 사후 추정값: (사전값 × 무게 + 혁신 제곱합) / (무게 + 자유도). 처음 관측 2개는 (a, b)를 정하는 데 쓰임"""
+    dof = np.maximum(n_obs - 2, 0)
+    var = (PRIOR_NOISE_OBS * scale + ss) / (PRIOR_NOISE_OBS + dof)
+    return np.maximum(var, (NOISE_FLOOR_REL * a) ** 2)
+
+
+class RulTracker:
+    """
+    셀 이름 -> 열화식 계수 사후 분포(평균, 공분산)를 유지하는 온라인 추정기.
+    update()로 새 (셀, 사이클, 용량) 관측을 배치로 반영하고, estimate()로 현재 EOL/RUL 예측을 조회한다.
+    이미 반영한 사이클 이하의 관측(중복, 순서가 뒤바뀐 기록)은 건너뛴다. 여러 스레드에서 공유해도 된다.
+    """
+
+    def __init__(self, eol_ratio=0.8, max_cycles=20000, noise_rel=CAP_NOISE_SCALE, process_noise=PROCESS_NOISE,
+                 prior_decay=PRIOR_DECAY, prior_decay_std=PRIOR_DECAY_STD, capacity=64):
+        self.eol_ratio = eol_ratio
+        self.max_cycles = max_cycles
+        self.noise_rel = noise_rel          # 측정 잡음 표준편차 사전값 (첫 관측값 대비 비율)
+        self.process_noise = process_noise
+        self.prior_decay = prior_decay
+        self.prior_decay_std = prior_decay_std
+        self.cells = []
+        self._index = {}
+        self._lock = threading.Lock()
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        """상태 배열을 capacity 크기로 (늘릴 때는 기존 값을 복사)"""
+        old = getattr(self, "_state", None)
+        state = {
+            "a": np.zeros(capacity), "b": np.zeros(capacity),
+            "vaa": np.zeros(capacity), "vab": np.zeros(capacity), "vbb": np.zeros(capacity),   # 공분산 / σ²
+            "scale": np.zeros(capacity),        # 정규화 기준 분산 σ₀² (첫 관측에서 고정)
+            "ss": np.zeros(capacity),           # 정규화 혁신 제곱합 (σ² 추정용)
+            "last_cycle": np.zeros(capacity, dtype=np.int64), "n_obs": np.zeros(capacity, dtype=np.int64),
+        }
+        if old is not None:
+            for name, arr in old.items():
+                state[name][:len(arr)] = arr
+        self._state = state
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return cell in self._index
+
+    @property
+    def nbytes(self):
+        """셀 상태가 차지하는 메모리 (바이트)"""
+        return sum(arr[:len(self.cells)].nbytes for arr in self._state.values())
+
+    def _indices(self, cells):
+        """셀 이름 목록 -> 상태 배열 인덱스 (처음 보는 셀은 추가)"""
+        index = self._index
+        new = [c for c in dict.fromkeys(cells) if c not in index]
+        if new:
+            for cell in new:
+                index[cell] = len(self.cells)
+                self.cells.append(cell)
+            size = len(self._state["a"])
+            if len(self.cells) > size:
+                self._alloc(max(len(self.cells), size * 2))   # 두 배씩 늘려 추가 비용을 분할 상환
+        return np.fromiter((index[c] for c in cells), dtype=np.int64, count=len(cells))
+
+    def last_cycle(self, cell):
+        """셀에 마지막으로 반영한 사이클 (처음 보는 셀이면 0)"""
+        i = self._index.get(cell)
+        return 0 if i is None else int(self._state["last_cycle"][i])
+
+    def update(self, cells, cycles, capacities):
+        """
+        관측 배치 반영. cells: 셀 이름 목록, cycles/capacities: 같은 길이의 배열.
+        한 셀의 여러 사이클은 배치 안의 순서대로 차례로 반영된다.
+        반환: 실제로 반영한 관측 수
+        """
+        cycles = np.asarray(cycles, dtype=np.int64)
+        capacities = np.asarray(capacities, dtype=float)
+        if len(cells) != len(cycles) or len(cycles) != len(capacities):
+            raise ValueError("cells, cycles, capacities의 길이가 같아야 합니다.")
+        if len(cycles) == 0:
+            return 0
+        with self._lock:
+            idx = self._indices(list(cells))
+            rank = _occurrence_rank(idx)
+            used = 0
+            for r in range(int(rank.max()) + 1):
+                sel = rank == r
+                used += self._step(idx[sel], cycles[sel], capacities[sel])
+        return used
+
+    def _step(self, i, n, y):
+        """셀마다 관측 하나씩 (i는 서로 다름): 예측(process noise) + 측정 갱신"""
+        st = self._state
+        fresh = st["n_obs"][i] == 0
+        keep = (fresh | (n > st["last_cycle"][i])) & np.isfinite(y)
+        if not keep.all():
+            i, n, y, fresh = i[keep], n[keep], y[keep], fresh[keep]
+        if len(i) == 0:
+            return 0
+
+        if fresh.any():
+            # 첫 관측: 그 값을 초기 용량의 중심으로 하는 넓은 사전 분포 (σ₀ = noise_rel × 첫 관측값 단위)
+            j = i[fresh]
+            base = np.abs(y[fresh]) + 1e-12
+            scale = (self.noise_rel * base) ** 2
+            st["a"][j] = base
+            st["b"][j] = base * self.prior_decay
+            st["vaa"][j] = (PRIOR_BASE_STD * base) ** 2 / scale
+            st["vab"][j] = 0.0
+            st["vbb"][j] = (self.prior_decay_std * base) ** 2 / scale
+            st["scale"][j] = scale
+            st["ss"][j] = 0.0
+            st["last_cycle"][j] = 0
+
+        a, b = st["a"][i], st["b"][i]
+        vaa, vab, vbb = st["vaa"][i], st["vab"][i], st["vbb"][i]
+
+        if self.process_noise > 0:
+            # 예측: 지난 관측 이후 사이클 수만큼 상태 변동 허용 (랜덤 워크, σ² 추정값 단위로 환산)
+            noise_var = _noise_var(st["scale"][i], st["ss"][i], st["n_obs"][i], a)
+            q = self.process_noise ** 2 * (n - st["last_cycle"][i]) / noise_var
+            vaa = vaa + q * a * a
+            vbb = vbb + q * np.maximum(b * b, (a * self.prior_decay) ** 2)
+
+        # 측정 갱신: H = [1, -u], 측정 잡음 = σ² (정규화 단위에서 1)
+        u = _fade_basis(n)
+        ph0 = vaa - u * vab
+        ph1 = vab - u * vbb
+        s = ph0 - u * ph1 + 1.0
+        e = y - (a - u * b)
+        k0, k1 = ph0 / s, ph1 / s
+
+        st["a"][i] = a + k0 * e
+        st["b"][i] = b + k1 * e
+        st["vaa"][i] = vaa - k0 * ph0
+        st["vab"][i] = vab - k0 * ph1
+        st["vbb"][i] = np.maximum(vbb - k1 * ph1, 0.0)
+        st["ss"][i] += e * e / s
+        st["last_cycle"][i] = n
+        st["n_obs"][i] += 1
+        return len(i)
+
+    def update_from_store(self, store, data_type="History"):
+        """
+        labdata.CycleStore의 샘플별 기록 중 아직 반영하지 않은 사이클만 반영.
+        샘플마다 마지막 반영 사이클을 이분 탐색하므로, 이미 본 기록은 다시 읽지 않는다.
+        """
+        cells, cycles, capacities = [], [], []
+        for sample in store.samples:
+            series = store.get(sample, data_type)
+            start = np.searchsorted(series.cycle, self.last_cycle(sample), side="right")
+            if start < len(series.cycle):
+                cells.extend([sample] * (len(series.cycle) - start))
+                cycles.append(series.cycle[start:])
+                capacities.append(series.capacity[start:])
+        if not cells:
+            return 0
+        return self.update(cells, np.concatenate(cycles), np.concatenate(capacities))
+
+    def estimate(self, cells=None, confidence=CONFIDENCE):
+        """
+        현재 사후 분포 기준 예측. cells가 없으면 관측이 있는 모든 셀.
+        eol_low/eol_high: 열화 속도의 양측 confidence 구간(기본 90%)에 해당하는 EOL.
+        구간은 σ²를 추정한 데 따른 t 분포 분위수를 써서 관측이 적을 때도 신뢰 수준이 명목값에 가깝다.
+        EOL을 max_cycles 안에 넘지 않으면 NaN.
+        """
+        from scipy.stats import t as student_t
+
+        with self._lock:
+            if cells is None:
+                cells = list(self.cells)
+            idx = np.array([self._index[c] for c in cells], dtype=np.int64)
+            st = {name: arr[idx] for name, arr in self._state.items()}
+        a = st["a"]
+        safe_a = np.where(np.abs(a) > 1e-12, a, 1e-12)
+        decay = st["b"] / safe_a
+        noise_var = _noise_var(st["scale"], st["ss"], st["n_obs"], a)
+        var = noise_var * (st["vbb"] - 2.0 * decay * st["vab"] + decay * decay * st["vaa"]) / (safe_a * safe_a)
+        decay_std = np.sqrt(np.maximum(var, 0.0))
+        dof, inverse = np.unique(np.maximum(st["n_obs"] - 2, 0), return_inverse=True)   # 분위수는 관측 수별로 한 번만
+        z = student_t.ppf(0.5 + confidence / 2, PRIOR_NOISE_OBS + dof)[inverse]
+
+        # EOL은 열화 속도에 대해 단조 감소: [예상, 빠른 열화, 느린 열화]를 한 번에 이분 탐색
+        d = np.maximum(np.stack([decay, decay + z * decay_std, decay - z * decay_std]), 0.0)
+        eol, eol_low, eol_high = first_cycle_below(d * LINEAR_FADE, d * ACC_FADE_AMP, self.eol_ratio, self.max_cycles)
+        last = st["last_cycle"]
+        capacity = a * (1.0 - decay * _fade_basis(last))
+        rul = np.maximum(eol - last, 0.0)
+        observed = st["n_obs"] > 0
+        nan = np.where(observed, 1.0, np.nan)
+        return RulEstimate(
+            list(cells), last, st["n_obs"], capacity * nan, a * nan, decay * nan, decay_std * nan,
+            eol * nan, eol_low * nan, eol_high * nan, rul * nan,
+        )
@@ -0,0 +1,168 @@
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from engine2 import BINDER_SOLVENTS, CO2_FACTORS, DEFAULT_CO2_FACTOR, lca_impact_arrays
+
+
+# ==============================================================================
+# [민감도 분석] Sobol 준난수 표본으로 Engine 2 입력 변수별 1차/전체 Sobol 지수 계산
+# ==============================================================================
+# Saltelli 표본 설계: 2k차원 Sobol 수열을 A, B 두 행렬로 나누고, 변수 i마다 A의 i열만 B로 바꾼 AB_i를 평가
+# (모델 평가 N·(k+2)회). 1차 지수는 Saltelli(2010), 전체 지수는 Jansen(1999) 추정식.
+# 신뢰구간은 N개 행을 복원 추출하는 부트스트랩 백분위 구간.
+Factor = namedtuple("Factor", ["name", "low", "high", "levels"])   # levels: 범주형이면 값 목록, 연속형이면 None
+
+SobolResult = namedtuple("SobolResult", [
+    "factors", "outputs", "first", "first_ci", "total", "total_ci", "n_base", "n_evals", "eval_seconds",
+])   # first/total: (출력, 변수), *_ci: (출력, 변수, 2)
+
+LCA_OUTPUTS = ("CO2_kg_per_m2", "Energy_kWh_per_m2", "VOC_g_per_m2")
+EVAL_CHUNK = 1 << 16          # 한 번에 평가하는 표본 행 수
+BOOT_BLOCK = 1 << 22          # 부트스트랩 한 묶음에서 만드는 원소 수 상한 (메모리 제한)
+
+
+def _scale(u, factor):
+    """[0, 1) 표본 -> 변수 값 (범주형은 수준 코드)"""
+    if factor.levels is not None:
+        return np.minimum((u * len(factor.levels)).astype(np.intp), len(factor.levels) - 1)
+    return factor.low + u * (factor.high - factor.low)
+
+
+def saltelli_samples(n_factors, n_base, seed=0):
+    """scrambled Sobol 수열에서 A, B 행렬 (n_base는 2의 거듭제곱으로 올림). 반환: (A, B) 각각 (N, k)"""
+    from scipy.stats import qmc
+
+    m = max(int(np.ceil(np.log2(max(n_base, 2)))), 1)
+    u = qmc.Sobol(2 * n_factors, scramble=True, seed=seed).random_base2(m)
+    return u[:, :n_factors], u[:, n_factors:]
+
+
+def _row_stats(y_a, y_b, y_ab):
+    """
+    y_a, y_b: (출력, N), y_ab: (k, 출력, N) -> 행별 통계량 (N, 출력·(4 + 2k)).
+    지수는 이 통계량들의 평균으로만 계산되므로, 부트스트랩은 재표본 가중치 × 통계량 행렬곱 한 번으로 끝난다.
+    A ∪ B 평균을 빼서 분산 계산의 상쇄 오차를 줄인다.
+    """
+    center = np.concatenate([y_a, y_b], axis=-1).mean(axis=-1, keepdims=True)
+    a, b, ab = y_a - center, y_b - center, y_ab - center
+    n = a.shape[-1]
+    stats = np.concatenate([a, b, a * a, b * b, (b * (ab - a)).reshape(-1, n), ((a - ab) ** 2).reshape(-1, n)])
+    return np.ascontiguousarray(stats.T)
+
+
+def _indices(means, n_outputs, k):
+    """
+    행별 통계량의 (가중) 평균 (..., S) -> 1차, 전체 지수 (..., 출력, k).
+    분산이 0인 출력(모든 표본에서 같은 값)은 NaN.
+    """
+    o = n_outputs
+    ea, eb, ea2, eb2 = (means[..., i * o:(i + 1) * o] for i in range(4))
+    mean = (ea + eb) / 2
+    var = (ea2 + eb2) / 2 - mean * mean
+    safe = np.where(var > 0, var, np.nan)[..., None]
+    shape = means.shape[:-1] + (k, o)
+    first = np.swapaxes(means[..., 4 * o:(4 + k) * o].reshape(shape), -1, -2) / safe
+    total = 0.5 * np.swapaxes(means[..., (4 + k) * o:].reshape(shape), -1, -2) / safe
+    return first, total
+
+
+def sobol_indices(model, factors, outputs, n_base=1 << 14, n_boot=200, confidence=0.95, seed=0,
+                  chunk_size=EVAL_CHUNK):
+    """
+    model(columns) -> 출력별 배열 목록. columns: factors 순서의 배열 (범주형은 수준 코드).
+    모델은 EVAL_CHUNK 행씩 배치로 평가하고, 부트스트랩은 BOOT_BLOCK 원소 단위로 나눠 계산한다.
+    반환: SobolResult
+    """
+    k = len(factors)
+    a, b = saltelli_samples(k, n_base, seed)
+    n = len(a)
+    y_a = np.empty((len(outputs), n))
+    y_b = np.empty((len(outputs), n))
+    y_ab = np.empty((k, len(outputs), n))
+
+    t0 = time.perf_counter()
+    for start in range(0, n, chunk_size):
+        rows = slice(start, min(start + chunk_size, n))
+        a_cols = [_scale(a[rows, j], f) for j, f in enumerate(factors)]
+        b_cols = [_scale(b[rows, j], f) for j, f in enumerate(factors)]
+        y_a[:, rows] = model(a_cols)
+        y_b[:, rows] = model(b_cols)
+        for i in range(k):
+            y_ab[i, :, rows] = model(a_cols[:i] + [b_cols[i]] + a_cols[i + 1:])
+    eval_seconds = time.perf_counter() - t0
+
+    stats = _row_stats(y_a, y_b, y_ab)
+    first, total = _indices(stats.mean(axis=0), len(outputs), k)
+
+    # 부트스트랩: 행 N개를 복원 추출한 횟수(가중치)로 통계량 평균을 다시 계산 (A, B, AB_i는 같은 행을 함께 뽑음)
+    rng = np.random.default_rng(seed)
+    boot_first = np.empty((n_boot, len(outputs), k))
+    boot_total = np.empty((n_boot, len(outputs), k))
+    block = max(1, BOOT_BLOCK // n)
+    for start in range(0, n_boot, block):
+        rb = min(block, n_boot - start)
+        draws = rng.integers(0, n, size=(rb, n)) + np.arange(rb)[:, None] * n
+        weights = np.bincount(draws.ravel(), minlength=rb * n).reshape(rb, n) / n
+        boot_first[start:start + rb], boot_total[start:start + rb] = _indices(weights @ stats, len(outputs), k)
+    tail = (1.0 - confidence) / 2 * 100
+    first_ci = np.moveaxis(np.nanpercentile(boot_first, [tail, 100 - tail], axis=0), 0, -1) if n_boot else None
+    total_ci = np.moveaxis(np.nanpercentile(boot_total, [tail, 100 - tail], axis=0), 0, -1) if n_boot else None
+
+    return SobolResult(tuple(factors), tuple(outputs), first, first_ci, total, total_ci, n, n * (k + 2), eval_seconds)
+
+
+# ==============================================================================
+# [Engine 2 민감도] 건조 온도 · 건조 시간 · 로딩량 · 용매가 CO₂/에너지/VOC에 미치는 영향
+# ==============================================================================
+def solvent_co2_factor(solvent):
+    """용매에 녹는 바인더들의 평균 CO₂ 계수 (수계 바인더는 계수가 같아 용매가 바인더 계열을 결정)"""
+    factors = [CO2_FACTORS.get(b, DEFAULT_CO2_FACTOR) for b, s in BINDER_SOLVENTS.items() if s == solvent]
+    return float(np.mean(factors)) if factors else DEFAULT_CO2_FACTOR
+
+
+def lca_factors(solvents=("Water", "NMP"), temp_range=(60, 200), time_range=(10, 720), loading_range=(5.0, 30.0)):
+    """Engine 2 탭 슬라이더 범위 기준 입력 변수 목록 (용매는 균등 확률의 범주형 변수)"""
+    return (
+        Factor("Drying_Temp_C", float(temp_range[0]), float(temp_range[1]), None),
+        Factor("Drying_Time_min", float(time_range[0]), float(time_range[1]), None),
+        Factor("Loading_mg_cm2", float(loading_range[0]), float(loading_range[1]), None),
+        Factor("Solvent_Type", 0, len(solvents), tuple(solvents)),
+    )
+
+
+def lca_model(factors):
+    """lca_factors 순서의 열 -> (CO₂, 에너지, VOC). 용매 코드를 조회표로 바꿔 lca_impact_arrays로 평가"""
+    solvents = factors[3].levels
+    is_nmp_lut = np.array([s == "NMP" for s in solvents])
+    co2_lut = np.array([solvent_co2_factor(s) for s in solvents])
+
+    def model(columns):
+        temp, time_min, loading, code = columns
+        return lca_impact_arrays(code, is_nmp_lut[code], temp, loading, time_min, co2_lut)
+
+    return model
+
+
+@lru_cache(maxsize=16)
+def lca_sensitivity(solvents=("Water", "NMP"), temp_range=(60, 200), time_range=(10, 720), loading_range=(5.0, 30.0),
+                    n_base=1 << 14, n_boot=200, seed=0):
+    """Engine 2 탭용: 범위(해시 가능한 값)별 Sobol 지수 (캐시)"""
+    factors = lca_factors(tuple(solvents), tuple(temp_range), tuple(time_range), tuple(loading_range))
+    return sobol_indices(lca_model(factors), factors, LCA_OUTPUTS, n_base, n_boot, seed=seed)
+
+
+def result_table(result):
+    """SobolResult -> 출력 × 변수별 행 목록 (표시/내보내기용)"""
+    rows = []
+    for o, output in enumerate(result.outputs):
+        for j, factor in enumerate(result.factors):
+            row = {"Output": output, "Factor": factor.name,
+                   "S1": result.first[o, j], "ST": result.total[o, j]}
+            if result.first_ci is not None:
+                row.update({"S1_low": result.first_ci[o, j, 0], "S1_high": result.first_ci[o, j, 1],
+                            "ST_low": result.total_ci[o, j, 0], "ST_high": result.total_ci[o, j, 1]})
+            rows.append(row)
+    return rows
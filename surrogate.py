@@ -0,0 +1,117 @@
+import hashlib
+import os
+
+import numpy as np
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(current_dir, "engine1_output.csv")
+MODEL_PATH = os.path.join(current_dir, "models", "engine1_surrogate.joblib")
+MODEL_VERSION = 1   # 모델 구조를 바꾸면 올려서 저장된 파일을 무효화
+
+
+# ==============================================================================
+# [Surrogate] History 데이터로 학습한 용량 예측 모델 (RandomForest)
+# ==============================================================================
+class CapacitySurrogate:
+    """
+    (Sample_Type, Cycle) -> Capacity 회귀 모델.
+    RandomForest는 학습 구간 밖에서 값이 평평해지므로, 샘플별 선형 추세를 먼저 빼고
+    남은 잔차를 RandomForest로 학습한다 (예측 = 추세 + 잔차).
+    추세는 History 후반부로 맞추고, 장기적으로 용량이 늘지 않도록 기울기를 0 이하로 제한한다.
+    """
+
+    def __init__(self, n_estimators=100, random_state=0, trend_window=0.5):
+        self.n_estimators = n_estimators
+        self.random_state = random_state
+        self.trend_window = trend_window
+        self.sample_types = []
+        self.trends = {}
+        self.model = None
+
+    def _features(self, sample_types, cycles):
+        codes = np.array([self.sample_types.index(s) for s in sample_types])
+        onehot = np.eye(len(self.sample_types))[codes]
+        return np.column_stack([np.asarray(cycles, dtype=float), onehot])
+
+    def _trend(self, sample_types, cycles):
+        slope, intercept = np.array([self.trends[s] for s in sample_types]).T
+        return slope * np.asarray(cycles, dtype=float) + intercept
+
+    def fit(self, sample_types, cycles, capacity):
+        from sklearn.ensemble import RandomForestRegressor
+
+        sample_types = np.asarray(sample_types)
+        cycles = np.asarray(cycles, dtype=float)
+        capacity = np.asarray(capacity, dtype=float)
+        self.sample_types = sorted(set(sample_types.tolist()))
+        self.trends = {}
+        for s in self.sample_types:
+            c, q = cycles[sample_types == s], capacity[sample_types == s]
+            late = c >= np.quantile(c, 1.0 - self.trend_window)
+            slope, _ = np.polyfit(c[late], q[late], 1)
+            slope = min(slope, 0.0)
+            self.trends[s] = (slope, float(np.mean(q[late] - slope * c[late])))
+        residual = capacity - self._trend(sample_types, cycles)
+        self.model = RandomForestRegressor(n_estimators=self.n_estimators, min_samples_leaf=2, random_state=self.random_state)
+        self.model.fit(self._features(sample_types, cycles), residual)
+        return self
+
+    def predict(self, sample_types, cycles):
+        """배치 예측. sample_types가 문자열 하나면 모든 cycles에 같은 샘플을 적용"""
+        cycles = np.atleast_1d(np.asarray(cycles, dtype=float))
+        if isinstance(sample_types, str):
+            sample_types = [sample_types] * len(cycles)
+        return self._trend(sample_types, cycles) + self.model.predict(self._features(sample_types, cycles))
+
+
+def data_hash(path=DATA_PATH):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def train_surrogate(path=DATA_PATH):
+    """CSV의 History 행으로 모델 학습"""
+    from labdata import read_cycle_csv
+
+    store = read_cycle_csv(path)
+    hist = {s: store.get(s, 'History') for s in store.samples}
+    hist = {s: h for s, h in hist.items() if len(h.cycle)}
+    sample_types = np.concatenate([np.full(len(h.cycle), s, dtype=object) for s, h in hist.items()])
+    cycles = np.concatenate([h.cycle for h in hist.values()])
+    capacity = np.concatenate([h.capacity for h in hist.values()])
+    return CapacitySurrogate().fit(sample_types, cycles, capacity)
+
+
+def load_or_train(path=DATA_PATH, model_path=MODEL_PATH):
+    """
+    디스크에 저장된 모델을 불러오고, 없거나 학습 데이터가 바뀌었으면 다시 학습하여 저장.
+    (모델 파일에 학습 데이터의 해시와 모델 버전을 함께 저장)
+    """
+    import joblib
+
+    digest = data_hash(path)
+    if os.path.exists(model_path):
+        try:
+            saved = joblib.load(model_path)
+            if saved.get("data_hash") == digest and saved.get("version") == MODEL_VERSION:
+                return saved["model"]
+        except Exception:
+            pass  # 손상되었거나 호환되지 않는 파일은 다시 학습
+
+    model = train_surrogate(path)
+    try:
+        os.makedirs(os.path.dirname(model_path), exist_ok=True)
+        tmp_path = f"{model_path}.{os.getpid()}.tmp"
+        joblib.dump({"data_hash": digest, "version": MODEL_VERSION, "model": model}, tmp_path)
+        os.replace(tmp_path, model_path)
+    except OSError:
+        pass  # 읽기 전용 배포 환경에서는 메모리의 모델만 사용
+    return model
+
+
+if __name__ == "__main__":
+    model = load_or_train()
+    for s in model.sample_types:
+        pred = model.predict(s, [1, 100, 150, 200])
+        print(f"{s:<24}", " ".join(f"{v:8.2f}" for v in pred))